@@ -17,11 +17,12 @@ import sys
 from itertools import islice
 from logging import getLogger
 from pathlib import Path
-from typing import Optional, Union
+from typing import Iterator, List, Optional, Union
 
 from deeppavlov.core.commands.utils import import_packages, parse_config
 from deeppavlov.core.common.chainer import Chainer
 from deeppavlov.core.common.params import from_params
+from deeppavlov.core.common.profiler import format_profile
 from deeppavlov.core.data.utils import jsonify_data
 from deeppavlov.download import deep_download
 
@@ -59,7 +60,9 @@ def build_model(config: Union[str, Path, dict], mode: str = 'infer',
         else:
             component_serialized = None
 
-        component = from_params(component_config, mode=mode, serialized=component_serialized)
+        cache = component_config.get('cache')
+        component_params = {k: v for k, v in component_config.items() if k != 'cache'}
+        component = from_params(component_params, mode=mode, serialized=component_serialized)
 
         if 'id' in component_config:
             model._components_dict[component_config['id']] = component
@@ -69,7 +72,7 @@ def build_model(config: Union[str, Path, dict], mode: str = 'infer',
             c_out = component_config['out']
             in_y = component_config.get('in_y', None)
             main = component_config.get('main', False)
-            model.append(component, c_in, c_out, in_y, main)
+            model.append(component, c_in, c_out, in_y, main, cache)
 
     return model
 
@@ -93,22 +96,7 @@ def interact_model(config: Union[str, Path, dict]) -> None:
         print('>>', *pred)
 
 
-def predict_on_stream(config: Union[str, Path, dict],
-                      batch_size: Optional[int] = None,
-                      file_path: Optional[str] = None) -> None:
-    """Make a prediction with the component described in corresponding configuration file."""
-
-    batch_size = batch_size or 1
-    if file_path is None or file_path == '-':
-        if sys.stdin.isatty():
-            raise RuntimeError('To process data from terminal please use interact mode')
-        f = sys.stdin
-    else:
-        f = open(file_path, encoding='utf8')
-
-    model: Chainer = build_model(config)
-
-    args_count = len(model.in_x)
+def _read_batches(f, batch_size: int, args_count: int) -> Iterator[List[List[str]]]:
     while True:
         batch = list((l.strip() for l in islice(f, batch_size * args_count)))
 
@@ -118,7 +106,28 @@ def predict_on_stream(config: Union[str, Path, dict],
         args = []
         for i in range(args_count):
             args.append(batch[i::args_count])
+        yield args
+
+
+def _open_input(file_path: Optional[str]):
+    if file_path is None or file_path == '-':
+        if sys.stdin.isatty():
+            raise RuntimeError('To process data from terminal please use interact mode')
+        return sys.stdin
+    return open(file_path, encoding='utf8')
+
 
+def predict_on_stream(config: Union[str, Path, dict],
+                      batch_size: Optional[int] = None,
+                      file_path: Optional[str] = None) -> None:
+    """Make a prediction with the component described in corresponding configuration file."""
+
+    batch_size = batch_size or 1
+    f = _open_input(file_path)
+
+    model: Chainer = build_model(config)
+
+    for args in _read_batches(f, batch_size, len(model.in_x)):
         res = model(*args)
         if len(model.out_params) == 1:
             res = [res]
@@ -128,3 +137,24 @@ def predict_on_stream(config: Union[str, Path, dict],
 
     if f is not sys.stdin:
         f.close()
+
+
+def profile_on_stream(config: Union[str, Path, dict],
+                      batch_size: Optional[int] = None,
+                      file_path: Optional[str] = None,
+                      trace_memory: bool = False) -> None:
+    """Infer the model on the input data and print time and memory usage statistics of every pipeline component."""
+
+    batch_size = batch_size or 1
+    f = _open_input(file_path)
+
+    model: Chainer = build_model(config)
+    model.enable_profiling(trace_memory)
+
+    for args in _read_batches(f, batch_size, len(model.in_x)):
+        model(*args)
+
+    if f is not sys.stdin:
+        f.close()
+
+    print(format_profile(model.get_profile()), flush=True)
@@ -16,9 +16,11 @@ import pickle
 from itertools import islice
 from logging import getLogger
 from types import FunctionType
-from typing import Union, Tuple, List, Optional, Hashable, Reversible
+from typing import Union, Tuple, List, Optional, Hashable, Reversible, Dict
 
+from deeppavlov.core.common.component_cache import ComponentCache
 from deeppavlov.core.common.errors import ConfigError
+from deeppavlov.core.common.profiler import PipelineProfiler
 from deeppavlov.core.models.component import Component
 from deeppavlov.core.models.nn_model import NNModel
 from deeppavlov.core.models.serializable import Serializable
@@ -40,6 +42,8 @@ class Chainer(Component):
         forward_map: list of all variables in chainer's memory after  running every component in ``self.pipe``
         train_map: list of all variables in chainer's memory after  running every component in ``train_pipe.pipe``
         main: reference to the main component
+        train_preprocessor: chainer of the components preceding the trainable component, its ``compute`` method
+            returns arguments of :meth:`train_step`
 
     Args:
         in_x: names of inputs for pipeline inference mode
@@ -67,6 +71,11 @@ class Chainer(Component):
         self._components_dict = {}
 
         self.main = None
+        self.train_preprocessor: Optional[Chainer] = None
+
+        self._profiler: Optional[PipelineProfiler] = None
+        self._component_names = {}
+        self._caches: Dict[int, ComponentCache] = {}
 
     def __getitem__(self, item):
         if isinstance(item, int):
@@ -125,7 +134,8 @@ class Chainer(Component):
                     p.pretty(component)
 
     def append(self, component: Union[Component, FunctionType], in_x: [str, list, dict] = None,
-               out_params: [str, list] = None, in_y: [str, list, dict] = None, main: bool = False):
+               out_params: [str, list] = None, in_y: [str, list, dict] = None, main: bool = False,
+               cache: Optional[dict] = None):
         if isinstance(in_x, str):
             in_x = [in_x]
         if isinstance(in_y, str):
@@ -159,8 +169,7 @@ class Chainer(Component):
                     t_in_x = dict(zip(t_in_x_keys, t_in_x))
                 preprocessor.append(t_component, t_in_x, t_out)
 
-            def train_on_batch(*args, **kwargs):
-                preprocessed = preprocessor.compute(*args, **kwargs)
+            def train_step(preprocessed):
                 if len(in_x + in_y) == 1:
                     preprocessed = [preprocessed]
                 if keys:
@@ -168,10 +177,19 @@ class Chainer(Component):
                 else:
                     return component.train_on_batch(*preprocessed)
 
+            def train_on_batch(*args, **kwargs):
+                return train_step(preprocessor.compute(*args, **kwargs))
+
+            self.train_preprocessor = preprocessor
+            self.train_step = train_step
             self.train_on_batch = train_on_batch
             self.process_event = component.process_event
         if main:
             self.main = component
+        if cache is not None:
+            if in_y is not None or isinstance(component, NNModel):
+                raise ConfigError(f'Results of trainable component {type(component).__name__} cannot be cached')
+            self._caches[id(component)] = ComponentCache(**cache)
         if self.forward_map.issuperset(in_x):
             self.pipe.append(((x_keys, in_x), out_params, component))
             self.forward_map = self.forward_map.union(out_params)
@@ -206,8 +224,63 @@ class Chainer(Component):
     def __call__(self, *args):
         return self._compute(*args, param_names=self.in_x, pipe=self.pipe, targets=self.out_params)
 
-    @staticmethod
-    def _compute(*args, param_names, pipe, targets):
+    def enable_profiling(self, trace_memory: bool = False) -> None:
+        """Starts collecting time and memory usage statistics for every pipeline component call.
+
+        Args:
+            trace_memory: Whether to measure peak of memory allocated by Python with :mod:`tracemalloc`.
+        """
+        self._profiler = PipelineProfiler(trace_memory)
+
+    def disable_profiling(self) -> None:
+        self._profiler = None
+
+    def get_profile(self) -> Dict[str, Dict[str, Union[int, float]]]:
+        """Returns pipeline components statistics collected since :meth:`enable_profiling` call.
+
+        Components are keyed by their ids from the config or by their class names.
+        """
+        if self._profiler is None:
+            return {}
+        return self._profiler.get_profile()
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, Union[int, float]]]:
+        """Returns hits, misses and evictions counters of the components results caches and of the caches
+        that components keep themselves, such as embedders token caches."""
+        stats = {self._get_component_name(component): self._caches[id(component)].get_stats()
+                 for _, _, component in self.pipe if id(component) in self._caches}
+        for _, _, component in self.pipe:
+            get_stats = getattr(component, 'get_cache_stats', None)
+            if callable(get_stats) and not isinstance(component, Chainer):
+                name = self._get_component_name(component)
+                stats[name + '.internal' if name in stats else name] = get_stats()
+        return stats
+
+    def _get_component_name(self, component) -> str:
+        name = self._component_names.get(id(component))
+        if name is None:
+            for k, v in self._components_dict.items():
+                if v is component:
+                    name = k
+                    break
+            else:
+                name = getattr(component, '__name__', type(component).__name__)
+            base_name, i = name, 1
+            while name in self._component_names.values():
+                i += 1
+                name = f'{base_name}#{i}'
+            self._component_names[id(component)] = name
+        return name
+
+    def _call_component(self, component, in_keys, x, single_output: bool):
+        cache = self._caches.get(id(component))
+        if cache is not None:
+            return cache(component, in_keys, x, single_output)
+        if in_keys:
+            return component.__call__(**dict(zip(in_keys, x)))
+        return component.__call__(*x)
+
+    def _compute(self, *args, param_names, pipe, targets):
         expected = set(targets)
         final_pipe = []
         for (in_keys, in_params), out_params, component in reversed(pipe):
@@ -222,12 +295,15 @@ class Chainer(Component):
         mem = dict(zip(param_names, args))
         del args
 
+        profiler = self._profiler
         for (in_keys, in_params), out_params, component in pipe:
             x = [mem[k] for k in in_params]
-            if in_keys:
-                res = component.__call__(**dict(zip(in_keys, x)))
+            if profiler is not None:
+                batch_size = len(x[0]) if x and hasattr(x[0], '__len__') else 0
+                with profiler.measure(self._get_component_name(component), batch_size):
+                    res = self._call_component(component, in_keys, x, len(out_params) == 1)
             else:
-                res = component.__call__(*x)
+                res = self._call_component(component, in_keys, x, len(out_params) == 1)
             if len(out_params) == 1:
                 mem[out_params[0]] = res
             else:
@@ -0,0 +1,159 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pickle
+import time
+from copy import deepcopy
+from collections import OrderedDict
+from hashlib import blake2b
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+_MISSING = object()
+
+
+class ComponentCache:
+    """LRU cache of the pipeline component results for separate batch elements.
+
+    Batch elements are looked up in the cache by the hash of their pickled inputs. The component is called only on
+    the batch elements that are missing in the cache and the results are merged back in the original order. The cache
+    should be used only for components whose output for a batch element depends on this element inputs only.
+    Cached results are kept as copies of the component outputs and copied again on every hit, so changing the
+    returned objects doesn't change the cache. Every cached element keeps the type of the output it was returned in,
+    and dtype and element shape for numpy arrays, so merged outputs have the same types as the component returns.
+    Outputs of elements cached from the calls with different types or element shapes are merged into lists.
+
+    Args:
+        size: Maximum number of cached batch elements.
+        ttl: Lifetime of the cached result in seconds. If ``None``, results don't expire.
+
+    """
+
+    def __init__(self, size: int = 10000, ttl: Optional[float] = None) -> None:
+        self.size = size
+        self.ttl = ttl
+        self._cache: Dict[bytes, tuple] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _get_key(inputs: Sequence) -> bytes:
+        return blake2b(pickle.dumps(inputs, protocol=4), digest_size=16).digest()
+
+    def _get(self, key: bytes) -> Any:
+        try:
+            value, expires = self._cache[key]
+        except KeyError:
+            return _MISSING
+        if expires is not None and expires < time.monotonic():
+            del self._cache[key]
+            return _MISSING
+        self._cache.move_to_end(key)
+        return value
+
+    def _put(self, key: bytes, value: tuple) -> None:
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        self._cache[key] = (value, expires)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+
+    def __call__(self, component: Callable, in_keys: Sequence[str], x: List[Sequence], single_output: bool) -> Any:
+        """Calls the component on the batch elements missing in the cache and returns results for the whole batch.
+
+        Args:
+            component: Pipeline component.
+            in_keys: Names of the component keyword arguments. If empty, inputs are passed as positional arguments.
+            x: Values of the component inputs.
+            single_output: Whether the component returns one output.
+
+        Returns:
+            The component output as if it was called on the whole batch.
+
+        """
+        lengths = {len(arg) if hasattr(arg, '__len__') else None for arg in x}
+        if len(lengths) != 1 or None in lengths or 0 in lengths:
+            return component(**dict(zip(in_keys, x))) if in_keys else component(*x)
+
+        keys = [self._get_key([arg[i] for arg in x]) for i in range(lengths.pop())]
+        results = [_MISSING] * len(keys)
+        misses = OrderedDict()
+        with self._lock:
+            for i, key in enumerate(keys):
+                results[i] = self._get(key)
+                if results[i] is _MISSING:
+                    misses.setdefault(key, i)
+            self.hits += len(keys) - len(misses)
+            self.misses += len(misses)
+        results = [value if value is _MISSING else deepcopy(value) for value in results]
+
+        if misses:
+            miss_x = [[arg[i] for i in misses.values()] for arg in x]
+            res = component(**dict(zip(in_keys, miss_x))) if in_keys else component(*miss_x)
+            if single_output:
+                res = [res]
+            metas = tuple(self._get_output_meta(out) for out in res)
+            computed = {key: (elements, metas) for key, elements in zip(misses, zip(*res))}
+            copies = deepcopy(computed)
+            with self._lock:
+                for key, value in copies.items():
+                    self._put(key, value)
+            results = [computed[key] if value is _MISSING else value for key, value in zip(keys, results)]
+
+        outputs = [self._merge(out, out_metas) for out, out_metas in zip(zip(*[elements for elements, _ in results]),
+                                                                           zip(*[metas for _, metas in results]))]
+        return outputs[0] if single_output else outputs
+
+    @staticmethod
+    def _get_output_meta(output: Any) -> tuple:
+        """Returns type of the component output, and dtype and shape of its elements for numpy arrays."""
+        if isinstance(output, np.ndarray):
+            return type(output), output.dtype, output.shape[1:]
+        return type(output), None, None
+
+    @staticmethod
+    def _merge(elements: Sequence, metas: Sequence[tuple]) -> Any:
+        """Merges batch elements of one output into a container of the type the component returned them in."""
+        out_type, _, shape = metas[0]
+        if any(meta[0] is not out_type or meta[2] != shape for meta in metas):
+            return list(elements)
+        if issubclass(out_type, np.ndarray):
+            merged = np.empty((len(elements),) + shape, dtype=np.result_type(*[meta[1] for meta in metas]))
+            # elements are assigned one by one, so arrays of objects, e.g. ragged arrays, keep their elements
+            for i, element in enumerate(elements):
+                merged[i] = element
+            return merged if out_type is np.ndarray else merged.view(out_type)
+        if out_type is tuple:
+            return tuple(elements)
+        return list(elements)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'size': len(self._cache),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / requests if requests else 0.
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
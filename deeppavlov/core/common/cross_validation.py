@@ -12,10 +12,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import multiprocessing
+import pickle
 import shutil
+import tempfile
 from collections import OrderedDict
+from copy import deepcopy
 from logging import getLogger
 from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
 
 import numpy as np
 from sklearn.model_selection import KFold
@@ -29,8 +34,10 @@ SAVE_PATH_ELEMENT_NAME = 'save_path'
 TEMP_DIR_FOR_CV = 'cv_tmp'
 log = getLogger(__name__)
 
+_worker_data: Optional[dict] = None
 
-def change_savepath_for_model(config):
+
+def change_savepath_for_model(config, fold: Optional[int] = None):
     params_helper = ParamsSearch()
 
     dirs_for_saved_models = set()
@@ -38,6 +45,9 @@ def change_savepath_for_model(config):
         p.append(SAVE_PATH_ELEMENT_NAME)
         save_path = Path(params_helper.get_value_from_config(config, p))
         new_save_path = save_path.parent / TEMP_DIR_FOR_CV / save_path.name
+        if fold is not None:
+            # folds trained in parallel save their models to separate directories
+            new_save_path = save_path.parent / TEMP_DIR_FOR_CV / f'fold_{fold}' / save_path.name
 
         dirs_for_saved_models.add(expand_path(new_save_path.parent))
 
@@ -56,47 +66,98 @@ def create_dirs_to_save_models(dirs_for_saved_models):
         new_save_dir.mkdir(exist_ok=True, parents=True)
 
 
-def generate_train_valid(data, n_folds=5, is_loo=False):
-    all_data = data['train'] + data['valid']
-
+def generate_folds(n_samples: int, n_folds: int = 5, is_loo: bool = False) -> Iterator[Tuple[List[int], List[int]]]:
+    """Yields indexes of train and valid samples of every fold"""
     if is_loo:
         # for Leave One Out
-        for i in range(len(all_data)):
-            data_i = {
-                'train': all_data.copy(),
-                'test': data['test']
-            }
-            data_i['valid'] = [data_i['train'].pop(i)]
-
-            yield data_i
+        for i in range(n_samples):
+            yield [j for j in range(n_samples) if j != i], [i]
     else:
         # for Cross Validation
         kf = KFold(n_splits=n_folds, shuffle=True)
-        for train_index, valid_index in kf.split(all_data):
-            data_i = {
-                'train': [all_data[i] for i in train_index],
-                'valid': [all_data[i] for i in valid_index],
-                'test': data['test']
-            }
+        for train_index, valid_index in kf.split(np.arange(n_samples)):
+            yield train_index.tolist(), valid_index.tolist()
+
+
+def generate_train_valid(data, n_folds=5, is_loo=False):
+    all_data = data['train'] + data['valid']
 
-            yield data_i
+    for train_index, valid_index in generate_folds(len(all_data), n_folds=n_folds, is_loo=is_loo):
+        yield {
+            'train': [all_data[i] for i in train_index],
+            'valid': [all_data[i] for i in valid_index],
+            'test': data['test']
+        }
+
+
+def _init_worker(data_path: str) -> None:
+    global _worker_data
+    with open(data_path, 'rb') as f:
+        _worker_data = pickle.load(f)
+
+
+def _train_fold(task: Tuple[dict, int, List[int], List[int]]) -> Tuple[int, dict]:
+    config, fold, train_index, valid_index = task
+    all_data = _worker_data['all']
+    data_i = {
+        'train': [all_data[i] for i in train_index],
+        'valid': [all_data[i] for i in valid_index],
+        'test': _worker_data['test']
+    }
+    config, dirs_for_saved_models = change_savepath_for_model(config, fold)
+    iterator = get_iterator_from_config(config, data_i)
+    create_dirs_to_save_models(dirs_for_saved_models)
+    try:
+        score = train_evaluate_model_from_config(config, iterator=iterator)
+    finally:
+        delete_dir_for_saved_models(dirs_for_saved_models)
+    return fold, score['valid']
 
 
-def calc_cv_score(config, data=None, n_folds=5, is_loo=False):
+def _calc_cv_scores_parallel(config: dict, data: dict, n_folds: int, is_loo: bool, n_jobs: int) -> List[dict]:
+    """Train folds in ``n_jobs`` processes. The data is pickled to a temporary file once and read once by every
+    worker process, folds are sent to workers as lists of indexes."""
+    all_data = data['train'] + data['valid']
+    folds = list(generate_folds(len(all_data), n_folds=n_folds, is_loo=is_loo))
+    scores = [None] * len(folds)
+    with tempfile.TemporaryDirectory(prefix='cv_data_') as tmp_dir:
+        data_path = str(Path(tmp_dir) / 'data.pkl')
+        with open(data_path, 'wb') as f:
+            pickle.dump({'all': all_data, 'test': data['test']}, f, protocol=4)
+        # workers are spawned, so they don't inherit the state of deep learning frameworks from the parent process
+        with multiprocessing.get_context('spawn').Pool(min(n_jobs, len(folds)), initializer=_init_worker,
+                                                       initargs=(data_path,)) as pool:
+            tasks = [(config, fold, train_index, valid_index) for fold, (train_index, valid_index) in enumerate(folds)]
+            for done, (fold, score) in enumerate(pool.imap_unordered(_train_fold, tasks), 1):
+                scores[fold] = score
+                log.info(f'Fold {fold} ({done}/{len(folds)} done) valid scores: {dict(score)}')
+    _, dirs_for_saved_models = change_savepath_for_model(deepcopy(config), 0)
+    for fold_dir in dirs_for_saved_models:
+        shutil.rmtree(str(fold_dir.parent), ignore_errors=True)
+    return scores
+
+
+def calc_cv_score(config, data=None, n_folds=5, is_loo=False, n_jobs=1):
     config = parse_config(config)
 
     if data is None:
         data = read_data_by_config(config)
 
-    config, dirs_for_saved_models = change_savepath_for_model(config)
+    if n_jobs > 1:
+        scores = _calc_cv_scores_parallel(config, data, n_folds, is_loo, n_jobs)
+    else:
+        scores = []
+        config, dirs_for_saved_models = change_savepath_for_model(config)
+        for data_i in generate_train_valid(data, n_folds=n_folds, is_loo=is_loo):
+            iterator = get_iterator_from_config(config, data_i)
+            create_dirs_to_save_models(dirs_for_saved_models)
+            score = train_evaluate_model_from_config(config, iterator=iterator)
+            delete_dir_for_saved_models(dirs_for_saved_models)
+            scores.append(score['valid'])
 
     cv_score = OrderedDict()
-    for data_i in generate_train_valid(data, n_folds=n_folds, is_loo=is_loo):
-        iterator = get_iterator_from_config(config, data_i)
-        create_dirs_to_save_models(dirs_for_saved_models)
-        score = train_evaluate_model_from_config(config, iterator=iterator)
-        delete_dir_for_saved_models(dirs_for_saved_models)
-        for key, value in score['valid'].items():
+    for score in scores:
+        for key, value in score.items():
             if key not in cv_score:
                 cv_score[key] = []
             cv_score[key].append(value)
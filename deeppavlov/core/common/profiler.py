@@ -0,0 +1,118 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+from logging import getLogger
+from threading import Lock
+from typing import Dict, Iterator, Union
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+log = getLogger(__name__)
+
+
+class PipelineProfiler:
+    """Accumulates time and memory usage statistics of the pipeline components calls.
+
+    For every component call wall time, CPU time of the process, batch size and increase of the process peak RSS
+    are measured. If ``trace_memory`` is ``True``, peak of the memory allocated by Python during the call
+    is measured with :mod:`tracemalloc` as well, which noticeably slows down the pipeline.
+    Peak RSS is measured only on platforms with the :mod:`resource` module and traced memory peak only on
+    Python 3.9+ which can reset the :mod:`tracemalloc` peak, otherwise these stats are omitted.
+
+    Args:
+        trace_memory: Whether to trace Python memory allocations.
+
+    """
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        if trace_memory and not hasattr(tracemalloc, 'reset_peak'):
+            log.warning('Python memory allocations are not traced: tracemalloc.reset_peak requires Python 3.9+')
+            trace_memory = False
+        self.trace_memory = trace_memory
+        self._stats: Dict[str, Dict[str, Union[int, float]]] = OrderedDict()
+        self._lock = Lock()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def measure(self, name: str, batch_size: int) -> Iterator[None]:
+        """Measures resources consumed by the code executed inside the context and adds them to ``name`` stats."""
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            traced_before, _ = tracemalloc.get_traced_memory()
+        if resource is not None:
+            max_rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+            if resource is not None:
+                max_rss_increase = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - max_rss_before
+            if self.trace_memory:
+                _, traced_peak = tracemalloc.get_traced_memory()
+                traced_peak = max(traced_peak - traced_before, 0)
+
+            with self._lock:
+                stats = self._stats.get(name)
+                if stats is None:
+                    stats = self._stats[name] = {'calls': 0, 'samples': 0, 'wall_time': 0., 'cpu_time': 0.}
+                    if resource is not None:
+                        stats['max_rss_increase_kb'] = 0
+                    if self.trace_memory:
+                        stats['traced_peak_bytes'] = 0
+                stats['calls'] += 1
+                stats['samples'] += batch_size
+                stats['wall_time'] += wall_time
+                stats['cpu_time'] += cpu_time
+                if resource is not None:
+                    stats['max_rss_increase_kb'] += max_rss_increase
+                if self.trace_memory:
+                    stats['traced_peak_bytes'] = max(stats['traced_peak_bytes'], traced_peak)
+
+    def get_profile(self) -> Dict[str, Dict[str, Union[int, float]]]:
+        """Returns accumulated statistics for every measured component in order of the first call."""
+        with self._lock:
+            profile = OrderedDict()
+            for name, stats in self._stats.items():
+                profile[name] = dict(stats)
+                profile[name]['mean_wall_time'] = stats['wall_time'] / stats['calls']
+        return profile
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+def format_profile(profile: Dict[str, Dict[str, Union[int, float]]]) -> str:
+    """Returns pipeline profile as a table sorted by total wall time."""
+    total_time = sum(stats['wall_time'] for stats in profile.values()) or 1
+    name_width = max([len(name) for name in profile] + [len('component')])
+    lines = [f'{"component":<{name_width}} {"calls":>7} {"samples":>9} {"wall, s":>10} {"wall, %":>8} '
+             f'{"cpu, s":>10} {"rss+, KiB":>10} {"traced, KiB":>12}']
+    for name, stats in sorted(profile.items(), key=lambda item: -item[1]['wall_time']):
+        rss = stats.get('max_rss_increase_kb', '-')
+        traced = stats['traced_peak_bytes'] // 1024 if 'traced_peak_bytes' in stats else '-'
+        lines.append(f'{name:<{name_width}} {stats["calls"]:>7} {stats["samples"]:>9} '
+                     f'{stats["wall_time"]:>10.3f} {100 * stats["wall_time"] / total_time:>8.1f} '
+                     f'{stats["cpu_time"]:>10.3f} {rss:>10} {traced:>12}')
+    return '\n'.join(lines)
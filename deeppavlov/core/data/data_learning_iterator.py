@@ -12,11 +12,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from logging import getLogger
 from random import Random
-from typing import List, Dict, Tuple, Any, Iterator
+from typing import List, Dict, Tuple, Any, Iterator, Optional
 
 from deeppavlov.core.common.registry import register
 
+log = getLogger(__name__)
+
+
+def example_length(x: Any) -> int:
+    """Returns a number of tokens in an example: whitespace separated tokens of a string, number of elements of
+    a list or a sum of lengths of the fields of a tuple. Texts are counted in words, not in subtokens of the model
+    tokenizer (e.g. BERT WordPiece), so the length of tokenized examples is usually larger."""
+    if isinstance(x, str):
+        return len(x.split())
+    if isinstance(x, list):
+        return len(x)
+    if isinstance(x, tuple):
+        return sum(example_length(field) for field in x)
+    return 1
+
 
 @register('data_learning_iterator')
 class DataLearningIterator:
@@ -26,10 +42,17 @@ class DataLearningIterator:
         data: list of (x, y) pairs for every data type in ``'train'``, ``'valid'`` and ``'test'``
         seed: random seed for data shuffling
         shuffle: whether to shuffle data during batching
+        bucket_batches: if positive, examples are sorted by length within mega-batches of ``bucket_batches``
+            batches of shuffled data, so examples of similar length are padded together
+        max_tokens: if set, batches are formed from examples sorted by length so that the number of tokens of
+            a batch padded to its longest example doesn't exceed ``max_tokens``, ``batch_size`` still limits the
+            number of examples in a batch. Tokens are counted by :func:`example_length`, i.e. texts are counted in
+            whitespace separated words rather than model subtokens
 
     Attributes:
         shuffle: whether to shuffle data during batching
         random: instance of ``Random`` initialized with a seed
+        padding_stats: shares of padding tokens in the last generated batches of every data type
     """
 
     def split(self, *args, **kwargs):
@@ -41,8 +64,11 @@ class DataLearningIterator:
         return data
 
     def __init__(self, data: Dict[str, List[Tuple[Any, Any]]], seed: int = None, shuffle: bool = True,
-                 *args, **kwargs) -> None:
+                 *args, bucket_batches: int = 0, max_tokens: Optional[int] = None, **kwargs) -> None:
         self.shuffle = shuffle
+        self.bucket_batches = bucket_batches
+        self.max_tokens = max_tokens
+        self.padding_stats: Dict[str, Dict[str, float]] = {}
 
         self.random = Random(seed)
 
@@ -85,9 +111,53 @@ class DataLearningIterator:
         if batch_size < 0:
             batch_size = data_len
 
+        if self.bucket_batches > 0 or self.max_tokens:
+            for batch in self._bucket_batches(data, order, batch_size, data_type, shuffle):
+                yield tuple(zip(*[data[o] for o in batch]))
+            return
+
         for i in range((data_len - 1) // batch_size + 1):
             yield tuple(zip(*[data[o] for o in order[i * batch_size:(i + 1) * batch_size]]))
 
+    def _bucket_batches(self, data: List[Tuple[Any, Any]], order: List[int], batch_size: int, data_type: str,
+                        shuffle: bool) -> List[List[int]]:
+        lengths = [example_length(x) for x, _ in data]
+        mega_batch_size = batch_size * self.bucket_batches if self.bucket_batches > 0 else len(order)
+        batches = []
+        for start in range(0, len(order), mega_batch_size):
+            bucket = sorted(order[start:start + mega_batch_size], key=lambda i: lengths[i])
+            if not self.max_tokens:
+                batches += [bucket[i:i + batch_size] for i in range(0, len(bucket), batch_size)]
+                continue
+            batch = []
+            for i in bucket:
+                # the bucket is sorted, so the current example is the longest one in the batch
+                if batch and (len(batch) >= batch_size or (len(batch) + 1) * lengths[i] > self.max_tokens):
+                    batches.append(batch)
+                    batch = []
+                batch.append(i)
+            if batch:
+                batches.append(batch)
+        if shuffle:
+            self.random.shuffle(batches)
+
+        def padded(batches_: List[List[int]]) -> int:
+            return sum(max(lengths[i] for i in batch) * len(batch) for batch in batches_)
+
+        tokens = sum(lengths[i] for i in order)
+        bucketed = padded(batches)
+        unbucketed = padded(order[i:i + batch_size] for i in range(0, len(order), batch_size))
+        self.padding_stats[data_type] = {
+            'padding_ratio': 1 - tokens / bucketed if bucketed else 0.,
+            'unbucketed_padding_ratio': 1 - tokens / unbucketed if unbucketed else 0.,
+            'batches': len(batches)
+        }
+        if data_type == 'train':
+            log.info(f'Padding ratio of {data_type} batches is {self.padding_stats[data_type]["padding_ratio"]:.3f} '
+                     f'({self.padding_stats[data_type]["unbucketed_padding_ratio"]:.3f} without bucketing) '
+                     f'in {len(batches)} batches')
+        return batches
+
     def get_instances(self, data_type: str = 'train') -> Tuple[tuple, tuple]:
         """Get all data for a selected data type
 
@@ -35,6 +35,9 @@ class TFModel(NNModel, metaclass=TfModelMeta):
     """Parent class for all components using TensorFlow."""
 
     sess: tf.Session
+    # set to True in models whose save writes exactly the variables returned by snapshot,
+    # so NNTrainer can save them with write_snapshot in a background thread
+    async_saveable: bool = False
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
@@ -82,6 +85,34 @@ class TFModel(NNModel, metaclass=TfModelMeta):
         values = self.sess.run(tf_vars)
         return tuple(zip([var.name for var in tf_vars], values))
 
+    def snapshot(self, exclude_scopes: tuple = ('Optimizer',)) -> Tuple[Tuple[str, np.ndarray], ...]:
+        """Copy values of the variables saved by :meth:`save` to host memory, keyed by their checkpoint names"""
+        var_list = self._get_saveable_variables(exclude_scopes)
+        if not all(isinstance(var, tf.Variable) for var in var_list):
+            raise NotImplementedError(f'{self.__class__.__name__} has saveable objects which are not variables')
+        values = self.sess.run(var_list)
+        return tuple(zip([var.op.name for var in var_list], values))
+
+    @staticmethod
+    def write_snapshot(snapshot: Iterable[Tuple[str, np.ndarray]], path: Union[Path, str]) -> None:
+        """Write variable values returned by :meth:`snapshot` to a checkpoint which :meth:`load` can restore.
+
+        The checkpoint is written with a separate graph and a CPU-only session, so it can be called from
+        a background thread while the model keeps training.
+        """
+        graph = tf.Graph()
+        with graph.as_default(), tf.device('/cpu:0'):
+            var_dict = {}
+            feed_dict = {}
+            for name, value in snapshot:
+                placeholder = tf.placeholder(tf.as_dtype(value.dtype), shape=value.shape)
+                var_dict[name] = tf.Variable(placeholder, trainable=False)
+                feed_dict[placeholder] = value
+            saver = tf.train.Saver(var_dict)
+            with tf.Session(graph=graph, config=tf.ConfigProto(device_count={'GPU': 0})) as sess:
+                sess.run([var.initializer for var in var_dict.values()], feed_dict=feed_dict)
+                saver.save(sess, str(path), write_meta_graph=False, write_state=False)
+
     @staticmethod
     def _get_saveable_variables(exclude_scopes=tuple()):
         # noinspection PyProtectedMember
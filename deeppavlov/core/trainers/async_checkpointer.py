@@ -0,0 +1,110 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+from logging import getLogger
+from pathlib import Path
+from threading import Thread
+from typing import Any, Callable, List, Optional
+
+log = getLogger(__name__)
+
+
+class AsyncCheckpointer:
+    """Writes checkpoints of a model in a background thread.
+
+    Variable values are copied to host memory with the model's ``snapshot`` method on the training thread and
+    written to disk with its ``write_snapshot`` method in a background thread. Every checkpoint is written under
+    a temporary name and renamed to ``<save_path>-<number>``, then ``<save_path>`` files are replaced with links to
+    it. The ``.index`` file at ``save_path`` is removed before the data files are replaced and restored after them,
+    so an interrupted replacement leaves no checkpoint at ``save_path`` (the numbered one is complete) rather than
+    an index of one checkpoint with the data of another. Only ``keep`` last numbered checkpoints are kept. At most
+    one checkpoint is written at a time.
+
+    Only components with a true ``async_saveable`` attribute are saved in the background, it marks components whose
+    ``save`` writes exactly the values returned by ``snapshot``. Other components (e.g. the ones which write
+    additional files on save) are saved synchronously.
+
+    Args:
+        keep: number of last numbered checkpoints to keep besides the one at ``save_path``
+
+    """
+
+    def __init__(self, keep: int = 1) -> None:
+        self.keep = keep
+        self._thread: Optional[Thread] = None
+        self._error: Optional[BaseException] = None
+        self._saved: List[Path] = []
+        self._number = 0
+
+    def save(self, component: Any) -> bool:
+        """Start writing a checkpoint of the component.
+
+        Returns:
+            ``False`` if the component doesn't support snapshots and has to be saved synchronously
+
+        """
+        if not getattr(component, 'async_saveable', False) or getattr(component, 'save_path', None) is None:
+            return False
+        try:
+            snapshot = component.snapshot()
+        except NotImplementedError as e:
+            log.debug(f'Saving synchronously: {e}')
+            return False
+        self.flush()
+        self._number += 1
+        self._thread = Thread(target=self._write, args=(component.write_snapshot, snapshot, component.save_path,
+                                                        self._number))
+        self._thread.start()
+        return True
+
+    def _write(self, write_snapshot: Callable, snapshot: Any, path: Path, number: int) -> None:
+        try:
+            tmp_prefix = path.with_name(f'.{path.name}.tmp')
+            numbered = path.with_name(f'{path.name}-{number}')
+            write_snapshot(snapshot, tmp_prefix)
+            links = {}
+            for tmp_file in path.parent.glob(f'{tmp_prefix.name}.*'):
+                suffix = tmp_file.name[len(tmp_prefix.name):]
+                numbered_file = numbered.with_name(numbered.name + suffix)
+                os.replace(tmp_file, numbered_file)
+                link = path.with_name(f'.{path.name}{suffix}.link')
+                try:
+                    os.link(numbered_file, link)
+                except OSError:
+                    shutil.copyfile(numbered_file, link)
+                links[suffix] = link
+            index = path.with_name(path.name + '.index')
+            if index.exists():
+                index.unlink()
+            for suffix in sorted(links, key=lambda suffix: suffix == '.index'):
+                os.replace(links[suffix], path.with_name(path.name + suffix))
+            log.info(f'[checkpoint {number} is saved to {path}]')
+            self._saved.append(numbered)
+            while len(self._saved) > self.keep:
+                old = self._saved.pop(0)
+                for old_file in path.parent.glob(f'{old.name}.*'):
+                    old_file.unlink()
+        except BaseException as e:
+            self._error = e
+
+    def flush(self) -> None:
+        """Wait until the checkpoint being written is saved, errors of writing are raised here"""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
@@ -15,15 +15,18 @@
 import datetime
 import json
 import time
+from contextlib import contextmanager
 from itertools import islice
 from logging import getLogger
 from pathlib import Path
-from typing import List, Tuple, Union, Optional, Iterable
+from typing import List, Tuple, Union, Optional, Iterable, Iterator
 
 from deeppavlov.core.common.errors import ConfigError
 from deeppavlov.core.common.registry import register
 from deeppavlov.core.data.data_learning_iterator import DataLearningIterator
+from deeppavlov.core.trainers.async_checkpointer import AsyncCheckpointer
 from deeppavlov.core.trainers.fit_trainer import FitTrainer
+from deeppavlov.core.trainers.prefetcher import BatchPrefetcher
 from deeppavlov.core.trainers.utils import parse_metrics
 
 log = getLogger(__name__)
@@ -72,6 +75,15 @@ class NNTrainer(FitTrainer):
         log_on_k_batches: count of random train batches to calculate metrics in log (default is ``1``)
         max_test_batches: maximum batches count for pipeline testing and evaluation, overrides ``log_on_k_batches``,
             ignored if negative (default is ``-1``)
+        async_save: a flag used to copy variables of the main component to host memory on save and write them to
+            disk in a background thread, supported for TensorFlow models with the ``async_saveable`` attribute; other
+            components are saved synchronously (default is ``False``)
+        keep_checkpoints: number of last numbered checkpoints kept next to the ``save_path`` of the main component
+            if ``async_save`` is set (default is ``1``)
+        prefetch: parameters of :class:`~deeppavlov.core.trainers.prefetcher.BatchPrefetcher`: ``workers``,
+            ``depth`` and ``processes``. If set, train batches are built and passed through the components preceding
+            the trainable one ahead of the training loop in a background thread, ignored if ``None``
+            (default is ``None``)
         **kwargs: additional parameters whose names will be logged but otherwise ignored
 
 
@@ -102,6 +114,7 @@ class NNTrainer(FitTrainer):
                  validate_first: bool = True,
                  validation_patience: int = 5, val_every_n_epochs: int = -1, val_every_n_batches: int = -1,
                  log_every_n_batches: int = -1, log_every_n_epochs: int = -1, log_on_k_batches: int = 1,
+                 async_save: bool = False, keep_checkpoints: int = 1, prefetch: Optional[dict] = None,
                  **kwargs) -> None:
         super().__init__(chainer_config, batch_size=batch_size, metrics=metrics, evaluation_targets=evaluation_targets,
                          show_examples=show_examples, tensorboard_log_dir=tensorboard_log_dir,
@@ -144,6 +157,8 @@ class NNTrainer(FitTrainer):
         self.last_result = {}
         self.losses = []
         self.start_time: Optional[float] = None
+        self._checkpointer = AsyncCheckpointer(keep_checkpoints) if async_save else None
+        self.prefetch = prefetch
 
         if self.tensorboard_log_dir is not None:
             self.tb_train_writer = self._tf.summary.FileWriter(str(self.tensorboard_log_dir / 'train_log'))
@@ -153,6 +168,8 @@ class NNTrainer(FitTrainer):
         if self._loaded:
             raise RuntimeError('Cannot save already finalized chainer')
 
+        if self._checkpointer is not None and self._checkpointer.save(self._chainer.get_main_component()):
+            return
         self._chainer.save()
 
     def _is_initial_validation(self):
@@ -271,6 +288,26 @@ class NNTrainer(FitTrainer):
 
     def train_on_batches(self, iterator: DataLearningIterator) -> None:
         """Train pipeline on batches using provided data iterator and initialization parameters"""
+        prefetcher = None
+        if self.prefetch is not None and self._chainer.train_preprocessor is not None:
+            prefetcher = BatchPrefetcher(self._chainer.train_preprocessor.compute, **self.prefetch)
+        try:
+            self._train_on_batches(iterator, prefetcher)
+        finally:
+            if prefetcher is not None:
+                prefetcher.close()
+
+    @staticmethod
+    @contextmanager
+    def _paused(prefetcher: Optional[BatchPrefetcher]) -> Iterator[None]:
+        """Stop background preprocessing while the training loop calls the pipeline components itself"""
+        if prefetcher is None:
+            yield
+        else:
+            with prefetcher.pause():
+                yield
+
+    def _train_on_batches(self, iterator: DataLearningIterator, prefetcher: Optional[BatchPrefetcher]) -> None:
         self.start_time = time.time()
         if self.validate_first:
             self._validate(iterator)
@@ -278,8 +315,14 @@ class NNTrainer(FitTrainer):
         while True:
             impatient = False
             self._send_event(event_name='before_train')
-            for x, y_true in iterator.gen_batches(self.batch_size, data_type='train'):
-                self.last_result = self._chainer.train_on_batch(x, y_true)
+            batches = iterator.gen_batches(self.batch_size, data_type='train')
+            if prefetcher is not None:
+                batches = prefetcher(batches)
+            for x, y_true, *preprocessed in batches:
+                if preprocessed:
+                    self.last_result = self._chainer.train_step(preprocessed[0])
+                else:
+                    self.last_result = self._chainer.train_on_batch(x, y_true)
                 if self.last_result is None:
                     self.last_result = {}
                 elif not isinstance(self.last_result, dict):
@@ -291,11 +334,14 @@ class NNTrainer(FitTrainer):
                 self.examples += len(x)
 
                 if self.log_every_n_batches > 0 and self.train_batches_seen % self.log_every_n_batches == 0:
-                    self._log(iterator, tensorboard_tag='every_n_batches', tensorboard_index=self.train_batches_seen)
+                    with self._paused(prefetcher):
+                        self._log(iterator, tensorboard_tag='every_n_batches',
+                                  tensorboard_index=self.train_batches_seen)
 
                 if self.val_every_n_batches > 0 and self.train_batches_seen % self.val_every_n_batches == 0:
-                    self._validate(iterator,
-                                   tensorboard_tag='every_n_batches', tensorboard_index=self.train_batches_seen)
+                    with self._paused(prefetcher):
+                        self._validate(iterator,
+                                       tensorboard_tag='every_n_batches', tensorboard_index=self.train_batches_seen)
 
                 self._send_event(event_name='after_batch')
 
@@ -330,16 +376,20 @@ class NNTrainer(FitTrainer):
 
     def train(self, iterator: DataLearningIterator) -> None:
         """Call :meth:`~fit_chainer` and then :meth:`~train_on_batches` with provided data iterator as an argument"""
-        self.fit_chainer(iterator)
-        if callable(getattr(self._chainer, 'train_on_batch', None)):
-            try:
-                self.train_on_batches(iterator)
-            except KeyboardInterrupt:
-                log.info('Stopped training')
-        else:
-            log.warning(f'Using {self.__class__.__name__} for a pipeline without batched training')
-
-        # Run the at-train-exit model-saving logic
-        if self.validation_number < 1:
-            log.info('Save model to capture early training results')
-            self.save()
+        try:
+            self.fit_chainer(iterator)
+            if callable(getattr(self._chainer, 'train_on_batch', None)):
+                try:
+                    self.train_on_batches(iterator)
+                except KeyboardInterrupt:
+                    log.info('Stopped training')
+            else:
+                log.warning(f'Using {self.__class__.__name__} for a pipeline without batched training')
+
+            # Run the at-train-exit model-saving logic
+            if self.validation_number < 1:
+                log.info('Save model to capture early training results')
+                self.save()
+        finally:
+            if self._checkpointer is not None:
+                self._checkpointer.flush()
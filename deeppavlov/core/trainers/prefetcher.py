@@ -0,0 +1,157 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from logging import getLogger
+from queue import Queue, Empty
+from threading import Condition, Event, Thread
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+log = getLogger(__name__)
+
+_END = object()
+
+_worker_preprocess: Optional[Callable] = None
+
+
+def _init_worker(preprocess: Callable) -> None:
+    global _worker_preprocess
+    _worker_preprocess = preprocess
+
+
+def _preprocess_worker(x: tuple, y: tuple) -> Any:
+    return _worker_preprocess(x, y)
+
+
+class BatchPrefetcher:
+    """Builds batches and runs the preprocessing of a training pipeline ahead of the training loop.
+
+    A background thread takes batches from a batches generator and submits their preprocessing to a pool of
+    ``workers`` threads or processes. At most ``depth`` batches are kept ahead of the training loop, and they are
+    returned in the order of the generator. Threads share the pipeline components with the training loop, so code
+    calling the same components, e.g. validation, has to run inside :meth:`pause`. With the default single thread
+    worker batches are preprocessed one at a time in the order of the generator, as in the training loop. Several
+    thread workers call the components concurrently, so they can only be used if all of them are thread-safe.
+
+    Args:
+        preprocess: function of inputs and expected outputs of a batch which returns the arguments of the train step,
+            e.g. :attr:`Chainer.train_preprocessor.compute <deeppavlov.core.common.chainer.Chainer.compute>`
+        workers: number of workers running ``preprocess``, more than one thread worker requires thread-safe
+            pipeline components
+        depth: maximum number of batches prepared ahead of the training loop
+        processes: whether to run ``preprocess`` in processes forked from the calling thread instead of threads.
+            Processes are not limited by GIL, but components state changed after the pool is started is not seen by
+            them and preprocessed batches are pickled. Forking is not available on Windows and is not supported if
+            ``preprocess`` uses TensorFlow, because the forked TensorFlow runtime of the training process is not
+            usable in children
+
+    """
+
+    def __init__(self, preprocess: Callable[[tuple, tuple], Any], workers: int = 1, depth: int = 8,
+                 processes: bool = False) -> None:
+        self.preprocess = preprocess
+        self.workers = workers
+        self.depth = depth
+        self.processes = processes
+        self._pool = None
+        self._condition = Condition()
+        self._paused = False
+        self._pending = 0
+
+    def _start_pool(self) -> None:
+        if self._pool is not None:
+            return
+        if self.processes:
+            # workers are forked, so the pipeline is not pickled
+            self._pool = multiprocessing.get_context('fork').Pool(self.workers, initializer=_init_worker,
+                                                                  initargs=(self.preprocess,))
+        else:
+            self._pool = ThreadPoolExecutor(self.workers)
+
+    def _done(self, *args) -> None:
+        with self._condition:
+            self._pending -= 1
+            self._condition.notify_all()
+
+    def _submit(self, x: tuple, y: tuple) -> Callable[[], Any]:
+        with self._condition:
+            while self._paused:
+                self._condition.wait()
+            self._pending += 1
+            if self.processes:
+                return self._pool.apply_async(_preprocess_worker, (x, y), callback=self._done,
+                                              error_callback=self._done).get
+            future = self._pool.submit(self.preprocess, x, y)
+        future.add_done_callback(self._done)
+        return future.result
+
+    @contextmanager
+    def pause(self) -> Iterator[None]:
+        """Stop submitting new batches and wait until the submitted ones are preprocessed while inside the context"""
+        with self._condition:
+            self._paused = True
+            while self._pending:
+                self._condition.wait()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._paused = False
+                self._condition.notify_all()
+
+    def __call__(self, batches: Iterator[Tuple[tuple, tuple]]) -> Iterator[Tuple[tuple, tuple, Any]]:
+        """Yields inputs, expected outputs and preprocessing results of every batch"""
+        self._start_pool()
+        queue = Queue(self.depth)
+        stop = Event()
+
+        def produce() -> None:
+            try:
+                for x, y_true in batches:
+                    if stop.is_set():
+                        return
+                    queue.put((x, y_true, self._submit(x, y_true)))
+            except BaseException as e:
+                queue.put(e)
+            queue.put(_END)
+
+        producer = Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = queue.get()
+                if item is _END:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                x, y_true, result = item
+                yield x, y_true, result()
+        finally:
+            stop.set()
+            while producer.is_alive():
+                try:
+                    queue.get(timeout=0.1)
+                except Empty:
+                    pass
+
+    def close(self) -> None:
+        if self._pool is not None:
+            if self.processes:
+                self._pool.close()
+                self._pool.join()
+            else:
+                self._pool.shutdown()
+            self._pool = None
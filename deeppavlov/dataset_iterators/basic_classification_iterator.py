@@ -14,7 +14,7 @@
 
 
 from logging import getLogger
-from typing import List
+from typing import List, Optional
 
 from sklearn.model_selection import train_test_split
 
@@ -40,6 +40,8 @@ class BasicClassificationDatasetIterator(DataLearningIterator):
         shuffle: whether to shuffle examples in batches
         split_seed: random seed for splitting dataset, if ``split_seed`` is None, division is based on `seed`.
         stratify: whether to use stratified split
+        bucket_batches: number of batches in mega-batches sorted by length, bucketing is disabled if ``0``
+        max_tokens: maximum number of padded tokens in a batch, ignored if ``None``
         *args: arguments
         **kwargs: arguments
 
@@ -51,13 +53,13 @@ class BasicClassificationDatasetIterator(DataLearningIterator):
                  fields_to_merge: List[str] = None, merged_field: str = None,
                  field_to_split: str = None, split_fields: List[str] = None, split_proportions: List[float] = None,
                  seed: int = None, shuffle: bool = True, split_seed: int = None,
-                 stratify: bool = None,
+                 stratify: bool = None, bucket_batches: int = 0, max_tokens: Optional[int] = None,
                  *args, **kwargs):
         """
         Initialize dataset using data from DatasetReader,
         merges and splits fields according to the given parameters.
         """
-        super().__init__(data, seed=seed, shuffle=shuffle)
+        super().__init__(data, seed=seed, shuffle=shuffle, bucket_batches=bucket_batches, max_tokens=max_tokens)
 
         if fields_to_merge is not None:
             if merged_field is not None:
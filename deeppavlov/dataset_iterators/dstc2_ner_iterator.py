@@ -14,7 +14,7 @@
 
 import json
 import logging
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
 
 from deeppavlov.core.commands.utils import expand_path
 from deeppavlov.core.common.registry import register
@@ -34,17 +34,21 @@ class Dstc2NerDatasetIterator(DataLearningIterator):
         dataset_path: path to dataset
         seed: value for random seed
         shuffle: whether to shuffle the data
+        bucket_batches: number of batches in mega-batches sorted by length, bucketing is disabled if ``0``
+        max_tokens: maximum number of padded tokens in a batch, ignored if ``None``
     """
 
     def __init__(self,
                  data: Dict[str, List[Tuple]],
                  slot_values_path: str,
                  seed: int = None,
-                 shuffle: bool = False):
+                 shuffle: bool = False,
+                 bucket_batches: int = 0,
+                 max_tokens: Optional[int] = None):
         # TODO: include slot vals to dstc2.tar.gz
         with expand_path(slot_values_path).open(encoding='utf8') as f:
             self._slot_vals = json.load(f)
-        super().__init__(data, seed, shuffle)
+        super().__init__(data, seed, shuffle, bucket_batches=bucket_batches, max_tokens=max_tokens)
 
     def preprocess(self,
                    data: List[Tuple[Any, Any]],
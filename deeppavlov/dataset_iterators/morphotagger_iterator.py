@@ -13,7 +13,7 @@
 # limitations under the License.
 
 import random
-from typing import Tuple, List, Dict, Any, Iterator
+from typing import Tuple, List, Dict, Any, Iterator, Optional
 
 import numpy as np
 
@@ -59,14 +59,18 @@ class MorphoTaggerDatasetIterator(DataLearningIterator):
         min_train_fraction: minimal fraction of train data in train+dev dataset,
                 For fair comparison with UD Pipe it is set to 0.9 for UD experiments.
                 It is actually used only for Turkish data.
+        bucket_batches: number of batches in mega-batches sorted by length. If ``bucket_batches`` or ``max_tokens``
+            is set, batches are formed as in :class:`~deeppavlov.core.data.data_learning_iterator.DataLearningIterator`
+            instead of slicing the whole data sorted by length
+        max_tokens: maximum number of padded tokens in a batch, ignored if ``None``
     """
 
     def __init__(self, data: Dict[str, List[Tuple[Any, Any]]], seed: int = None,
                  shuffle: bool = True, min_train_fraction: float = 0.0,
-                 validation_split: float = 0.2) -> None:
+                 validation_split: float = 0.2, bucket_batches: int = 0, max_tokens: Optional[int] = None) -> None:
         self.validation_split = validation_split
         self.min_train_fraction = min_train_fraction
-        super().__init__(data, seed, shuffle)
+        super().__init__(data, seed, shuffle, bucket_batches=bucket_batches, max_tokens=max_tokens)
 
     def split(self, *args, **kwargs) -> None:
         """
@@ -103,16 +107,22 @@ class MorphoTaggerDatasetIterator(DataLearningIterator):
         if shuffle is None:
             shuffle = self.shuffle
         data = self.data[data_type]
-        lengths = [len(x[0]) for x in data]
-        indexes = np.argsort(lengths)
         L = len(data)
         if batch_size < 0:
             batch_size = L
-        starts = list(range(0, L, batch_size))
-        if shuffle:
-            self.random.shuffle(starts)
-        for start in starts:
-            indexes_to_yield = indexes[start:start + batch_size]
+        if self.bucket_batches > 0 or self.max_tokens:
+            order = list(range(L))
+            if shuffle:
+                self.random.shuffle(order)
+            batches = self._bucket_batches(data, order, batch_size, data_type, shuffle) if L else []
+        else:
+            lengths = [len(x[0]) for x in data]
+            indexes = np.argsort(lengths)
+            starts = list(range(0, L, batch_size))
+            if shuffle:
+                self.random.shuffle(starts)
+            batches = [indexes[start:start + batch_size] for start in starts]
+        for indexes_to_yield in batches:
             data_to_yield = tuple(list(x) for x in zip(*([data[i] for i in indexes_to_yield])))
             if return_indexes:
                 yield indexes_to_yield, data_to_yield
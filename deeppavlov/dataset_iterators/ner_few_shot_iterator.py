@@ -34,6 +34,8 @@ class NERFewShotIterator(DataLearningIterator):
         n_train_samples: number of training samples in the few shot setting. The validation and the test sets will be
             the same
         remove_not_targets: whether to replace all non target tags with `O` tag or not.
+        bucket_batches: number of batches in mega-batches sorted by length, bucketing is disabled if ``0``
+        max_tokens: maximum number of padded tokens in a batch, ignored if ``None``
     """
 
     def __init__(self,
@@ -44,8 +46,11 @@ class NERFewShotIterator(DataLearningIterator):
                  filter_bi: bool = True,
                  n_train_samples: int = 20,
                  remove_not_targets: bool = True,
+                 bucket_batches: int = 0,
+                 max_tokens: Optional[int] = None,
                  *args, **kwargs) -> None:
-        super(NERFewShotIterator, self).__init__(data=data, seed=seed, shuffle=shuffle)
+        super(NERFewShotIterator, self).__init__(data=data, seed=seed, shuffle=shuffle, bucket_batches=bucket_batches,
+                                                 max_tokens=max_tokens)
         self.target_tag = target_tag
         self.filter_bi = filter_bi
         self.n_train_samples = n_train_samples
@@ -131,14 +136,20 @@ class NERFewShotIterator(DataLearningIterator):
         if data_len == 0:
             return
 
+        if shuffle is None:
+            shuffle = self.shuffle
+
         order = list(range(data_len))
-        if shuffle is None and self.shuffle:
-            self.random.shuffle(order)
-        elif shuffle:
+        if shuffle:
             self.random.shuffle(order)
 
         if batch_size < 0:
             batch_size = data_len
 
+        if self.bucket_batches > 0 or self.max_tokens:
+            for batch in self._bucket_batches(list(zip(x, y)), order, batch_size, data_type, shuffle):
+                yield tuple(zip(*[(x[o], y[o]) for o in batch]))
+            return
+
         for i in range((data_len - 1) // batch_size + 1):
             yield tuple(zip(*[(x[o], y[o]) for o in order[i * batch_size:(i + 1) * batch_size]]))
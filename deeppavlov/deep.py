@@ -15,11 +15,12 @@
 import argparse
 from logging import getLogger
 
-from deeppavlov.core.commands.infer import interact_model, predict_on_stream
+from deeppavlov.core.commands.infer import interact_model, predict_on_stream, profile_on_stream
 from deeppavlov.core.commands.train import train_evaluate_model_from_config
 from deeppavlov.core.common.cross_validation import calc_cv_score
 from deeppavlov.core.common.file import find_config
 from deeppavlov.download import deep_download
+from deeppavlov.models.vectorizers.tfidf_segments import compact
 from deeppavlov.utils.agent import start_rabbit_service
 from deeppavlov.utils.alexa import start_alexa_server
 from deeppavlov.utils.alice import start_alice_server
@@ -35,7 +36,8 @@ parser = argparse.ArgumentParser()
 
 parser.add_argument("mode", help="select a mode, train or interact", type=str,
                     choices={'train', 'evaluate', 'interact', 'predict', 'telegram', 'msbot', 'alexa', 'alice',
-                             'riseapi', 'risesocket', 'agent-rabbit', 'download', 'install', 'crossval'})
+                             'riseapi', 'risesocket', 'agent-rabbit', 'download', 'install', 'crossval',
+                             'profile', 'compact'})
 parser.add_argument("config_path", help="path to a pipeline json config", type=str)
 
 parser.add_argument("-e", "--start-epoch-num", dest="start_epoch_num", default=None,
@@ -45,8 +47,11 @@ parser.add_argument("--recursive", action="store_true", help="Train nested confi
 parser.add_argument("-b", "--batch-size", dest="batch_size", default=None, help="inference batch size", type=int)
 parser.add_argument("-f", "--input-file", dest="file_path", default=None, help="Path to the input file", type=str)
 parser.add_argument("-d", "--download", action="store_true", help="download model components")
+parser.add_argument("--trace-memory", action="store_true", help="trace memory allocations in profile mode")
 
 parser.add_argument("--folds", help="number of folds", type=int, default=5)
+parser.add_argument("--jobs", help="number of folds trained in parallel processes in crossval mode", type=int,
+                    default=1)
 
 parser.add_argument("-t", "--token", default=None, help="telegram bot token", type=str)
 
@@ -58,6 +63,7 @@ parser.add_argument("--key", default=None, help="ssl key", type=str)
 parser.add_argument("--cert", default=None, help="ssl certificate", type=str)
 
 parser.add_argument("-p", "--port", default=None, help="api port", type=int)
+parser.add_argument("-w", "--workers", default=None, help="number of riseapi worker processes", type=int)
 
 parser.add_argument("--socket-type", default="TCP", type=str, choices={"TCP", "UNIX"})
 parser.add_argument("--socket-file", default="/tmp/deeppavlov_socket.s", type=str)
@@ -110,7 +116,7 @@ def main():
                            ssl_key=args.key,
                            ssl_cert=args.cert)
     elif args.mode == 'riseapi':
-        start_model_server(pipeline_config_path, args.https, args.key, args.cert, port=args.port)
+        start_model_server(pipeline_config_path, args.https, args.key, args.cert, port=args.port, workers=args.workers)
     elif args.mode == 'risesocket':
         start_socket_server(pipeline_config_path, args.socket_type, port=args.port, socket_file=args.socket_file)
     elif args.mode == 'agent-rabbit':
@@ -126,13 +132,17 @@ def main():
                              rabbit_virtualhost=args.rabbit_virtualhost)
     elif args.mode == 'predict':
         predict_on_stream(pipeline_config_path, args.batch_size, args.file_path)
+    elif args.mode == 'profile':
+        profile_on_stream(pipeline_config_path, args.batch_size, args.file_path, args.trace_memory)
+    elif args.mode == 'compact':
+        compact(pipeline_config_path)
     elif args.mode == 'install':
         install_from_config(pipeline_config_path)
     elif args.mode == 'crossval':
         if args.folds < 2:
             log.error('Minimum number of Folds is 2')
         else:
-            calc_cv_score(pipeline_config_path, n_folds=args.folds, is_loo=False)
+            calc_cv_score(pipeline_config_path, n_folds=args.folds, is_loo=False, n_jobs=args.jobs)
 
 
 if __name__ == "__main__":
@@ -49,6 +49,8 @@ class BertClassifierModel(LRScheduledTFModel):
         min_learning_rate: min value of learning rate if learning rate decay is used
     """
 
+    async_saveable = True
+
     # TODO: add warmup
     # TODO: add head-only pre-training
     def __init__(self, bert_config_file, n_classes, keep_prob,
@@ -16,7 +16,7 @@ import re
 from collections import OrderedDict
 from logging import getLogger
 from operator import itemgetter
-from typing import List, Dict, Union
+from typing import List, Dict, Optional, Union
 
 import numpy as np
 import tensorflow as tf
@@ -26,6 +26,7 @@ from bert_dp.preprocessing import InputFeatures
 
 from deeppavlov.core.commands.utils import expand_path
 from deeppavlov.core.common.registry import register
+from deeppavlov.core.models.component import Component
 from deeppavlov.core.models.tf_model import LRScheduledTFModel
 from deeppavlov.models.bert.bert_classifier import BertClassifierModel
 
@@ -124,6 +125,8 @@ class BertSepRankerModel(LRScheduledTFModel):
         min_learning_rate: min value of learning rate if learning rate decay is used
     """
 
+    async_saveable = True
+
     def __init__(self, bert_config_file, keep_prob=0.9,
                  attention_probs_keep_prob=None, hidden_keep_prob=None,
                  optimizer=None, weight_decay_rate=0.01,
@@ -358,11 +361,16 @@ class BertSepRankerPredictor(BertSepRankerModel):
         conts: list of strings containing the base of text contexts
         cont_vecs: BERT vector respresentations of ``conts``, if is ``None`` it will be build
         cont_features: features of ``conts`` to build their BERT vector representations
+        vector_index: vector index component such as
+            :class:`~deeppavlov.models.ranking.vector_index.IVFVectorIndex` to retrieve responses with instead of
+            scoring the whole base. It is built over response vectors, context vectors if ``interact_mode`` is 2
+            or their sums if ``interact_mode`` is 3
     """
 
     def __init__(self, bert_config_file, interact_mode=0, batch_size=32,
                  resps=None, resp_features=None, resp_vecs=None,
-                 conts=None, cont_features=None, cont_vecs=None, **kwargs) -> None:
+                 conts=None, cont_features=None, cont_vecs=None,
+                 vector_index: Optional[Component] = None, **kwargs) -> None:
         super().__init__(bert_config_file=bert_config_file,
                          **kwargs)
 
@@ -391,6 +399,15 @@ class BertSepRankerPredictor(BertSepRankerModel):
             self.cont_vecs /= np.linalg.norm(self.cont_vecs, axis=1, keepdims=True)
             np.save(self.save_path / "cont_vecs", self.resp_vecs)
 
+        self.vector_index = vector_index
+        if self.vector_index is not None:
+            if self.interact_mode == 2:
+                self.vector_index.fit(self.cont_vecs)
+            elif self.interact_mode == 3:
+                self.vector_index.fit(self.resp_vecs + self.cont_vecs)
+            else:
+                self.vector_index.fit(self.resp_vecs)
+
     def train_on_batch(self, features, y):
         pass
 
@@ -433,6 +450,9 @@ class BertSepRankerPredictor(BertSepRankerModel):
         Uses cosine similarity scores over vectors of responses (and corresponding contexts) from the base.
         """
 
+        if self.vector_index is not None:
+            return self._clean_response(self._search_db_response(ctx_vec))
+
         bs = ctx_vec.shape[0]
         if self.interact_mode == 0:
             s = ctx_vec @ self.resp_vecs.T
@@ -462,6 +482,32 @@ class BertSepRankerPredictor(BertSepRankerModel):
             s = (sr + sc) / 2
             ids = np.argmax(s, 1)
             rsp = [[self.resps[ids[i]] for i in range(bs)], [float(s[i][ids[i]]) for i in range(bs)]]
-        # remove special tokens if they are presented
-        rsp = [[el.replace('__eou__', '').replace('__eot__', '').strip() for el in rsp[0]], rsp[1]]
-        return rsp
+        return self._clean_response(rsp)
+
+    def _search_db_response(self, ctx_vec):
+        """Retrieve a text response from the base with ``vector_index`` using the same policies as
+        ``_retrieve_db_response``."""
+
+        bs = ctx_vec.shape[0]
+        if self.interact_mode in (0, 3):
+            ids, s = self.vector_index.search(ctx_vec, 1)
+            ids = ids[:, 0]
+            if self.interact_mode == 0:
+                sc = list(s[:, 0])
+            else:
+                # index is built over sums of response and context vectors, so (sr + sc) / 2 = (s + 2) / 4
+                sc = [float(el) for el in (s[:, 0] + 2) / 4]
+        else:
+            ids, _ = self.vector_index.search(ctx_vec, 10)
+            rerank_vecs = self.cont_vecs if self.interact_mode == 1 else self.resp_vecs
+            s = (np.einsum('ij,ikj->ik', ctx_vec, rerank_vecs[ids]) + 1) / 2
+            s[ids < 0] = -np.inf
+            best = np.argmax(s, 1)
+            sc = [float(s[i, best[i]]) for i in range(bs)]
+            ids = ids[np.arange(bs), best]
+        return [[self.resps[ids[i]] for i in range(bs)], sc]
+
+    @staticmethod
+    def _clean_response(rsp):
+        """Remove special tokens from retrieved responses if they are presented."""
+        return [[el.replace('__eou__', '').replace('__eot__', '').strip() for el in rsp[0]], rsp[1]]
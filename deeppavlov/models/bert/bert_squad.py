@@ -56,6 +56,8 @@ class BertSQuADModel(LRScheduledTFModel):
         min_learning_rate: min value of learning rate if learning rate decay is used
     """
 
+    async_saveable = True
+
     def __init__(self, bert_config_file: str,
                  keep_prob: float,
                  attention_probs_keep_prob: Optional[float] = None,
@@ -17,7 +17,7 @@ from logging import getLogger
 from typing import List, Tuple, Union
 
 import numpy as np
-from scipy.sparse import vstack, csr_matrix
+from scipy.sparse import vstack, csr_matrix, diags
 from scipy.sparse.linalg import norm as sparse_norm
 
 from deeppavlov.core.common.file import load_pickle
@@ -44,6 +44,7 @@ class CosineSimilarityClassifier(Estimator, Serializable):
         self.top_n = top_n
 
         self.x_train_features = self.y_train = None
+        self._x_train_normalized = self._y_labels = self._label_starts = None
 
         if kwargs['mode'] != 'train':
             self.load()
@@ -59,29 +60,21 @@ class CosineSimilarityClassifier(Estimator, Serializable):
         """
 
         if isinstance(q_vects[0], csr_matrix):
-            q_norm = sparse_norm(q_vects)
-            if q_norm == 0.0:
-                cos_similarities = np.zeros((q_vects.shape[0], self.x_train_features.shape[0]))
-            else:
-                norm = q_norm * sparse_norm(self.x_train_features, axis=1)
-                cos_similarities = np.array(q_vects.dot(self.x_train_features.T).todense())
-                cos_similarities = cos_similarities / norm
+            if not isinstance(q_vects, csr_matrix):
+                q_vects = csr_matrix(vstack(list(q_vects)))
+            q_vects = self._normalize(q_vects)
+            cos_similarities = q_vects.dot(self._x_train_normalized.T).toarray()
         elif isinstance(q_vects[0], np.ndarray):
-            q_vects = np.array(q_vects)
-            self.x_train_features = np.array(self.x_train_features)
-            norm = np.linalg.norm(q_vects) * np.linalg.norm(self.x_train_features, axis=1)
-            cos_similarities = q_vects.dot(self.x_train_features.T) / norm
+            q_vects = self._normalize(np.array(q_vects))
+            cos_similarities = q_vects.dot(self._x_train_normalized.T)
         elif q_vects[0] is None:
-            cos_similarities = np.zeros(len(self.x_train_features))
+            cos_similarities = np.zeros((len(q_vects), self._x_train_normalized.shape[0]))
         else:
             raise NotImplementedError('Not implemented this type of vectors')
 
-        # get cosine similarity for each class
-        y_labels = np.unique(self.y_train)
-        labels_scores = np.zeros((len(cos_similarities), len(y_labels)))
-        for i, label in enumerate(y_labels):
-            labels_scores[:, i] = np.max([cos_similarities[:, i]
-                                          for i, value in enumerate(self.y_train) if value == label], axis=0)
+        # get cosine similarity for each class, train samples are sorted by class
+        y_labels = self._y_labels
+        labels_scores = np.maximum.reduceat(cos_similarities, self._label_starts, axis=1)
 
         labels_scores_sum = labels_scores.sum(axis=1, keepdims=True)
         labels_scores = np.divide(labels_scores, labels_scores_sum,
@@ -122,6 +115,30 @@ class CosineSimilarityClassifier(Estimator, Serializable):
             self.x_train_features = x_train_vects
 
         self.y_train = list(y_train)
+        self._build_index()
+
+    @staticmethod
+    def _normalize(vects: Union[csr_matrix, np.ndarray]) -> Union[csr_matrix, np.ndarray]:
+        """Divide every row by its norm, rows with zero norm are left zero."""
+        if isinstance(vects, csr_matrix):
+            norms = sparse_norm(vects, axis=1)
+        else:
+            norms = np.linalg.norm(vects, axis=1)
+        inv_norms = np.divide(1., norms, out=np.zeros_like(norms, dtype=float), where=(norms != 0))
+        if isinstance(vects, csr_matrix):
+            return csr_matrix(diags(inv_norms).dot(vects))
+        return vects * inv_norms[:, np.newaxis]
+
+    def _build_index(self) -> None:
+        """Normalize train features once and sort them by class, so scores of a class are a contiguous slice."""
+        self._y_labels, y_ids = np.unique(self.y_train, return_inverse=True)
+        order = np.argsort(y_ids, kind='stable')
+        self._label_starts = np.searchsorted(y_ids[order], np.arange(len(self._y_labels)))
+        if hasattr(self.x_train_features, 'tocsr'):
+            x_train_features = self.x_train_features.tocsr()
+        else:
+            x_train_features = np.array(self.x_train_features)
+        self._x_train_normalized = self._normalize(x_train_features)[order]
 
     def save(self) -> None:
         """Save classifier parameters"""
@@ -132,3 +149,4 @@ class CosineSimilarityClassifier(Estimator, Serializable):
         """Load classifier parameters"""
         logger.info("Loading faq_model from {}".format(self.load_path))
         self.x_train_features, self.y_train = load_pickle(self.load_path)
+        self._build_index()
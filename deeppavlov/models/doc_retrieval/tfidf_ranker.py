@@ -19,7 +19,7 @@ import numpy as np
 
 from deeppavlov.core.common.registry import register
 from deeppavlov.core.models.estimator import Component
-from deeppavlov.models.vectorizers.hashing_tfidf_vectorizer import HashingTfIdfVectorizer
+from deeppavlov.models.vectorizers.hashing_tfidf_vectorizer import HashingTfIdfVectorizer, Sparse
 
 logger = getLogger(__name__)
 
@@ -33,21 +33,26 @@ class TfidfRanker(Component):
         top_n: a number of doc ids to return
         active: whether to return a number specified by :attr:`top_n` (``True``) or all ids
          (``False``)
+        batched: whether to score the whole batch of queries with one sparse matrix product (``True``)
+         or to score every query separately with dense scores (``False``)
 
     Attributes:
         top_n: a number of doc ids to return
         vectorizer: an instance of vectorizer class
         active: whether to return a number specified by :attr:`top_n` or all ids
+        batched: whether to score the whole batch of queries with one sparse matrix product
         index2doc: inverted :attr:`doc_index`
         iterator: a dataset iterator used for generating batches while fitting the vectorizer
 
     """
 
-    def __init__(self, vectorizer: HashingTfIdfVectorizer, top_n=5, active: bool = True, **kwargs):
+    def __init__(self, vectorizer: HashingTfIdfVectorizer, top_n=5, active: bool = True, batched: bool = True,
+                 **kwargs):
 
         self.top_n = top_n
         self.vectorizer = vectorizer
         self.active = active
+        self.batched = batched
 
     def __call__(self, questions: List[str]) -> Tuple[List[Any], List[float]]:
         """Rank documents and return top n document titles with scores.
@@ -59,19 +64,40 @@ class TfidfRanker(Component):
             a tuple of selected doc ids and their scores
         """
 
-        batch_doc_ids, batch_docs_scores = [], []
-
         q_tfidfs = self.vectorizer(questions)
 
+        if self.active:
+            thresh = self.top_n
+        else:
+            thresh = self.vectorizer.n_docs
+
+        if self.batched and self.active:
+            batch_doc_nums, batch_docs_scores = self.rank_batch(q_tfidfs, thresh)
+        else:
+            batch_doc_nums, batch_docs_scores = self.rank_one_by_one(q_tfidfs, thresh)
+
+        batch_doc_ids = [[self.vectorizer.index2doc[i] for i in doc_nums] for doc_nums in batch_doc_nums]
+        return batch_doc_ids, batch_docs_scores
+
+    def rank_one_by_one(self, q_tfidfs: Sparse, thresh: int) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """Score all documents for every query separately and select top documents from the dense scores.
+
+        Args:
+            q_tfidfs: queries tfidf vectors
+            thresh: a number of documents to select for every query
+
+        Returns:
+            a tuple of selected doc integer ids and their scores
+        """
+        batch_doc_nums, batch_docs_scores = [], []
+        removed = self.vectorizer.get_removed_nums()
+
         for q_tfidf in q_tfidfs:
-            scores = q_tfidf * self.vectorizer.tfidf_matrix
+            scores = self.vectorizer.get_scores(q_tfidf)
             scores = np.squeeze(
                 scores.toarray() + 0.0001)  # add a small value to eliminate zero scores
-
-            if self.active:
-                thresh = self.top_n
-            else:
-                thresh = len(self.vectorizer.doc_index)
+            scores[removed] = -np.inf
+            thresh = min(thresh, len(scores) - len(removed))
 
             if thresh >= len(scores):
                 o = np.argpartition(-scores, len(scores) - 1)[0:thresh]
@@ -79,9 +105,53 @@ class TfidfRanker(Component):
                 o = np.argpartition(-scores, thresh)[0:thresh]
             o_sort = o[np.argsort(-scores[o])]
 
-            doc_scores = scores[o_sort]
-            doc_ids = [self.vectorizer.index2doc[i] for i in o_sort]
-            batch_doc_ids.append(doc_ids)
+            batch_doc_nums.append(o_sort)
+            batch_docs_scores.append(scores[o_sort])
+
+        return batch_doc_nums, batch_docs_scores
+
+    def rank_batch(self, q_tfidfs: Sparse, thresh: int) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """Score all documents for the whole batch with one sparse product and select top documents
+        from the sparse rows without densifying them.
+
+        Documents that don't share any terms with the query have the lowest score, so they are selected only
+        if the query has less than ``thresh`` scored documents. Documents removed from the vectorizer index
+        are never selected.
+
+        Args:
+            q_tfidfs: queries tfidf vectors
+            thresh: a number of documents to select for every query
+
+        Returns:
+            a tuple of selected doc integer ids and their scores
+        """
+        batch_doc_nums, batch_docs_scores = [], []
+
+        scores = self.vectorizer.get_scores(q_tfidfs)
+        removed = self.vectorizer.get_removed_nums()
+        n_docs = scores.shape[1]
+        thresh = min(thresh, n_docs - len(removed))
+
+        for start, end in zip(scores.indptr[:-1], scores.indptr[1:]):
+            row_nums = scores.indices[start:end]
+            row_scores = scores.data[start:end] + 0.0001  # add a small value to eliminate zero scores
+
+            if len(row_scores) > thresh:
+                o = np.argpartition(-row_scores, thresh)[0:thresh]
+            else:
+                o = np.arange(len(row_scores))
+            o_sort = o[np.argsort(-row_scores[o])]
+            doc_nums, doc_scores = row_nums[o_sort], row_scores[o_sort]
+
+            n_fill = thresh - len(doc_nums)
+            if n_fill > 0:
+                candidates = np.arange(min(n_docs, n_fill + len(row_nums) + len(removed)))
+                candidates = candidates[~np.isin(candidates, row_nums) & ~np.isin(candidates, removed)]
+                fill_nums = candidates[:n_fill]
+                doc_nums = np.concatenate([doc_nums, fill_nums])
+                doc_scores = np.concatenate([doc_scores, np.full(len(fill_nums), 0.0001)])
+
+            batch_doc_nums.append(doc_nums)
             batch_docs_scores.append(doc_scores)
 
-        return batch_doc_ids, batch_docs_scores
+        return batch_doc_nums, batch_docs_scores
@@ -15,14 +15,17 @@
 from abc import ABCMeta, abstractmethod
 from logging import getLogger
 from pathlib import Path
-from typing import List, Union, Iterator
+from itertools import chain
+from typing import Dict, List, Optional, Tuple, Union, Iterator
 
 import numpy as np
 from overrides import overrides
 
+from deeppavlov.core.commands.utils import expand_path
 from deeppavlov.core.data.utils import zero_pad
 from deeppavlov.core.models.component import Component
 from deeppavlov.core.models.serializable import Serializable
+from deeppavlov.models.embedders.token_cache import TokenCache
 
 log = getLogger(__name__)
 
@@ -34,24 +37,43 @@ class Embedder(Component, Serializable, metaclass=ABCMeta):
     Args:
         load_path: path where to load pre-trained embedding model from
         pad_zero: whether to pad samples or not
+        store_path: directory with embeddings converted to
+            :class:`~deeppavlov.models.embedders.embedding_store.EmbeddingStore` format. Vocabulary vectors are
+            looked up there with memory mapping. If the directory doesn't exist, embeddings from ``load_path`` are
+            converted on the first start
+        batched: whether to embed the whole batch at once. Every distinct token of the batch is looked up once
+            and samples are gathered into one ``[batch, max_len, dim]`` array if ``pad_zero`` or a list of
+            ``[len, dim]`` arrays otherwise. If ``mean``, a ``[batch, dim]`` array of mean vectors is returned
+            if ``pad_zero`` or a list of mean vectors otherwise
+        return_mask: whether to return a ``[batch, max_len]`` mask of real tokens along with padded embeddings
+            in ``batched`` mode with ``pad_zero``
+        cache_size: maximum number of cached out-of-vocabulary token embeddings, unbounded if ``None``.
+            Embeddings of vocabulary tokens are always kept
 
     Attributes:
         model: model instance
-        tok2emb: dictionary with already embedded tokens
+        store: embedding store opened from ``store_path``
+        tok2emb: cache with already embedded tokens
         dim: dimension of embeddings
         pad_zero: whether to pad sequence of tokens with zeros or not
         mean: whether to return one mean embedding vector per sample
         load_path: path with pre-trained fastText binary model
     """
 
-    def __init__(self, load_path: Union[str, Path], pad_zero: bool = False, mean: bool = False, **kwargs) -> None:
+    def __init__(self, load_path: Union[str, Path], pad_zero: bool = False, mean: bool = False,
+                 store_path: Optional[Union[str, Path]] = None, batched: bool = False, return_mask: bool = False,
+                 cache_size: Optional[int] = None, **kwargs) -> None:
         """
         Initialize embedder with given parameters
         """
         super().__init__(save_path=None, load_path=load_path)
-        self.tok2emb = {}
+        self.store_path = expand_path(store_path) if store_path else None
+        self.store = None
+        self.tok2emb = TokenCache(cache_size)
         self.pad_zero = pad_zero
         self.mean = mean
+        self.batched = batched
+        self.return_mask = return_mask
         self.dim = None
         self.model = None
         self.load()
@@ -75,6 +97,11 @@ class Embedder(Component, Serializable, metaclass=ABCMeta):
         Returns:
             embedded batch
         """
+        if self.batched:
+            embeddings, mask = self.encode_batch(batch, mean)
+            if self.return_mask and mask is not None:
+                return embeddings, mask
+            return embeddings
         batch = [self._encode(sample, mean) for sample in batch]
         if self.pad_zero:
             batch = zero_pad(batch)
@@ -112,17 +139,7 @@ class Embedder(Component, Serializable, metaclass=ABCMeta):
         Returns:
             list of embedded tokens or array of mean values
         """
-        embedded_tokens = []
-        for t in tokens:
-            try:
-                emb = self.tok2emb[t]
-            except KeyError:
-                try:
-                    emb = self._get_word_vector(t)
-                except KeyError:
-                    emb = np.zeros(self.dim, dtype=np.float32)
-                self.tok2emb[t] = emb
-            embedded_tokens.append(emb)
+        embedded_tokens = [self._get_token_vector(t) for t in tokens]
 
         if mean is None:
             mean = self.mean
@@ -134,3 +151,97 @@ class Embedder(Component, Serializable, metaclass=ABCMeta):
             return np.zeros(self.dim, dtype=np.float32)
 
         return embedded_tokens
+
+    def _get_token_vector(self, token: str) -> np.ndarray:
+        """
+        Embed a token using the embedding store, already embedded tokens or ``self.model``
+
+        Args:
+            token: a token
+
+        Returns:
+            embedding vector, zeros for unknown tokens
+        """
+        if self.store is not None:
+            idx = self.store.get_id(token)
+            if idx >= 0:
+                return self.store.vectors[idx]
+        emb = self.tok2emb.get(token)
+        if emb is None:
+            try:
+                emb = self._get_word_vector(token)
+                in_vocab = self._is_in_vocab(token)
+            except KeyError:
+                emb = np.zeros(self.dim, dtype=np.float32)
+                in_vocab = False
+            self.tok2emb.put(token, emb, resident=in_vocab)
+        return emb
+
+    def _is_in_vocab(self, token: str) -> bool:
+        """
+        Check whether a token embedded by ``_get_word_vector`` is in the model vocabulary
+
+        Args:
+            token: a token
+
+        Returns:
+            ``True`` if the token embedding should never be evicted from the cache
+        """
+        return True
+
+    def get_cache_stats(self) -> Dict[str, Union[int, float]]:
+        """
+        Get counters of the embedded tokens cache
+
+        Returns:
+            numbers of resident and evictable cached tokens, hits, misses, evictions and hit rate
+        """
+        return self.tok2emb.get_stats()
+
+    def encode_batch(self, batch: List[List[str]], mean: bool = None) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Embed all samples of the batch at once
+
+        Args:
+            batch: list of tokenized text samples
+            mean: whether to return mean embedding of tokens per sample
+
+        Returns:
+            a tuple of padded embeddings with shape ``[batch, max_len, dim]`` and a boolean mask of real tokens with
+            shape ``[batch, max_len]`` or, if ``mean``, a tuple of mean embeddings with shape ``[batch, dim]`` and
+            ``None``. Without ``pad_zero`` embeddings of samples are returned as a list and the mask is ``None``
+        """
+        if mean is None:
+            mean = self.mean
+
+        # map tokens to rows of a matrix of distinct batch tokens in one pass
+        rows: Dict[str, int] = {}
+        token_ids = np.fromiter((rows.setdefault(t, len(rows)) for t in chain.from_iterable(batch)), dtype=np.int64)
+        lengths = np.array([len(sample) for sample in batch], dtype=np.int64)
+        matrix = np.zeros((len(rows), self.dim), dtype=np.float32)
+        for t, i in rows.items():
+            matrix[i] = self._get_token_vector(t)
+
+        if mean:
+            result = np.zeros((len(batch), self.dim), dtype=np.float32)
+            non_empty = lengths > 0
+            if non_empty.any():
+                # zero vectors of unknown tokens are excluded from the mean
+                known = np.any(matrix != 0, axis=1)[token_ids]
+                starts = np.cumsum(lengths)[non_empty] - lengths[non_empty]
+                sums = np.add.reduceat(matrix[token_ids] * known[:, np.newaxis], starts, axis=0)
+                counts = np.add.reduceat(known.astype(np.int64), starts)
+                result[non_empty] = np.divide(sums, counts[:, np.newaxis], out=np.zeros_like(sums),
+                                              where=counts[:, np.newaxis] > 0)
+            return (result if self.pad_zero else list(result)), None
+
+        if not self.pad_zero:
+            vectors = matrix[token_ids]
+            ends = np.cumsum(lengths)
+            return [vectors[end - length:end] for end, length in zip(ends, lengths)], None
+
+        max_len = int(lengths.max()) if len(lengths) else 0
+        mask = np.arange(max_len) < lengths[:, np.newaxis]
+        embeddings = np.zeros((len(batch), max_len, self.dim), dtype=np.float32)
+        embeddings[mask] = matrix[token_ids]
+        return embeddings, mask
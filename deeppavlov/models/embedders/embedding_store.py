@@ -0,0 +1,245 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+from hashlib import blake2b
+from logging import getLogger
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+logger = getLogger(__name__)
+
+META_FILENAME = 'meta.json'
+SUBWORDS_FILENAME = 'subwords.npy'
+
+
+def _hash(word: bytes) -> int:
+    return int.from_bytes(blake2b(word, digest_size=8).digest(), 'little')
+
+
+def _fasttext_hash(ngram: bytes) -> int:
+    """FNV-1a hash of fastText, bytes are sign-extended as signed chars."""
+    h = 2166136261
+    for byte in ngram:
+        h = ((h ^ (byte | 0xFFFFFF00 if byte > 127 else byte)) * 16777619) & 0xFFFFFFFF
+    return h
+
+
+def get_subword_ids(word: str, minn: int, maxn: int, bucket: int) -> List[int]:
+    """Returns bucket rows of character n-grams of an out-of-vocabulary word the same way as fastText does."""
+    encoded = ('<' + word + '>').encode('utf8')
+    ids = []
+    for i in range(len(encoded)):
+        if encoded[i] & 0xC0 == 0x80:
+            continue
+        j, n = i, 1
+        while j < len(encoded) and n <= maxn:
+            j += 1
+            while j < len(encoded) and encoded[j] & 0xC0 == 0x80:
+                j += 1
+            if n >= minn and not (n == 1 and (i == 0 or j == len(encoded))):
+                ids.append(_fasttext_hash(encoded[i:j]) % bucket)
+            n += 1
+    return ids
+
+
+class EmbeddingStore:
+    """Read-only word embeddings stored as a contiguous matrix and a vocabulary hash table opened with memory mapping.
+
+    The files are mapped into memory instead of being read, so the store opens instantly and processes that open
+    the same store share one copy of the vectors in the page cache. Looked up vectors are views into the mapped
+    matrix and must not be modified. Stores converted from fastText models also keep character n-gram vectors,
+    so vectors of out-of-vocabulary words are computed without the model.
+
+    Args:
+        path: a directory with the store files created by :func:`save_embedding_store`
+
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        with (path / META_FILENAME).open(encoding='utf8') as f:
+            meta = json.load(f)
+        self.dim = meta['dim']
+        self.vectors = np.load(path / 'vectors.npy', mmap_mode='r')
+        self._offsets = np.load(path / 'offsets.npy', mmap_mode='r')
+        self._words = np.load(path / 'words.npy', mmap_mode='r')
+        self._table = np.load(path / 'table.npy', mmap_mode='r')
+        self._mask = len(self._table) - 1
+        self.subword_opts = meta.get('subwords')
+        self.subwords = None
+        if self.subword_opts is not None:
+            self.subwords = np.load(path / SUBWORDS_FILENAME, mmap_mode='r')
+
+    def word(self, idx: int) -> str:
+        return bytes(self._words[self._offsets[idx]:self._offsets[idx + 1]]).decode('utf8')
+
+    def get_id(self, word: str) -> int:
+        """Returns a row of the word in ``vectors`` or ``-1`` if the word is out of vocabulary."""
+        encoded = word.encode('utf8')
+        slot = _hash(encoded) & self._mask
+        while True:
+            idx = int(self._table[slot])
+            if idx < 0:
+                return -1
+            if bytes(self._words[self._offsets[idx]:self._offsets[idx + 1]]) == encoded:
+                return idx
+            slot = (slot + 1) & self._mask
+
+    def get_subword_vector(self, word: str) -> np.ndarray:
+        """Returns the mean of character n-gram vectors of an out-of-vocabulary word, as fastText computes it."""
+        if self.subwords is None:
+            raise ValueError('The embedding store has no subword vectors')
+        ids = get_subword_ids(word, **self.subword_opts)
+        if not ids:
+            return np.zeros(self.dim, dtype=np.float32)
+        return np.mean(self.subwords[ids], axis=0, dtype=np.float32)
+
+    def __getitem__(self, word: str) -> np.ndarray:
+        idx = self.get_id(word)
+        if idx < 0:
+            raise KeyError(word)
+        return self.vectors[idx]
+
+    def __contains__(self, word: str) -> bool:
+        return self.get_id(word) >= 0
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.word(idx) for idx in range(len(self.vectors)))
+
+
+def save_embedding_store(path: Union[str, Path], words_vectors: Iterable[Tuple[str, np.ndarray]], n_words: int,
+                         dim: int, dtype: str = 'float32', subwords: Optional[np.ndarray] = None,
+                         subword_opts: Optional[dict] = None) -> None:
+    """Write word vectors to a directory in :class:`EmbeddingStore` format.
+
+    Files are written to a temporary directory next to ``path`` and moved to ``path`` when they are complete, so
+    processes converting the same vectors at once don't see partially written stores.
+
+    Args:
+        path: a directory to save the store to
+        words_vectors: pairs of a word and its vector, the first vector of a repeated word is kept
+        n_words: number of pairs in ``words_vectors``
+        dim: dimension of vectors
+        dtype: ``float32`` or ``float16``
+        subwords: fastText character n-gram vectors with shape ``[bucket, dim]``
+        subword_opts: ``minn``, ``maxn`` and ``bucket`` arguments of the fastText model for ``subwords``
+
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = Path(tempfile.mkdtemp(prefix=path.name + '.', dir=str(path.parent)))
+
+    table_size = 1
+    while table_size < 2 * n_words:
+        table_size *= 2
+    table = np.full(table_size, -1, dtype=np.int64)
+    mask = table_size - 1
+
+    vectors = open_memmap(str(tmp_path / 'vectors.npy'), mode='w+', dtype=dtype, shape=(n_words, dim))
+    words = []
+    for word, vector in words_vectors:
+        encoded = word.encode('utf8')
+        slot = _hash(encoded) & mask
+        while table[slot] >= 0 and words[table[slot]] != encoded:
+            slot = (slot + 1) & mask
+        if table[slot] >= 0:
+            continue
+        table[slot] = len(words)
+        vectors[len(words)] = vector
+        words.append(encoded)
+    vectors.flush()
+    del vectors
+    if len(words) < n_words:
+        # repeated words were skipped, drop unused rows at the end
+        np.save(tmp_path / 'vectors_trimmed.npy', np.load(tmp_path / 'vectors.npy', mmap_mode='r')[:len(words)])
+        os.replace(tmp_path / 'vectors_trimmed.npy', tmp_path / 'vectors.npy')
+
+    offsets = np.zeros(len(words) + 1, dtype=np.int64)
+    np.cumsum([len(word) for word in words], out=offsets[1:])
+    np.save(tmp_path / 'offsets.npy', offsets)
+    np.save(tmp_path / 'words.npy', np.frombuffer(b''.join(words), dtype=np.uint8))
+    np.save(tmp_path / 'table.npy', table)
+    meta = {'dim': dim, 'dtype': dtype, 'n_words': len(words)}
+    if subwords is not None:
+        np.save(tmp_path / SUBWORDS_FILENAME, np.asarray(subwords, dtype=dtype))
+        meta['subwords'] = subword_opts
+    with (tmp_path / META_FILENAME).open('w', encoding='utf8') as f:
+        json.dump(meta, f)
+
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        if not (path / META_FILENAME).exists():
+            raise
+        logger.info(f'Embedding store {path} was created by another process')
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def convert_word2vec(vectors_path: Union[str, Path], path: Union[str, Path], dtype: str = 'float32') -> None:
+    """Convert embeddings in word2vec text format (with a header line) to :class:`EmbeddingStore` format."""
+    logger.info(f'Converting word2vec embeddings from {vectors_path} to {path}')
+    with open(vectors_path, encoding='utf8') as f:
+        n_words, dim = map(int, f.readline().split())
+
+        def words_vectors() -> Iterator[Tuple[str, np.ndarray]]:
+            for line in f:
+                word, *values = line.rstrip().split(' ')
+                yield word, np.array(values, dtype=np.float32)
+
+        save_embedding_store(path, words_vectors(), n_words, dim, dtype)
+
+
+def save_fasttext_store(model, path: Union[str, Path], dtype: str = 'float32') -> None:
+    """Save vocabulary and character n-gram vectors of a loaded fastText model in :class:`EmbeddingStore` format."""
+    words = model.get_words()
+    args = model.f.getArgs()
+    if args.maxn > 0:
+        subwords = model.get_input_matrix()[len(words):]
+    else:
+        # words without character n-grams have zero vectors if they are out of vocabulary
+        subwords = np.zeros((0, model.get_dimension()), dtype=np.float32)
+    save_embedding_store(path, ((word, model.get_word_vector(word)) for word in words), len(words),
+                         model.get_dimension(), dtype, subwords,
+                         {'minn': args.minn, 'maxn': args.maxn, 'bucket': args.bucket})
+
+
+def convert_fasttext(model_path: Union[str, Path], path: Union[str, Path], dtype: str = 'float32') -> None:
+    """Convert a fastText binary model to :class:`EmbeddingStore` format."""
+    import fasttext
+
+    logger.info(f'Converting fastText embeddings from {model_path} to {path}')
+    save_fasttext_store(fasttext.load_model(str(model_path)), path, dtype)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('vectors_path', help='path to embeddings in word2vec text format or a fastText .bin model')
+    parser.add_argument('save_path', help='directory to save the embedding store to')
+    parser.add_argument('--dtype', choices=['float32', 'float16'], default='float32')
+    args = parser.parse_args()
+    if args.vectors_path.endswith('.bin'):
+        convert_fasttext(args.vectors_path, args.save_path, args.dtype)
+    else:
+        convert_word2vec(args.vectors_path, args.save_path, args.dtype)
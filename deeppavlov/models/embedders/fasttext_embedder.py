@@ -22,6 +22,7 @@ from overrides import overrides
 
 from deeppavlov.core.common.registry import register
 from deeppavlov.models.embedders.abstract_embedder import Embedder
+from deeppavlov.models.embedders.embedding_store import EmbeddingStore, save_fasttext_store
 
 log = getLogger(__name__)
 
@@ -37,22 +38,46 @@ class FasttextEmbedder(Embedder):
 
     Attributes:
         model: fastText model instance
-        tok2emb: dictionary with already embedded tokens
+        tok2emb: cache with already embedded tokens
         dim: dimension of embeddings
         pad_zero: whether to pad sequence of tokens with zeros or not
         load_path: path with pre-trained fastText binary model
     """
 
     def _get_word_vector(self, w: str) -> np.ndarray:
+        if self.model is None:
+            # vocabulary vectors are taken from the store, out-of-vocabulary ones are built from n-gram vectors
+            if self.store.subwords is not None:
+                return self.store.get_subword_vector(w)
+            log.warning(f"[`{self.store_path}` has no subword vectors, loading the fastText model to embed "
+                        f"out-of-vocabulary words, convert the store again to avoid it]")
+            self._load_model()
         return self.model.get_word_vector(w)
 
+    def _is_in_vocab(self, w: str) -> bool:
+        # words of the store vocabulary are never embedded with the model
+        return self.model is not None and self.model.get_word_id(w) != -1
+
+    def _load_model(self) -> None:
+        log.info(f"[loading fastText embeddings from `{self.load_path}`]")
+        self.model = fasttext.load_model(str(self.load_path))
+        self.dim = self.model.get_dimension()
+
     def load(self) -> None:
         """
         Load fastText binary model from self.load_path
         """
-        log.info(f"[loading fastText embeddings from `{self.load_path}`]")
-        self.model = fasttext.load_model(str(self.load_path))
-        self.dim = self.model.get_dimension()
+        if self.store_path is None:
+            self._load_model()
+            return
+        if not self.store_path.exists():
+            self._load_model()
+            log.info(f"[converting fastText vectors to `{self.store_path}`]")
+            save_fasttext_store(self.model, self.store_path)
+            self.model = None
+        log.info(f"[opening fastText embedding store `{self.store_path}`]")
+        self.store = EmbeddingStore(self.store_path)
+        self.dim = self.store.dim
 
     @overrides
     def __iter__(self) -> Iterator[str]:
@@ -62,4 +87,7 @@ class FasttextEmbedder(Embedder):
         Returns:
             iterator
         """
-        yield from self.model.get_words()
+        if self.store is not None:
+            yield from self.store
+        else:
+            yield from self.model.get_words()
@@ -21,6 +21,7 @@ from overrides import overrides
 
 from deeppavlov.core.common.registry import register
 from deeppavlov.models.embedders.abstract_embedder import Embedder
+from deeppavlov.models.embedders.embedding_store import EmbeddingStore, convert_word2vec
 
 log = getLogger(__name__)
 
@@ -36,19 +37,28 @@ class GloVeEmbedder(Embedder):
 
     Attributes:
         model: GloVe model instance
-        tok2emb: dictionary with already embedded tokens
+        tok2emb: cache with already embedded tokens
         dim: dimension of embeddings
         pad_zero: whether to pad sequence of tokens with zeros or not
         load_path: path with pre-trained GloVe model
     """
 
     def _get_word_vector(self, w: str) -> np.ndarray:
+        if self.store is not None:
+            return self.store[w]
         return self.model[w]
 
     def load(self) -> None:
         """
         Load dict of embeddings from given file
         """
+        if self.store_path is not None:
+            if not self.store_path.exists():
+                convert_word2vec(self.load_path, self.store_path)
+            log.info(f"[opening GloVe embedding store `{self.store_path}`]")
+            self.store = EmbeddingStore(self.store_path)
+            self.dim = self.store.dim
+            return
         log.info(f"[loading GloVe embeddings from `{self.load_path}`]")
         if not self.load_path.exists():
             log.warning(f'{self.load_path} does not exist, cannot load embeddings from it!')
@@ -64,11 +74,17 @@ class GloVeEmbedder(Embedder):
         Returns:
             iterator
         """
-        yield from self.model.vocab
+        if self.store is not None:
+            yield from self.store
+        else:
+            yield from self.model.vocab
 
     def serialize(self) -> bytes:
         return pickle.dumps(self.model, protocol=4)
 
     def deserialize(self, data: bytes) -> None:
-        self.model = pickle.loads(data)
-        self.dim = self.model.vector_size
+        model = pickle.loads(data)
+        # embeddings from the store are not serialized and are opened again on load
+        if model is not None:
+            self.model = model
+            self.dim = self.model.vector_size
@@ -0,0 +1,95 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+
+class TokenCache:
+    """Cache of token embeddings that keeps vocabulary tokens resident and evicts least recently used
+    out-of-vocabulary tokens.
+
+    Args:
+        size: Maximum number of cached out-of-vocabulary tokens. If ``None``, the cache is unbounded.
+
+    """
+
+    def __init__(self, size: Optional[int] = None) -> None:
+        self.size = size
+        self._resident: Dict[str, np.ndarray] = {}
+        self._lru: Dict[str, np.ndarray] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token: str) -> Optional[np.ndarray]:
+        """Returns the cached embedding of the token or ``None`` if it is missing."""
+        emb = self._resident.get(token)
+        with self._lock:
+            if emb is None:
+                emb = self._lru.get(token)
+                if emb is not None:
+                    self._lru.move_to_end(token)
+            # counters are updated under the lock, so they are exact when the cache is used from several threads
+            if emb is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return emb
+
+    def put(self, token: str, emb: np.ndarray, resident: bool = False) -> None:
+        """Adds the token embedding to the cache.
+
+        Args:
+            token: A token.
+            emb: The token embedding.
+            resident: Whether the token is in the embeddings vocabulary and should never be evicted.
+
+        """
+        if resident or self.size is None:
+            self._resident[token] = emb
+            return
+        with self._lock:
+            self._lru[token] = emb
+            self._lru.move_to_end(token)
+            while len(self._lru) > self.size:
+                self._lru.popitem(last=False)
+                self.evictions += 1
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._resident or token in self._lru
+
+    def __len__(self) -> int:
+        return len(self._resident) + len(self._lru)
+
+    def get_stats(self) -> Dict[str, Union[int, float]]:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'resident': len(self._resident),
+                'size': len(self._lru),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / requests if requests else 0.
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._resident.clear()
+            self._lru.clear()
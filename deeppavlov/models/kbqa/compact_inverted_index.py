@@ -0,0 +1,169 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+from logging import getLogger
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple, Union
+
+import numpy as np
+
+log = getLogger(__name__)
+
+
+def _save_strings(path: Path, name: str, strings: List[str]) -> None:
+    encoded = [string.encode('utf8') for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(string) for string in encoded], out=offsets[1:])
+    np.save(path / f'{name}.npy', np.frombuffer(b''.join(encoded), dtype=np.uint8))
+    np.save(path / f'{name}_offsets.npy', offsets)
+
+
+class StringArray:
+    """Read-only list of strings stored as one utf8 blob and an array of offsets opened with memory mapping"""
+
+    def __init__(self, path: Union[str, Path], name: str) -> None:
+        path = Path(path)
+        self._data = np.load(path / f'{name}.npy', mmap_mode='r')
+        self._offsets = np.load(path / f'{name}_offsets.npy', mmap_mode='r')
+
+    def get_bytes(self, idx: int) -> bytes:
+        return bytes(self._data[self._offsets[idx]:self._offsets[idx + 1]])
+
+    def __getitem__(self, idx: int) -> str:
+        return self.get_bytes(idx).decode('utf8')
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[idx] for idx in range(len(self)))
+
+
+class EntityNames:
+    """Read-only list of titles and aliases of every entity, the first name of an entity is its title"""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self._names = StringArray(path, 'names')
+        self._entity_offsets = np.load(Path(path) / 'entity_names_offsets.npy', mmap_mode='r')
+
+    def __getitem__(self, entity_num: int) -> List[str]:
+        return [self._names[idx] for idx in range(self._entity_offsets[entity_num],
+                                                  self._entity_offsets[entity_num + 1])]
+
+    def __len__(self) -> int:
+        return len(self._entity_offsets) - 1
+
+
+class CompactInvertedIndex:
+    """Inverted index of entity titles stored in memory-mapped files.
+
+    Tokens are kept in a sorted string table and looked up with binary search. Postings of every token are
+    sorted int32 arrays of entity numbers and entity popularities (numbers of triplets). Entity ids and names are
+    kept as offset-indexed string blobs. Nothing is loaded into memory on opening, so the index opens instantly and
+    processes opening the same index share its pages.
+    The index supports the same lookups as a dict of the pickled inverted index: ``token in index``,
+    ``index[token]`` and ``index.keys()``.
+
+    Args:
+        path: a directory with the index files created by :meth:`build`
+
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        self._keys = StringArray(path, 'keys')
+        self._posting_offsets = np.load(path / 'posting_offsets.npy', mmap_mode='r')
+        self._entity_nums = np.load(path / 'entity_nums.npy', mmap_mode='r')
+        self._popularities = np.load(path / 'popularities.npy', mmap_mode='r')
+        self.entities_list = StringArray(path, 'entities')
+        self.q2name = EntityNames(path)
+
+    @staticmethod
+    def build(path: Union[str, Path], inverted_index: Dict[str, List[Tuple[int, int]]], entities_list: List[str],
+              q2name: List[List[str]]) -> None:
+        """Save the inverted index, entities list and entity names to the ``path`` directory.
+
+        Args:
+            path: a directory to save the index to
+            inverted_index: dict of tokens and lists of (entity number, entity popularity) tuples
+            entities_list: entity ids
+            q2name: titles and aliases of every entity
+
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = Path(tempfile.mkdtemp(prefix=path.name + '.', dir=str(path.parent)))
+
+        keys = sorted(inverted_index)
+        posting_offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum([len(inverted_index[key]) for key in keys], out=posting_offsets[1:])
+        entity_nums = np.empty(posting_offsets[-1], dtype=np.int32)
+        popularities = np.empty(posting_offsets[-1], dtype=np.int32)
+        for n, key in enumerate(keys):
+            postings = np.array(sorted(inverted_index[key]), dtype=np.int64).reshape(-1, 2)
+            entity_nums[posting_offsets[n]:posting_offsets[n + 1]] = postings[:, 0]
+            popularities[posting_offsets[n]:posting_offsets[n + 1]] = postings[:, 1]
+        _save_strings(tmp_path, 'keys', keys)
+        np.save(tmp_path / 'posting_offsets.npy', posting_offsets)
+        np.save(tmp_path / 'entity_nums.npy', entity_nums)
+        np.save(tmp_path / 'popularities.npy', popularities)
+
+        _save_strings(tmp_path, 'entities', list(entities_list))
+        entity_names_offsets = np.zeros(len(q2name) + 1, dtype=np.int64)
+        np.cumsum([len(names) for names in q2name], out=entity_names_offsets[1:])
+        _save_strings(tmp_path, 'names', [name for names in q2name for name in names])
+        np.save(tmp_path / 'entity_names_offsets.npy', entity_names_offsets)
+
+        if path.exists():
+            shutil.rmtree(path)
+        os.replace(tmp_path, path)
+        log.info(f'Compact inverted index with {len(keys)} tokens and {len(entities_list)} entities is saved '
+                 f'to {path}')
+
+    def _find(self, token: str) -> int:
+        encoded = token.encode('utf8')
+        low, high = 0, len(self._keys)
+        while low < high:
+            mid = (low + high) // 2
+            if self._keys.get_bytes(mid) < encoded:
+                low = mid + 1
+            else:
+                high = mid
+        if low < len(self._keys) and self._keys.get_bytes(low) == encoded:
+            return low
+        return -1
+
+    def postings(self, token: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns arrays of numbers and popularities of entities which titles contain the token."""
+        idx = self._find(token)
+        if idx < 0:
+            raise KeyError(token)
+        start, end = self._posting_offsets[idx], self._posting_offsets[idx + 1]
+        return self._entity_nums[start:end], self._popularities[start:end]
+
+    def __getitem__(self, token: str) -> List[Tuple[int, int]]:
+        entity_nums, popularities = self.postings(token)
+        return list(zip(entity_nums.tolist(), popularities.tolist()))
+
+    def __contains__(self, token: str) -> bool:
+        return self._find(token) >= 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def keys(self) -> Iterator[str]:
+        return iter(self._keys)
@@ -19,6 +19,7 @@ from typing import List, Dict, Tuple, Optional, Any
 from collections import defaultdict
 
 import nltk
+import numpy as np
 import pymorphy2
 from nltk.corpus import stopwords
 from rapidfuzz import fuzz
@@ -30,6 +31,8 @@ from deeppavlov.core.models.serializable import Serializable
 from deeppavlov.core.commands.utils import expand_path
 from deeppavlov.core.common.file import load_pickle, save_pickle
 from deeppavlov.models.spelling_correction.levenshtein.levenshtein_searcher import LevenshteinSearcher
+from deeppavlov.models.spelling_correction.levenshtein.symmetric_delete import SymmetricDeleteSearcher
+from deeppavlov.models.kbqa.compact_inverted_index import CompactInvertedIndex
 from deeppavlov.models.kbqa.rel_ranking_bert_infer import RelRankerBertInfer
 
 log = getLogger(__name__)
@@ -65,6 +68,9 @@ class EntityLinker(Component, Serializable):
                  use_descriptions: bool = False,
                  lemmatize: bool = False,
                  use_prefix_tree: bool = False,
+                 typos_searcher: str = "levenshtein",
+                 index_format: str = "pickle",
+                 compact_index_dirname: str = "compact_inverted_index",
                  **kwargs) -> None:
         """
 
@@ -88,12 +94,20 @@ class EntityLinker(Component, Serializable):
             use_descriptions: whether to use context and descriptions of entities for entity ranking
             lemmatize: whether to lemmatize tokens of extracted entity
             use_prefix_tree: whether to use prefix tree for search of entities with typos in entity labels
+            typos_searcher: "levenshtein" to search words with typos over the prefix tree or "symmetric_delete" to
+                look them up in the symmetric delete index saved to "symmetric_delete_index" directory in save_path
+            index_format: "pickle" to load the inverted index, entities list and entity names into memory or
+                "compact" to use them from memory-mapped files, which are converted from the pickle files once
+            compact_index_dirname: name of the directory in save_path with the compact inverted index files
             **kwargs:
         """
         super().__init__(save_path=save_path, load_path=load_path)
         self.morph = pymorphy2.MorphAnalyzer()
         self.lemmatize = lemmatize
         self.use_prefix_tree = use_prefix_tree
+        self.typos_searcher = typos_searcher
+        self.index_format = index_format
+        self.compact_index_path = (self.save_path or self.load_path) / compact_index_dirname
         self.inverted_index_filename = inverted_index_filename
         self.entities_list_filename = entities_list_filename
         self.build_inverted_index = build_inverted_index
@@ -118,13 +132,6 @@ class EntityLinker(Component, Serializable):
         self.rel_ranker = rel_ranker
         self.use_descriptions = use_descriptions
 
-        if self.use_prefix_tree:
-            alphabet = "!#%\&'()+,-./0123456789:;?ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz½¿ÁÄ" + \
-                       "ÅÆÇÉÎÓÖ×ÚßàáâãäåæçèéêëíîïðñòóôöøùúûüýāăąćČčĐėęěĞğĩīİıŁłńňŌōőřŚśşŠšťũūůŵźŻżŽžơưșȚțəʻ" + \
-                       "ʿΠΡβγБМавдежикмностъяḤḥṇṬṭầếờợ–‘’Ⅲ−∗"
-            dictionary_words = list(self.inverted_index.keys())
-            self.searcher = LevenshteinSearcher(alphabet, dictionary_words)
-
         if self.build_inverted_index:
             if self.kb_format == "hdt":
                 self.doc = HDTDocument(str(expand_path(self.kb_filename)))
@@ -133,10 +140,36 @@ class EntityLinker(Component, Serializable):
                 self.cursor = self.conn.cursor()
             self.inverted_index_builder()
             self.save()
+            if self.index_format == "compact":
+                self.load()
         else:
             self.load()
 
+        # the searcher is built over the inverted index keys, so the index should be loaded first
+        if self.use_prefix_tree:
+            if self.typos_searcher == "symmetric_delete":
+                index_path = (self.save_path or self.load_path) / "symmetric_delete_index"
+                if self.build_inverted_index or not index_path.exists():
+                    SymmetricDeleteSearcher.build(index_path, self.inverted_index.keys(), max_distance=1)
+                self.searcher = SymmetricDeleteSearcher(index_path)
+            else:
+                alphabet = "!#%\&'()+,-./0123456789:;?ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz½¿ÁÄ" + \
+                           "ÅÆÇÉÎÓÖ×ÚßàáâãäåæçèéêëíîïðñòóôöøùúûüýāăąćČčĐėęěĞğĩīİıŁłńňŌōőřŚśşŠšťũūůŵźŻżŽžơưșȚțəʻ" + \
+                           "ʿΠΡβγБМавдежикмностъяḤḥṇṬṭầếờợ–‘’Ⅲ−∗"
+                dictionary_words = list(self.inverted_index.keys())
+                self.searcher = LevenshteinSearcher(alphabet, dictionary_words)
+
     def load(self) -> None:
+        if self.index_format == "compact":
+            if not self.compact_index_path.exists():
+                CompactInvertedIndex.build(self.compact_index_path,
+                                           load_pickle(self.load_path / self.inverted_index_filename),
+                                           load_pickle(self.load_path / self.entities_list_filename),
+                                           load_pickle(self.load_path / self.q2name_filename))
+            self.inverted_index = CompactInvertedIndex(self.compact_index_path)
+            self.entities_list = self.inverted_index.entities_list
+            self.q2name = self.inverted_index.q2name
+            return
         self.inverted_index = load_pickle(self.load_path / self.inverted_index_filename)
         self.entities_list = load_pickle(self.load_path / self.entities_list_filename)
         self.q2name = load_pickle(self.load_path / self.q2name_filename)
@@ -147,6 +180,8 @@ class EntityLinker(Component, Serializable):
         save_pickle(self.q2name, self.save_path / self.q2name_filename)
         if self.q2descr_filename is not None:
             save_pickle(self.q2descr, self.save_path / self.q2descr_filename)
+        if self.index_format == "compact":
+            CompactInvertedIndex.build(self.compact_index_path, self.inverted_index, self.entities_list, self.q2name)
 
     def __call__(self, entity_substr_batch: List[List[str]], entity_positions_batch: List[List[List[int]]] = None,
                        context_tokens: List[List[str]] = None) -> Tuple[List[List[List[str]]], List[List[List[float]]]]:
@@ -183,27 +218,40 @@ class EntityLinker(Component, Serializable):
 
     def candidate_entities_inverted_index(self, entity: str) -> List[Tuple[Any, Any, Any]]:
         word_tokens = nltk.word_tokenize(entity.lower())
-        candidate_entities = []
+        found_tokens = []
 
         for tok in word_tokens:
             if len(tok) > 1:
                 found = False
                 if tok in self.inverted_index:
-                    candidate_entities += self.inverted_index[tok]
+                    found_tokens.append(tok)
                     found = True
 
                 if self.lemmatize:
                     morph_parse_tok = self.morph.parse(tok)[0]
                     lemmatized_tok = morph_parse_tok.normal_form
                     if lemmatized_tok in self.inverted_index:
-                        candidate_entities += self.inverted_index[lemmatized_tok]
+                        found_tokens.append(lemmatized_tok)
                         found = True
 
                 if not found and self.use_prefix_tree:
                     words_with_levens_1 = self.searcher.search(tok, d=1)
                     for word in words_with_levens_1:
-                        candidate_entities += self.inverted_index[word[0]]
-        candidate_entities = list(set(candidate_entities))
+                        found_tokens.append(word[0])
+
+        if isinstance(self.inverted_index, CompactInvertedIndex):
+            if not found_tokens:
+                return []
+            # postings are merged as arrays, tuples are made only for distinct entities
+            postings = [self.inverted_index.postings(tok) for tok in found_tokens]
+            entity_nums, positions = np.unique(np.concatenate([nums for nums, _ in postings]), return_index=True)
+            popularities = np.concatenate([pops for _, pops in postings])[positions]
+            candidate_entities = list(zip(entity_nums.tolist(), popularities.tolist()))
+        else:
+            candidate_entities = []
+            for tok in found_tokens:
+                candidate_entities += self.inverted_index[tok]
+            candidate_entities = list(set(candidate_entities))
         candidate_entities = [(entity[0], self.entities_list[entity[0]], entity[1]) for entity in candidate_entities]
 
         return candidate_entities
@@ -147,16 +147,25 @@ class QueryGenerator(QueryGeneratorBase):
         entity_combs = make_combs(selected_entity_ids, permut=True)
         type_combs = make_combs(selected_type_ids, permut=False)
         log.debug(f"(query_parser)entity_combs: {entity_combs[:3]}, type_combs: {type_combs[:3]}, rel_combs: {rel_combs[:3]}")
-        for comb_num, combs in enumerate(itertools.product(entity_combs, type_combs, rel_combs)):
-            query_hdt_seq = [
-                fill_query(query_hdt_elem, combs[0], combs[1], combs[2]) for query_hdt_elem in query_sequence]
-            if comb_num == 0:
-                log.debug(f"\n_______________________________\nfilled query: {query_hdt_seq}\n_______________________________\n")
-            candidate_output = self.wiki_parser(
-                rels_from_query + answer_ent, query_hdt_seq, filter_info, order_info)
-            candidate_outputs += [combs[2][:-1] + output for output in candidate_output]
-            if return_if_found and candidate_output:
-                return candidate_outputs
+        all_combs = list(itertools.product(entity_combs, type_combs, rel_combs))
+        query_hdt_seqs = [[fill_query(query_hdt_elem, combs[0], combs[1], combs[2])
+                           for query_hdt_elem in query_sequence] for combs in all_combs]
+        if query_hdt_seqs:
+            log.debug(f"\n_______________________________\nfilled query: {query_hdt_seqs[0]}\n_______________________________\n")
+        if return_if_found:
+            for combs, query_hdt_seq in zip(all_combs, query_hdt_seqs):
+                candidate_output = self.wiki_parser(
+                    rels_from_query + answer_ent, query_hdt_seq, filter_info, order_info)
+                candidate_outputs += [combs[2][:-1] + output for output in candidate_output]
+                if candidate_output:
+                    return candidate_outputs
+        else:
+            n_queries = len(query_hdt_seqs)
+            candidate_output_batch = self.wiki_parser.execute_batch(
+                [rels_from_query + answer_ent] * n_queries, query_hdt_seqs, [filter_info] * n_queries,
+                [order_info] * n_queries)
+            for combs, candidate_output in zip(all_combs, candidate_output_batch):
+                candidate_outputs += [combs[2][:-1] + output for output in candidate_output]
         log.debug(f"(query_parser)loop time: {datetime.datetime.now() - start_time}")
         log.debug(f"(query_parser)final outputs: {candidate_outputs[:3]}")
 
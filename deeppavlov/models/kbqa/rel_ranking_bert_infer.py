@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from logging import getLogger
-from typing import Tuple, List, Any
+from typing import Tuple, List, Any, Dict
 
 from deeppavlov.core.common.registry import register
 from deeppavlov.core.models.component import Component
@@ -42,7 +42,7 @@ class RelRankerBertInfer(Component, Serializable):
             rel_q2name_filename: name of file which maps relation id to name
             wiki_parser: component deeppavlov.models.wiki_parser
             ranker: component deeppavlov.models.ranking.rel_ranker
-            batch_size: infering batch size
+            batch_size: infering batch size, pairs of all questions of the input batch are scored together
             rels_to_leave: how many relations to leave after relation ranking
             **kwargs:
         """
@@ -52,6 +52,7 @@ class RelRankerBertInfer(Component, Serializable):
         self.wiki_parser = wiki_parser
         self.batch_size = batch_size
         self.rels_to_leave = rels_to_leave
+        self.rels_labels_cache: Dict[Tuple[str, ...], str] = {}
         self.load()
 
     def load(self) -> None:
@@ -61,60 +62,81 @@ class RelRankerBertInfer(Component, Serializable):
         pass
 
     def __call__(self, questions_list: List[str], candidate_answers_list: List[List[Tuple[str]]]) -> List[str]:
-        answers = []
-        for question, candidate_answers in zip(questions_list, candidate_answers_list):
-            answers_with_scores = []
-            answer = "Not Found"
-
-            n_batches = len(candidate_answers) // self.batch_size + int(len(candidate_answers) % self.batch_size > 0)
-            for i in range(n_batches):
-                questions_batch = []
-                rels_labels_batch = []
-                answers_batch = []
-                for candidate_ans_and_rels in candidate_answers[i * self.batch_size: (i + 1) * self.batch_size]:
-                    candidate_rels = candidate_ans_and_rels[:-1]
-                    candidate_rels = [candidate_rel.split('/')[-1] for candidate_rel in candidate_rels]
-                    candidate_answer = candidate_ans_and_rels[-1]
-                    candidate_rels = " # ".join([self.rel_q2name[candidate_rel] \
-                                                 for candidate_rel in candidate_rels if
-                                                 candidate_rel in self.rel_q2name])
-
-                    if candidate_rels:
-                        questions_batch.append(question)
-                        rels_labels_batch.append(candidate_rels)
-                        answers_batch.append(candidate_answer)
-
-                probas = self.ranker(questions_batch, rels_labels_batch)
-                probas = [proba[1] for proba in probas]
-                for j, (answer, rels_labels) in enumerate(zip(answers_batch, rels_labels_batch)):
-                    answers_with_scores.append((answer, rels_labels, probas[j]))
-
-            answers_with_scores = sorted(answers_with_scores, key=lambda x: x[-1], reverse=True)
+        questions_batch, rels_labels_batch, answers_batch, question_nums = [], [], [], []
+        for question_num, (question, candidate_answers) in enumerate(zip(questions_list, candidate_answers_list)):
+            for candidate_ans_and_rels in candidate_answers:
+                candidate_rels = self._rels_labels(tuple(candidate_ans_and_rels[:-1]))
+                if candidate_rels:
+                    questions_batch.append(question)
+                    rels_labels_batch.append(candidate_rels)
+                    answers_batch.append(candidate_ans_and_rels[-1])
+                    question_nums.append(question_num)
+
+        probas = self.score_pairs(questions_batch, rels_labels_batch)
+        answers_with_scores_list = [[] for _ in questions_list]
+        for question_num, answer, rels_labels, proba in zip(question_nums, answers_batch, rels_labels_batch, probas):
+            answers_with_scores_list[question_num].append((answer, rels_labels, proba))
 
+        top_answers = {}
+        for question_num, answers_with_scores in enumerate(answers_with_scores_list):
             if answers_with_scores:
-                log.debug(f"answers: {answers_with_scores[0]}")
-                answer = self.wiki_parser.find_label(answers_with_scores[0][0])
+                best = max(answers_with_scores, key=lambda x: x[-1])
+                log.debug(f"answers: {best}")
+                top_answers[question_num] = best[0]
+
+        labels = dict(zip(top_answers, self.wiki_parser.find_labels(top_answers.values())))
+        return [labels.get(question_num, "Not Found") for question_num in range(len(questions_list))]
 
-            answers.append(answer)
+    def _rels_labels(self, candidate_rels: Tuple[str, ...]) -> str:
+        rels_labels = self.rels_labels_cache.get(candidate_rels)
+        if rels_labels is None:
+            rel_ids = [candidate_rel.split('/')[-1] for candidate_rel in candidate_rels]
+            rels_labels = " # ".join([self.rel_q2name[rel_id] for rel_id in rel_ids if rel_id in self.rel_q2name])
+            self.rels_labels_cache[candidate_rels] = rels_labels
+        return rels_labels
 
-        return answers
+    def score_pairs(self, questions: List[str], rels_labels: List[str]) -> List[float]:
+        """Score (question, relations labels) pairs of the whole batch with the ranker.
+
+        Identical pairs are scored once, and pairs are sorted by length before they are split into ranker batches
+        of ``batch_size``, so that pairs of similar length are padded together.
+
+        Args:
+            questions: questions
+            rels_labels: labels of candidate relations for every question
+
+        Returns:
+            probabilities that relations correspond to questions
+        """
+        pairs = list(zip(questions, rels_labels))
+        unique_pairs = sorted(set(pairs), key=lambda pair: (len(pair[0]) + len(pair[1]), pair))
+        scores = {}
+        for i in range(0, len(unique_pairs), self.batch_size):
+            pairs_batch = unique_pairs[i:i + self.batch_size]
+            probas = self.ranker([question for question, _ in pairs_batch], [labels for _, labels in pairs_batch])
+            for pair, proba in zip(pairs_batch, probas):
+                scores[pair] = proba[1]
+        return [scores[pair] for pair in pairs]
 
     def rank_rels(self, question: str, candidate_rels: List[str]) -> List[Tuple[str, Any]]:
-        rels_with_scores = []
-        n_batches = len(candidate_rels) // self.batch_size + int(len(candidate_rels) % self.batch_size > 0)
-        for i in range(n_batches):
-            questions_batch = []
-            rels_labels_batch = []
-            rels_batch = []
-            for candidate_rel in candidate_rels[i * self.batch_size: (i + 1) * self.batch_size]:
+        return self.rank_rels_batch([question], [candidate_rels])[0]
+
+    def rank_rels_batch(self, questions: List[str],
+                        candidate_rels_list: List[List[str]]) -> List[List[Tuple[str, Any]]]:
+        """Rank candidate relations of every question of a batch with shared ranker batches"""
+        questions_batch, rels_labels_batch, rels_batch, question_nums = [], [], [], []
+        for question_num, (question, candidate_rels) in enumerate(zip(questions, candidate_rels_list)):
+            for candidate_rel in candidate_rels:
                 if candidate_rel in self.rel_q2name:
                     questions_batch.append(question)
                     rels_batch.append(candidate_rel)
                     rels_labels_batch.append(self.rel_q2name[candidate_rel])
-            probas = self.ranker(questions_batch, rels_labels_batch)
-            probas = [proba[1] for proba in probas]
-            for j, rel in enumerate(rels_batch):
-                rels_with_scores.append((rel, probas[j]))
-        rels_with_scores = sorted(rels_with_scores, key=lambda x: x[1], reverse=True)
+                    question_nums.append(question_num)
+
+        probas = self.score_pairs(questions_batch, rels_labels_batch)
+        rels_with_scores_list = [[] for _ in questions]
+        for question_num, rel, proba in zip(question_nums, rels_batch, probas):
+            rels_with_scores_list[question_num].append((rel, proba))
 
-        return rels_with_scores[:self.rels_to_leave]
+        return [sorted(rels_with_scores, key=lambda x: x[1], reverse=True)[:self.rels_to_leave]
+                for rels_with_scores in rels_with_scores_list]
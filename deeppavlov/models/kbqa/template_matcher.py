@@ -12,30 +12,95 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import re
-import multiprocessing as mp
 import json
-import functools
+import re
 from logging import getLogger
-from typing import Tuple, List
+from typing import Any, Dict, List, Optional, Pattern, Set, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
 
 from deeppavlov.core.common.registry import register
-from deeppavlov.core.models.component import Component
 from deeppavlov.core.models.serializable import Serializable
 
 log = getLogger(__name__)
 
 
-class RegexpMatcher:
-    def __init__(self, question):
-        self.question = question
+def required_literals(pattern: Pattern) -> List[str]:
+    """Returns literal substrings which every match of the pattern contains.
+
+    Only literals outside of alternations, repetitions and lookarounds are collected, so the result is
+    a subset of the really required substrings. Case-insensitive patterns and groups with a scoped
+    case-insensitive flag like ``(?i:...)`` have no required literals.
+    """
+    if pattern.flags & re.IGNORECASE:
+        return []
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return []
+
+    def collect(subpattern) -> List[str]:
+        literals, current = [], []
+        for op, av in subpattern:
+            if op is sre_parse.LITERAL:
+                current.append(chr(av))
+                continue
+            if current:
+                literals.append(''.join(current))
+                current = []
+            # av is (group, add_flags, del_flags, subpattern) since python 3.6
+            if op is sre_parse.SUBPATTERN and not (len(av) > 2 and av[1] & re.IGNORECASE):
+                literals += collect(av[-1])
+        if current:
+            literals.append(''.join(current))
+        return literals
+
+    return collect(parsed)
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton that finds which of the keywords occur in a text in one pass over the text
+
+    Args:
+        keywords: keywords to search
+    """
 
-    def __call__(self, template):
-        res = re.findall(template["template_regexp"], self.question)
-        found_template = []
-        if res:
-            found_template.append((res[0], template))
-        return found_template
+    def __init__(self, keywords: List[str]) -> None:
+        self.goto: List[Dict[str, int]] = [{}]
+        self.output: List[Set[int]] = [set()]
+        for keyword_id, keyword in enumerate(keywords):
+            node = 0
+            for char in keyword:
+                if char not in self.goto[node]:
+                    self.goto.append({})
+                    self.output.append(set())
+                    self.goto[node][char] = len(self.goto) - 1
+                node = self.goto[node][char]
+            self.output[node].add(keyword_id)
+        self.fail = [0] * len(self.goto)
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fail = self.fail[node]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[child] = self.goto[fail].get(char, 0)
+                self.output[child] |= self.output[self.fail[child]]
+
+    def find(self, text: str) -> Set[int]:
+        """Returns ids of keywords which occur in the text"""
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            found |= self.output[node]
+        return found
 
 
 @register('template_matcher')
@@ -43,40 +108,62 @@ class TemplateMatcher(Serializable):
     """
         This class matches the question with one of the templates
         to extract entity substrings and define which relations
-        corresponds to the question
+        corresponds to the question.
+        Template regexps are compiled once on load. Literal substrings required by every template are searched
+        in the question with one Aho-Corasick pass, and only templates which required substrings are all found
+        are matched with their regexps.
     """
 
     def __init__(self, load_path: str, templates_filename: str,
-                 num_processors: int = None, **kwargs) -> None:
+                 num_processors: Optional[int] = None, **kwargs) -> None:
         """
 
         Args:
             load_path: path to folder with file with templates
             templates_filename: file with templates
+            num_processors: ignored, kept for compatibility with existing configs. Templates are matched in
+                the calling process
             **kwargs:
         """
         super().__init__(save_path=None, load_path=load_path)
         self.templates_filename = templates_filename
-        self.num_processors = mp.cpu_count() if num_processors == None else num_processors
-        self.pool = mp.Pool(self.num_processors)
         self.load()
 
     def load(self) -> None:
         log.debug(f"(load)self.load_path / self.templates_filename: {self.load_path / self.templates_filename}")
         with open(self.load_path / self.templates_filename) as fl:
             self.templates = json.load(fl)
+        self.compiled_templates = [re.compile(template["template_regexp"]) for template in self.templates]
+        keywords = {}
+        self.template_keywords: List[Set[int]] = []
+        for pattern in self.compiled_templates:
+            self.template_keywords.append({keywords.setdefault(literal, len(keywords))
+                                           for literal in required_literals(pattern)})
+        self.keywords_automaton = AhoCorasick(list(keywords))
+        log.debug(f"{len(keywords)} required literals of {len(self.templates)} templates")
 
     def save(self) -> None:
         raise NotImplementedError
 
+    def match_templates(self, question: str) -> List[Tuple[Any, Dict[str, Any]]]:
+        """Returns the first match of every template found in the question along with the template,
+        in the order of templates"""
+        found_keywords = self.keywords_automaton.find(question)
+        results = []
+        for pattern, keywords, template in zip(self.compiled_templates, self.template_keywords, self.templates):
+            if keywords <= found_keywords:
+                res = pattern.findall(question)
+                if res:
+                    results.append((res[0], template))
+        return results
+
     def __call__(self, question: str) -> Tuple[List[str], List[str], List[Tuple[str]], List[str], str]:
         question = question.lower()
         question = self.sanitize(question)
         question_length = len(question)
         entities, types, relations, relation_dirs = [], [], [], []
         query_type = ""
-        results = self.pool.map(RegexpMatcher(question), self.templates)
-        results = functools.reduce(lambda x, y: x + y, results)
+        results = self.match_templates(question)
         replace_tokens = [("the uk", "united kingdom"), ("the us", "united states")]
         if results:
             min_length = 100
@@ -111,6 +198,12 @@ class TemplateMatcher(Serializable):
 
         return entities, types, relations, relation_dirs, query_type
 
+    def match_batch(self, questions: List[str]) -> List[Tuple[List[str], List[str], List[Tuple[str]], List[str], str]]:
+        """Match every question of a batch, questions repeated in the batch are matched once"""
+        matched = {}
+        return [matched[question] if question in matched else matched.setdefault(question, self(question))
+                for question in questions]
+
     def sanitize(self, question: str) -> str:
         if question.startswith("the "):
             question = question[4:]
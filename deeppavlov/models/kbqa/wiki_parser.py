@@ -12,29 +12,72 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import sqlite3
+from collections import namedtuple, OrderedDict
 from logging import getLogger
-from typing import List, Tuple, Dict
-from collections import namedtuple
+from pathlib import Path
+from threading import Lock
+from typing import List, Tuple, Dict, Iterable, Optional, Union
 
 from hdt import HDTDocument
 
 from deeppavlov.core.commands.utils import expand_path
+from deeppavlov.core.common.errors import ConfigError
 from deeppavlov.core.common.registry import register
 from deeppavlov.core.models.component import Component
 
 log = getLogger(__name__)
 
+LABEL_REL = "http://www.w3.org/2000/01/rdf-schema#label"
+ALIAS_REL = "http://www.w3.org/2004/02/skos/core#altLabel"
+
+
+def build_label_table(wiki_filename: Union[str, Path], labels_filename: Union[str, Path], lang: str = "@en") -> None:
+    """Extract labels and aliases of Wikidata entities in one language from the HDT file into an sqlite table
+
+    Labels and aliases are normalized the same way as :meth:`WikiParser.find_label` and
+    :meth:`WikiParser.find_alias` do with the HDT file, the language is stored in the ``meta`` table.
+
+    Args:
+        wiki_filename: hdt file with wikidata
+        labels_filename: sqlite file to create
+        lang: language of labels and aliases
+    """
+    document = HDTDocument(str(expand_path(wiki_filename)))
+    labels_path = expand_path(labels_filename)
+    labels_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(labels_path))
+    conn.execute("CREATE TABLE IF NOT EXISTS labels (entity TEXT PRIMARY KEY, label TEXT)")
+    conn.execute("CREATE TABLE IF NOT EXISTS aliases (entity TEXT, alias TEXT)")
+    conn.execute("CREATE INDEX IF NOT EXISTS aliases_entity ON aliases (entity)")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('lang', ?)", (lang,))
+    for rel, sql, normalize in [(LABEL_REL, "INSERT OR IGNORE INTO labels VALUES (?, ?)",
+                                 lambda obj: obj.strip(lang).replace('"', '')),
+                                (ALIAS_REL, "INSERT INTO aliases VALUES (?, ?)",
+                                 lambda obj: obj.strip(lang).strip('"'))]:
+        triplets, cardinality = document.search_triples("", rel, "")
+        log.info(f"Extracting {rel} from {cardinality} triplets")
+        conn.executemany(sql, ((subj, normalize(obj)) for subj, _, obj in triplets if obj.endswith(lang)))
+    conn.commit()
+    conn.close()
+
 
 @register('wiki_parser')
 class WikiParser:
     """This class extract relations, objects or triplets from Wikidata HDT file"""
 
-    def __init__(self, wiki_filename: str, lang: str = "@en", **kwargs) -> None:
+    def __init__(self, wiki_filename: str, lang: str = "@en", cache_size: int = 100000,
+                 labels_filename: Optional[str] = None, **kwargs) -> None:
         """
 
         Args:
             wiki_filename: hdt file with wikidata
             lang: Russian or English language
+            cache_size: maximum total number of triplets in the cached results of (subject, relation, object)
+                patterns, results larger than a tenth of it are not cached, 0 disables the cache
+            labels_filename: sqlite file with labels and aliases of entities made by ``build_label_table``
+                for the same ``lang``, labels are searched in the HDT file if it is not set
             **kwargs:
         """
         log.debug(f'__init__ wiki_filename: {wiki_filename}')
@@ -42,6 +85,45 @@ class WikiParser:
         self.description_rel = "http://schema.org/description"
         self.lang = lang
         self.document = HDTDocument(str(wiki_path))
+        self.cache_size = cache_size
+        self._cache: Dict[Tuple[str, str, str], Tuple[Tuple[str, str, str], ...]] = OrderedDict()
+        self._cached_triplets = 0
+        self._cache_lock = Lock()
+        self.labels_conn = None
+        if labels_filename is not None:
+            self.labels_conn = sqlite3.connect(str(expand_path(labels_filename)), check_same_thread=False)
+            try:
+                row = self.labels_conn.execute("SELECT value FROM meta WHERE key = 'lang'").fetchone()
+            except sqlite3.OperationalError:
+                row = None
+            if row is None:
+                log.warning(f'Language of labels in {labels_filename} is unknown, expected {lang}')
+            elif row[0] != lang:
+                raise ConfigError(f'Labels in {labels_filename} are in {row[0]} language, but wiki_parser lang '
+                                  f'is {lang}')
+
+    def search_triples(self, subj: str, rel: str, obj: str) -> Tuple[Tuple[str, str, str], ...]:
+        """Find triplets matching the pattern, empty strings match anything. Results are kept in an LRU cache
+        and are returned as tuples, so callers can't change the cached values."""
+        key = (subj, rel, obj)
+        with self._cache_lock:
+            triplets = self._cache.get(key)
+            if triplets is not None:
+                self._cache.move_to_end(key)
+                return triplets
+        triplets, cardinality = self.document.search_triples(subj, rel, obj)
+        triplets = tuple(tuple(triplet) for triplet in triplets)
+        # empty results take a cache slot too, and a broad pattern with many results would evict the whole cache
+        size = max(len(triplets), 1)
+        if size * 10 <= self.cache_size:
+            with self._cache_lock:
+                if key not in self._cache:
+                    self._cache[key] = triplets
+                    self._cached_triplets += size
+                while self._cached_triplets > self.cache_size:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cached_triplets -= max(len(evicted), 1)
+        return triplets
 
     def __call__(self, what_return: List[str],
                  query_seq: List[List[str]],
@@ -60,6 +142,33 @@ class WikiParser:
                 filter_info: []
                 order_info: order_info(variable='?obj', sorting_order='asc')
         """
+        return self._execute(what_return, query_seq, filter_info, order_info, {})
+
+    def execute_batch(self, what_return_batch: List[List[str]],
+                      query_seq_batch: List[List[List[str]]],
+                      filter_info_batch: List[List[Tuple[str]]],
+                      order_info_batch: List[namedtuple]) -> List[List[List[str]]]:
+        """Execute queries of a batch of questions, every distinct triplet pattern of the batch is searched once
+
+        Args:
+            what_return_batch: ``what_return`` arguments of ``__call__`` for every query
+            query_seq_batch: ``query_seq`` arguments of ``__call__`` for every query
+            filter_info_batch: ``filter_info`` arguments of ``__call__`` for every query
+            order_info_batch: ``order_info`` arguments of ``__call__`` for every query
+
+        Returns:
+            results of every query
+        """
+        searched = {}
+        return [self._execute(what_return, query_seq, filter_info, order_info, searched)
+                for what_return, query_seq, filter_info, order_info
+                in zip(what_return_batch, query_seq_batch, filter_info_batch, order_info_batch)]
+
+    def _execute(self, what_return: List[str],
+                 query_seq: List[List[str]],
+                 filter_info: List[Tuple[str]],
+                 order_info: namedtuple,
+                 searched: Dict[Tuple[Tuple, Tuple], List[Dict[str, str]]]) -> List[List[str]]:
         extended_combs = []
         combs = []
         for n, query in enumerate(query_seq):
@@ -73,7 +182,7 @@ class WikiParser:
                        unknown_elem_positions = [(0, "?ent"), (2, "?obj")]
             """
             if n == 0:
-                combs = self.search(query, unknown_elem_positions)
+                combs = self._search_once(query, unknown_elem_positions, searched)
                 # combs = [{"?ent": "http://www.wikidata.org/entity/Q5513"}, ...]
             else:
                 if combs:
@@ -99,7 +208,7 @@ class WikiParser:
                         known_values = [comb[known_elem] for known_elem in known_elements]
                         for known_elem, known_value in zip(known_elements, known_values):
                             filled_query = [elem.replace(known_elem, known_value) for elem in query]
-                            new_combs = self.search(filled_query, unknown_elem_positions)
+                            new_combs = self._search_once(filled_query, unknown_elem_positions, searched)
                             for new_comb in new_combs:
                                 extended_combs.append({**comb, **new_comb})
                 combs = extended_combs
@@ -122,10 +231,17 @@ class WikiParser:
 
         return combs
 
+    def _search_once(self, query: List[str], unknown_elem_positions: List[Tuple[int, str]],
+                     searched: Dict[Tuple[Tuple, Tuple], List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        key = (tuple(query), tuple(unknown_elem_positions))
+        if key not in searched:
+            searched[key] = self.search(query, unknown_elem_positions)
+        return searched[key]
+
     def search(self, query: List[str], unknown_elem_positions: List[Tuple[int, str]]) -> List[Dict[str, str]]:
         query = list(map(lambda elem: "" if elem.startswith('?') else elem, query))
         subj, rel, obj = query
-        triplets, c = self.document.search_triples(subj, rel, obj)
+        triplets = self.search_triples(subj, rel, obj)
         if rel == self.description_rel:
             triplets = [triplet for triplet in triplets if triplet[2].endswith(self.lang)]
         combs = [{elem: triplet[pos] for pos, elem in unknown_elem_positions} for triplet in triplets]
@@ -139,7 +255,10 @@ class WikiParser:
             # "http://www.wikidata.org/entity/Q5513"
 
         if entity.startswith("http://www.wikidata.org/entity/"):
-            labels, cardinality = self.document.search_triples(entity, "http://www.w3.org/2000/01/rdf-schema#label", "")
+            if self.labels_conn is not None:
+                row = self.labels_conn.execute("SELECT label FROM labels WHERE entity = ?", (entity,)).fetchone()
+                return row[0] if row is not None else "Not Found"
+            labels = self.search_triples(entity, LABEL_REL, "")
             # labels = [["http://www.wikidata.org/entity/Q5513", "http://www.w3.org/2000/01/rdf-schema#label", '"Lake Baikal"@en'], ...]
             for label in labels:
                 if label[2].endswith(self.lang):
@@ -167,19 +286,27 @@ class WikiParser:
 
         return "Not Found"
 
+    def find_labels(self, entities: Iterable[str]) -> List[str]:
+        """Find labels of a batch of entities, every distinct entity is searched once"""
+        entities = list(entities)
+        labels = {entity: self.find_label(entity) for entity in set(entities)}
+        return [labels[entity] for entity in entities]
+
     def find_alias(self, entity: str) -> List[str]:
         aliases = []
         if entity.startswith("http://www.wikidata.org/entity/"):
-            labels, cardinality = self.document.search_triples(entity,
-                                                               "http://www.w3.org/2004/02/skos/core#altLabel", "")
+            if self.labels_conn is not None:
+                rows = self.labels_conn.execute("SELECT alias FROM aliases WHERE entity = ?", (entity,)).fetchall()
+                return [row[0] for row in rows]
+            labels = self.search_triples(entity, ALIAS_REL, "")
             aliases = [label[2].strip(self.lang).strip('"') for label in labels if label[2].endswith(self.lang)]
         return aliases
 
     def find_rels(self, entity: str, direction: str, rel_type: str = "no_type") -> List[str]:
         if direction == "forw":
-            triplets, num = self.document.search_triples(f"http://www.wikidata.org/entity/{entity}", "", "")
+            triplets = self.search_triples(f"http://www.wikidata.org/entity/{entity}", "", "")
         else:
-            triplets, num = self.document.search_triples("", "", f"http://www.wikidata.org/entity/{entity}")
+            triplets = self.search_triples("", "", f"http://www.wikidata.org/entity/{entity}")
 
         if rel_type != "no_type":
             start_str = f"http://www.wikidata.org/prop/{rel_type}"
@@ -54,6 +54,8 @@ class HybridNerModel(LRScheduledTFModel):
         drop_out_keep_prob: The probability of keeping hidden state
     """
 
+    async_saveable = True
+
     def __init__(self,
                  n_tags: int,
                  word_vocab,
@@ -57,6 +57,9 @@ class NerNetwork(LRScheduledTFModel):
         gpu: Number of gpu to use.
         seed: Random seed.
     """
+
+    async_saveable = True
+
     GRAPH_PARAMS = ["n_tags",  # TODO: add check
                     "char_emb_dim",
                     "capitalization_dim",
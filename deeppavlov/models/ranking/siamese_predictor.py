@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from logging import getLogger
-from typing import List, Iterable, Callable, Union
+from typing import List, Iterable, Callable, Optional, Union
 
 import numpy as np
 
@@ -47,6 +47,9 @@ class SiamesePredictor(Component):
             :class:`~deeppavlov.models.preprocessors.siamese_preprocessor.SiamesePreprocessor`.
         interact_pred_num: The number of the most relevant ``responses`` which will be returned.
             Will be used if the ``ranking`` is set to ``True``.
+        vector_index: A vector index component such as
+            :class:`~deeppavlov.models.ranking.vector_index.IVFVectorIndex` built over ``responses`` embeddings.
+            If set, it is used instead of scoring all ``responses``. Will be used if ``attention`` is ``False``.
         **kwargs: Other parameters.
     """
 
@@ -59,6 +62,7 @@ class SiamesePredictor(Component):
                  responses: SimpleVocabulary = None,
                  preproc_func: Callable = None,
                  interact_pred_num: int = 3,
+                 vector_index: Optional[Component] = None,
                  *args, **kwargs) -> None:
 
         super().__init__()
@@ -72,6 +76,7 @@ class SiamesePredictor(Component):
         self.preproc_func = preproc_func
         self.interact_pred_num = interact_pred_num
         self.model = model
+        self.vector_index = vector_index
         if self.ranking:
             self.responses = {el[1]: el[0] for el in responses.items()}
             self._build_preproc_responses()
@@ -99,6 +104,9 @@ class SiamesePredictor(Component):
                 else:
                     b = self.model._make_batch([context])
                     context_emb = self.model._predict_context_on_batch(b)
+                    if self.vector_index is not None:
+                        ids, _ = self.vector_index.search(context_emb, self.interact_pred_num)
+                        return [[self.responses[el] for el in ids[0] if el >= 0]]
                     context_emb = np.squeeze(context_emb, axis=0)
                     scores = context_emb @ self.response_embeddings.T
                 ids = np.flip(np.argsort(scores), -1)
@@ -131,6 +139,8 @@ class SiamesePredictor(Component):
             resp_preproc = resp_preproc
             resp_vecs.append(self.model._predict_response_on_batch(resp_preproc))
         self.response_embeddings = np.vstack(resp_vecs)
+        if self.vector_index is not None:
+            self.vector_index.fit(self.response_embeddings)
 
     def _build_preproc_responses(self) -> None:
         responses = list(self.responses.values())
@@ -39,6 +39,8 @@ class TensorflowBaseMatchingModel(TFModel, SiameseModel):
 
     """
 
+    async_saveable = True
+
     def __init__(self,
                  batch_size: int,
                  num_context_turns: int = 10,
@@ -0,0 +1,213 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from logging import getLogger
+from typing import Optional, Tuple
+
+import numpy as np
+
+from deeppavlov.core.common.registry import register
+from deeppavlov.core.models.component import Component
+from deeppavlov.core.models.estimator import Estimator
+
+logger = getLogger(__name__)
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Select ``k`` highest scores in every row without sorting the whole row.
+
+    Args:
+        scores: a score matrix with shape [n_queries X n_candidates]
+        k: number of scores to select
+
+    Returns:
+        a tuple of positions and values of the selected scores, both sorted by score descending
+
+    """
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        ids = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        ids = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+    top_scores = np.take_along_axis(scores, ids, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    return np.take_along_axis(ids, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+@register('exact_vector_index')
+class ExactVectorIndex(Component):
+    """Exact maximum inner product search over a base of dense vectors.
+
+    The base is scored block by block and only ``k`` best candidates of every block are kept, so neither the full
+    score matrix is allocated nor the whole base is sorted.
+
+    Args:
+        top_k: default number of results returned by ``__call__``
+        block_size: number of base vectors scored at once
+
+    """
+
+    def __init__(self, top_k: int = 10, block_size: int = 65536, **kwargs) -> None:
+        self.top_k = top_k
+        self.block_size = block_size
+        self.vectors: Optional[np.ndarray] = None
+
+    def fit(self, vectors: np.ndarray) -> None:
+        self.vectors = vectors
+
+    def __len__(self) -> int:
+        return 0 if self.vectors is None else len(self.vectors)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Find base vectors with the highest inner product with the queries.
+
+        Args:
+            queries: query vectors with shape [n_queries X dim]
+            k: number of results for every query
+
+        Returns:
+            a tuple of ids and scores of the found vectors, both with shape [n_queries X k]
+
+        """
+        queries = np.atleast_2d(queries)
+        best_ids = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.result_type(queries, self.vectors))
+        for start in range(0, len(self.vectors), self.block_size):
+            ids, scores = top_k(queries @ self.vectors[start:start + self.block_size].T, k)
+            pos, best_scores = top_k(np.hstack([best_scores, scores]), k)
+            best_ids = np.take_along_axis(np.hstack([best_ids, ids + start]), pos, axis=1)
+        return best_ids, best_scores
+
+    def __call__(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return self.search(queries, self.top_k)
+
+
+@register('ivf_vector_index')
+class IVFVectorIndex(Estimator):
+    """Approximate maximum inner product search with an inverted file index.
+
+    Base vectors are clustered with spherical k-means and stored grouped by cluster. A query is scored exactly
+    only against the vectors of ``n_probe`` clusters with the closest centroids. The cluster structure is saved to
+    ``save_path`` and reused on load if it was built for the base with the same shape.
+
+    Args:
+        n_lists: number of clusters, ``sqrt`` of the base size is a reasonable choice
+        n_probe: number of clusters scanned for every query, trades recall for speed
+        n_iter: number of k-means iterations
+        train_size: maximum number of base vectors to train k-means on
+        top_k: default number of results returned by ``__call__``
+        block_size: number of base vectors assigned to clusters at once
+        seed: random seed for k-means initialization
+
+    """
+
+    def __init__(self, n_lists: int = 1024, n_probe: int = 16, n_iter: int = 10, train_size: int = 262144,
+                 top_k: int = 10, block_size: int = 65536, seed: int = 42,
+                 save_path: Optional[str] = None, load_path: Optional[str] = None, **kwargs) -> None:
+        super().__init__(save_path=save_path, load_path=load_path, **kwargs)
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.train_size = train_size
+        self.top_k = top_k
+        self.block_size = block_size
+        self.seed = seed
+
+        self.centroids: Optional[np.ndarray] = None
+        self.offsets: Optional[np.ndarray] = None
+        self.ids: Optional[np.ndarray] = None
+        self.vectors: Optional[np.ndarray] = None
+        self.base_shape: Optional[Tuple[int, int]] = None
+
+    def __len__(self) -> int:
+        return 0 if self.vectors is None else len(self.vectors)
+
+    def _assign(self, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        return np.concatenate([np.argmax(vectors[start:start + self.block_size] @ centroids.T, axis=1)
+                               for start in range(0, len(vectors), self.block_size)])
+
+    def _train_centroids(self, vectors: np.ndarray) -> np.ndarray:
+        rng = np.random.RandomState(self.seed)
+        sample = vectors[rng.choice(len(vectors), min(self.train_size, len(vectors)), replace=False)]
+        sample = sample / np.maximum(np.linalg.norm(sample, axis=1, keepdims=True), 1e-12)
+        n_lists = min(self.n_lists, len(sample))
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+        for _ in range(self.n_iter):
+            assignment = self._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=n_lists)
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        return centroids
+
+    def fit(self, vectors: np.ndarray) -> None:
+        """Build the index over the base vectors or reuse the cluster structure loaded from ``load_path``."""
+        if self.load_path is not None and self.load_path.exists():
+            self.load()
+        if self.base_shape != tuple(vectors.shape):
+            logger.info(f'Building IVF index with {self.n_lists} lists over {len(vectors)} vectors')
+            self.centroids = self._train_centroids(vectors)
+            assignment = self._assign(vectors, self.centroids)
+            self.ids = np.argsort(assignment, kind='stable')
+            self.offsets = np.zeros(len(self.centroids) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(assignment, minlength=len(self.centroids)), out=self.offsets[1:])
+            self.base_shape = tuple(vectors.shape)
+            if self.save_path is not None:
+                self.save()
+        # vectors are stored grouped by cluster, so every probed list is scored as one contiguous slice
+        self.vectors = vectors[self.ids]
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Find base vectors with the highest inner product with the queries among the probed clusters.
+
+        Args:
+            queries: query vectors with shape [n_queries X dim]
+            k: number of results for every query
+
+        Returns:
+            a tuple of ids and scores of the found vectors, both with shape [n_queries X k]. If the probed clusters
+            contain less than ``k`` vectors, ids are padded with ``-1`` and scores with ``-inf``
+
+        """
+        queries = np.atleast_2d(queries)
+        n_probe = min(self.n_probe, len(self.centroids))
+        probes, _ = top_k(queries @ self.centroids.T, n_probe)
+        result_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        result_scores = np.full((len(queries), k), -np.inf, dtype=np.result_type(queries, self.vectors))
+        for i, query in enumerate(queries):
+            positions = np.concatenate([np.arange(self.offsets[lst], self.offsets[lst + 1]) for lst in probes[i]])
+            if not len(positions):
+                continue
+            pos, scores = top_k((self.vectors[positions] @ query)[np.newaxis], k)
+            result_ids[i, :pos.shape[1]] = self.ids[positions[pos[0]]]
+            result_scores[i, :pos.shape[1]] = scores[0]
+        return result_ids, result_scores
+
+    def __call__(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return self.search(queries, self.top_k)
+
+    def save(self) -> None:
+        logger.info(f'Saving IVF index to {self.save_path}')
+        with self.save_path.open('wb') as f:
+            np.savez(f, centroids=self.centroids, offsets=self.offsets, ids=self.ids, base_shape=self.base_shape)
+
+    def load(self) -> None:
+        logger.info(f'Loading IVF index from {self.load_path}')
+        with np.load(self.load_path) as loader:
+            self.centroids = loader['centroids']
+            self.offsets = loader['offsets']
+            self.ids = loader['ids']
+            self.base_shape = tuple(int(dim) for dim in loader['base_shape'])
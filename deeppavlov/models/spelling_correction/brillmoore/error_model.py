@@ -14,12 +14,14 @@
 
 import csv
 import itertools
+import multiprocessing
 from collections import defaultdict, Counter
 from heapq import heappop, heappushpop, heappush
 from logging import getLogger
 from math import log, exp
-from typing import List, Iterable, Tuple
+from typing import Dict, List, Iterable, Optional, Tuple
 
+import numpy as np
 from tqdm import tqdm
 
 from deeppavlov.core.common.errors import ConfigError
@@ -29,6 +31,47 @@ from deeppavlov.vocabs.typos import StaticDictionary
 
 logger = getLogger(__name__)
 
+_worker_model: Optional['ErrorModel'] = None
+
+
+def _init_worker(model: 'ErrorModel') -> None:
+    global _worker_model
+    _worker_model = model
+
+
+def _find_candidates_worker(words: List[str]) -> List[List[Tuple[str, float]]]:
+    return _worker_model._find_candidates_batch(words)
+
+
+class CompiledCosts:
+    """Replacement costs as integer-indexed numpy arrays for vectorized lookups.
+
+    Every pair of a left and a right character sequence is encoded as ``left_id * n_right + right_id``, codes are
+    stored sorted, so costs of many pairs are found with one ``np.searchsorted``.
+
+    Args:
+        costs: logarithmic probabilities of character sequences replacements
+    """
+
+    def __init__(self, costs: Dict[Tuple[str, str], float]) -> None:
+        costs = {edit: cost for edit, cost in costs.items() if cost > float('-inf')}
+        self.left_ids = {w: i for i, w in enumerate(sorted({w for w, _ in costs}))}
+        self.right_ids = {s: i for i, s in enumerate(sorted({s for _, s in costs}))}
+        self.n_right = len(self.right_ids)
+        keys = np.array([self.left_ids[w] * self.n_right + self.right_ids[s] for w, s in costs], dtype=np.int64)
+        order = np.argsort(keys)
+        self.keys = keys[order]
+        self.values = np.array(list(costs.values()), dtype=np.float64)[order]
+
+    def lookup(self, left_ids: np.ndarray, right_ids: np.ndarray) -> np.ndarray:
+        """Returns a ``[len(left_ids), len(right_ids)]`` matrix of costs, ``-inf`` for unknown replacements."""
+        keys = left_ids[:, np.newaxis] * self.n_right + right_ids[np.newaxis, :]
+        if not len(self.keys):
+            return np.full(keys.shape, -np.inf)
+        positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        found = (self.keys[positions] == keys) & (right_ids >= 0)[np.newaxis, :]
+        return np.where(found, self.values[positions], -np.inf)
+
 
 @register('spelling_error_model')
 class ErrorModel(Estimator):
@@ -39,6 +82,13 @@ class ErrorModel(Estimator):
         dictionary: a :class:`~deeppavlov.vocabs.typos.StaticDictionary` object
         window: maximum context window size
         candidates_count: maximum number of replacement candidates to return for every token in the input
+        vectorized: whether to compute dynamic programming rows of sibling dictionary prefixes at once with numpy
+            if ``window`` is greater than ``0``
+        n_jobs: number of processes to find candidates for tokens of large batches in. The processes are forked
+            on the first call with a large batch and again after the model is fitted or loaded, so they are not
+            available on Windows and the model shouldn't be called in a process whose other threads may hold
+            locks at that time. They are stopped by :meth:`destroy`
+        min_pool_batch: minimum number of distinct tokens in a batch to use the process pool for
 
     Attributes:
         costs: logarithmic probabilities of character sequences replacements
@@ -47,13 +97,20 @@ class ErrorModel(Estimator):
         candidates_count: maximum number of replacement candidates to return for every token in the input
     """
 
-    def __init__(self, dictionary: StaticDictionary, window: int = 1, candidates_count: int = 1, *args, **kwargs):
+    def __init__(self, dictionary: StaticDictionary, window: int = 1, candidates_count: int = 1,
+                 vectorized: bool = True, n_jobs: int = 1, min_pool_batch: int = 256, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.costs = defaultdict(itertools.repeat(float('-inf')).__next__)
         self.dictionary = dictionary
         self.window = window
+        self.n_jobs = n_jobs
+        self.min_pool_batch = min_pool_batch
+        self._compiled_costs: Optional[CompiledCosts] = None
+        self._pool = None
         if self.window == 0:
             self.find_candidates = self._find_candidates_window_0
+        elif vectorized:
+            self.find_candidates = self._find_candidates_window_n_vectorized
         else:
             self.find_candidates = self._find_candidates_window_n
         self.costs[('', '')] = log(1)
@@ -67,6 +124,19 @@ class ErrorModel(Estimator):
 
         self.candidates_count = candidates_count
 
+    def _start_pool(self) -> None:
+        if self._compiled_costs is None and self.find_candidates == self._find_candidates_window_n_vectorized:
+            self._compiled_costs = CompiledCosts(self.costs)
+        # workers are forked, so the model is not pickled
+        self._pool = multiprocessing.get_context('fork').Pool(self.n_jobs, initializer=_init_worker,
+                                                              initargs=(self,))
+
+    def _close_pool(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
     def _find_candidates_window_0(self, word, prop_threshold=1e-6):
         threshold = log(prop_threshold)
         d = {}
@@ -131,13 +201,100 @@ class ErrorModel(Estimator):
         return [(w.strip('⟬⟭'), score) for score, w in sorted(candidates, reverse=True) if
                 score > threshold]
 
-    def _infer_instance(self, instance: List[str]) -> List[List[Tuple[float, str]]]:
+    def _find_candidates_window_n_vectorized(self, word, prop_threshold=1e-6, groups=None):
+        """The same search as ``_find_candidates_window_n``, but rows of all the sibling prefixes popped from the
+        heap are computed at once: they share rows of their ancestors and differ only in costs of the replaced
+        sequences.
+
+        Ancestors and ids of the replaced sequences of sibling prefixes don't depend on the word, so they are
+        kept in ``groups`` and shared by searches for all the words of a batch."""
+        if groups is None:
+            groups = {}
+        if self._compiled_costs is None:
+            self._compiled_costs = CompiledCosts(self.costs)
+        compiled = self._compiled_costs
+        threshold = log(prop_threshold)
+        word = '⟬{}⟭'.format(word.lower().replace('ё', 'е'))
+        word_len = len(word) + 1
+        inf = float('-inf')
+        max_ri = min(self.window + 1, word_len - 1)
+        # right_ids[ri][i - ri] is an id of word[i - ri:i]
+        right_ids = [None] + [np.array([compiled.right_ids.get(word[i - ri:i], -1) for i in range(ri, word_len)],
+                                       dtype=np.int64) for ri in range(1, max_ri + 1)]
+        d = {'': np.array([0.] + [inf] * (word_len - 1))}
+        masked = {}
+        prefixes_heap = [(0, self.dictionary.words_trie[''])]
+        candidates = [(inf, '')] * self.candidates_count
+        while prefixes_heap and -prefixes_heap[0][0] > candidates[0][0]:
+            _, prefixes = heappop(prefixes_heap)
+            if not prefixes:
+                continue
+            group = groups.get(prefixes[0][:-1])
+            if group is None:
+                group = groups[prefixes[0][:-1]] = self._get_prefixes_group(prefixes)
+            rows = np.full((len(prefixes), word_len), inf)
+            for ancestor, left_ids, valid in group:
+                prev = masked.get(ancestor)
+                if prev is None:
+                    prev = masked[ancestor] = np.where(d[ancestor] > threshold, d[ancestor], inf)
+                for ri in range(1, max_ri + 1):
+                    c_res = prev[np.newaxis, :word_len - ri] + compiled.lookup(left_ids, right_ids[ri])
+                    rows[valid, ri:] = np.maximum(rows[valid, ri:], c_res)
+            for prefix, res in zip(prefixes, rows):
+                d[prefix] = res
+                if prefix in self.dictionary.words_set:
+                    heappushpop(candidates, (res[-1], prefix))
+                potential = res.max()
+                if potential > threshold:
+                    heappush(prefixes_heap, (-potential, self.dictionary.words_trie[prefix]))
+        return [(w.strip('⟬⟭'), float(score)) for score, w in sorted(candidates, reverse=True) if
+                score > threshold]
+
+    def _get_prefixes_group(self, prefixes: List[str]) -> List[Tuple[str, np.ndarray, np.ndarray]]:
+        """Returns the common ancestor, ids of the replaced sequences and indexes of sibling prefixes that have
+        them for every length of the replaced sequence."""
+        group = []
+        for li in range(1, min(len(prefixes[0]) + 1, self.window + 2)):
+            # all the prefixes have the same ancestor of length prefix_len - li
+            left_ids = np.array([self._compiled_costs.left_ids.get(prefix[-li:], -1) for prefix in prefixes],
+                                dtype=np.int64)
+            valid = np.flatnonzero(left_ids >= 0)
+            if len(valid):
+                group.append((prefixes[0][:-li], left_ids[valid], valid))
+        return group
+
+    def _find_candidates_batch(self, words: List[str]) -> List[List[Tuple[str, float]]]:
+        if self.find_candidates == self._find_candidates_window_n_vectorized:
+            groups = {}
+            return [self._find_candidates_window_n_vectorized(word, 1e-6, groups) for word in words]
+        return [self.find_candidates(word, prop_threshold=1e-6) for word in words]
+
+    def _find_all_candidates(self, words: List[str]) -> Dict[str, List[Tuple[str, float]]]:
+        """Find candidates for every distinct word once, in the process pool if there are enough words."""
+        words = list(dict.fromkeys(words))
+        if self.n_jobs > 1 and len(words) >= self.min_pool_batch:
+            if self._pool is None:
+                self._start_pool()
+            # words sorted by their beginnings are split into chunks, so words of a chunk have more common prefixes
+            words = sorted(words)
+            chunk_size = max(1, len(words) // self.n_jobs // 4)
+            chunks = [words[i:i + chunk_size] for i in range(0, len(words), chunk_size)]
+            results = [res for chunk_res in self._pool.map(_find_candidates_worker, chunks) for res in chunk_res]
+        else:
+            results = self._find_candidates_batch(words)
+        return dict(zip(words, results))
+
+    def _infer_instance(self, instance: List[str],
+                        found: Optional[Dict[str, List[Tuple[str, float]]]] = None) -> List[List[Tuple[float, str]]]:
         candidates = []
         for incorrect in instance:
             if any([c not in self.dictionary.alphabet for c in incorrect]):
                 candidates.append([(0, incorrect)])
             else:
-                res = self.find_candidates(incorrect, prop_threshold=1e-6)
+                if found is not None:
+                    res = found[incorrect]
+                else:
+                    res = self.find_candidates(incorrect, prop_threshold=1e-6)
                 if res:
                     candidates.append([(score, candidate) for candidate, score in res])
                 else:
@@ -153,10 +310,15 @@ class ErrorModel(Estimator):
         Returns:
             batch of lists of probabilities and candidates for every token
         """
-        data = list(data)
-        if len(data) > 1:
-            data = tqdm(data, desc='Infering a batch with the error model', leave=False)
-        return [self._infer_instance(instance) for instance in data]
+        data = [list(instance) for instance in data]
+        words = [word for instance in data for word in instance
+                 if all(c in self.dictionary.alphabet for c in word)]
+        found = self._find_all_candidates(words)
+        return [self._infer_instance(instance, found) for instance in data]
+
+    def destroy(self) -> None:
+        self._close_pool()
+        super().destroy()
 
     @staticmethod
     def _distance_edits(seq1, seq2):
@@ -215,6 +377,9 @@ class ErrorModel(Estimator):
             e = e_count[w] + incorrect_prior + correct_prior
             p = c / e
             self.costs[(w, s)] = log(p)
+        self._compiled_costs = None
+        # forked workers keep the old costs
+        self._close_pool()
 
     def save(self):
         """Save replacements probabilities to a file
@@ -238,6 +403,8 @@ class ErrorModel(Estimator):
                     reader = csv.reader(tsv_file, delimiter='\t')
                     for w, s, p in reader:
                         self.costs[(w, s)] = log(float(p))
+                self._compiled_costs = None
+                self._close_pool()
             elif not self.load_path.parent.is_dir():
                 raise ConfigError("Provided `load_path` for {} doesn't exist!".format(
                     self.__class__.__name__))
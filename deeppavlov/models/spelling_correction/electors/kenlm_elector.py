@@ -12,9 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 import kenlm
 
@@ -29,48 +30,100 @@ logger = getLogger(__name__)
 class KenlmElector(Component):
     """Component that chooses a candidate with the highest product of base and language model probabilities
 
+    Language model scores are cached by the pair of a language model state and a word, so states and words repeated
+    across beam hypotheses and sentences are scored once.
+
     Args:
          load_path: path to the kenlm model file
          beam_size: beam size for highest probability search
+         top_k: if set, return ``top_k`` best hypotheses with their scores for every sentence instead of
+            the corrected sentence
+         n_jobs: number of threads to process sentences of a batch in
+         cache_size: maximum number of cached language model scores, the cache is cleared when it's full
+         merge_states: whether to keep only the best of hypotheses that reach the same language model state.
+            They get the same scores for any continuation, so the others can't become the best, and the freed
+            beam slots are taken by other hypotheses. This changes the beam, so the chosen sentence may differ
+            from the one found without merging
 
     Attributes:
         lm: kenlm object
         beam_size: beam size for highest probability search
     """
 
-    def __init__(self, load_path: Path, beam_size: int = 4, *args, **kwargs):
+    def __init__(self, load_path: Path, beam_size: int = 4, top_k: Optional[int] = None, n_jobs: int = 1,
+                 cache_size: int = 1000000, merge_states: bool = False, *args, **kwargs):
         self.lm = kenlm.Model(str(expand_path(load_path)))
         self.beam_size = beam_size
+        self.top_k = top_k
+        self.n_jobs = n_jobs
+        self.cache_size = cache_size
+        self.merge_states = merge_states
+        self._cache: Dict[Tuple[kenlm.State, str], Tuple[float, kenlm.State]] = {}
+        self._executor = None
 
-    def __call__(self, batch: List[List[List[Tuple[float, str]]]]) -> List[List[str]]:
+    def __call__(self, batch: List[List[List[Tuple[float, str]]]]) \
+            -> Union[List[List[str]], List[List[Tuple[float, List[str]]]]]:
         """Choose the best candidate for every token
 
         Args:
             batch: batch of probabilities and string values of candidates for every token in a sentence
 
         Returns:
-            batch of corrected tokenized sentences
+            batch of corrected tokenized sentences or, if ``top_k`` is set, batch of lists of scores and
+            tokenized sentences of the best hypotheses
         """
+        if self.n_jobs > 1 and len(batch) > 1:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.n_jobs)
+            return list(self._executor.map(self._infer_instance, batch))
         return [self._infer_instance(candidates) for candidates in batch]
 
+    def _score(self, state: kenlm.State, word: str) -> Tuple[float, kenlm.State]:
+        key = (state, word)
+        result = self._cache.get(key)
+        if result is None:
+            out_state = kenlm.State()
+            result = (self.lm.BaseScore(state, word, out_state), out_state)
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[key] = result
+        return result
+
     def _infer_instance(self, candidates: List[List[Tuple[float, str]]]):
         candidates = candidates + [[(0, '</s>')]]
         state = kenlm.State()
         self.lm.BeginSentenceWrite(state)
         beam = [(0, state, [])]
         for sublist in candidates:
-            new_beam = []
+            hypotheses = []
             for beam_score, beam_state, beam_words in beam:
                 for score, candidate in sublist:
-                    prev_state = beam_state
+                    state = beam_state
                     c_score = 0
                     cs = candidate.split()
-                    for candidate in cs:
-                        state = kenlm.State()
-                        c_score += self.lm.BaseScore(prev_state, candidate, state)
-                        prev_state = state
-                    new_beam.append((beam_score + score + c_score, state, beam_words + cs))
-            new_beam.sort(reverse=True)
-            beam = new_beam[:self.beam_size]
+                    for word in cs:
+                        word_score, state = self._score(state, word)
+                        c_score += word_score
+                    hypotheses.append((beam_score + score + c_score, state, beam_words + cs))
+            if self.merge_states:
+                best: Dict[kenlm.State, Tuple[float, kenlm.State, List[str]]] = {}
+                for hypothesis in hypotheses:
+                    if hypothesis[1] not in best or best[hypothesis[1]][0] < hypothesis[0]:
+                        best[hypothesis[1]] = hypothesis
+                hypotheses = list(best.values())
+            hypotheses.sort(reverse=True)
+            beam = hypotheses[:self.beam_size]
+        if self.top_k is not None:
+            return [(score, words[:-1]) for score, _, words in beam[:self.top_k]]
         score, state, words = beam[0]
         return words[:-1]
+
+    def reset(self) -> None:
+        self._cache.clear()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def destroy(self) -> None:
+        self.reset()
+        super().destroy()
@@ -1 +1 @@
-from .searcher_component import LevenshteinSearcherComponent
+from .searcher_component import LevenshteinSearcherComponent, SymmetricDeleteSearcherComponent
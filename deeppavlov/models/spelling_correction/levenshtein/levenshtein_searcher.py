@@ -13,12 +13,13 @@
 # limitations under the License.
 
 import copy
+import heapq
 import itertools
 
 import numpy as np
 from sortedcontainers import SortedListWithKey
 
-from .tabled_trie import Trie, make_trie
+from .tabled_trie import CompiledTrie, Trie, make_trie
 
 
 class LevenshteinSearcher:
@@ -29,7 +30,7 @@ class LevenshteinSearcher:
     """
 
     def __init__(self, alphabet, dictionary, operation_costs=None,
-                 allow_spaces=False, euristics='none'):
+                 allow_spaces=False, euristics='none', compiled=True):
         self.alphabet = alphabet
         self.allow_spaces = allow_spaces
         if isinstance(euristics, int):
@@ -52,6 +53,11 @@ class LevenshteinSearcher:
             alphabet, operation_costs=operation_costs, allow_spaces=allow_spaces)
         self._precompute_euristics()
         self._define_h_function()
+        # компактный бор и обратный преобразователь для быстрого поиска
+        self.compiled = compiled
+        if self.compiled:
+            self.compiled_dictionary = CompiledTrie(self.dictionary)
+            self.inverse_transducer = self.transducer.inverse()
 
     def __contains__(self, word):
         return word in self.dictionary
@@ -64,9 +70,87 @@ class LevenshteinSearcher:
                     or (c == " " and self.allow_spaces)) for c in word):
             return []
             # raise ValueError("{0} contains an incorrect symbol".format(word))
+        if self.compiled:
+            return self._compiled_trie_search(
+                word, d, allow_spaces=allow_spaces, return_cost=return_cost)
         return self._trie_search(
             word, d, allow_spaces=allow_spaces, return_cost=return_cost)
 
+    def _compiled_trie_search(self, word, d, allow_spaces=True, return_cost=True):
+        """
+        То же, что _trie_search, но по компактному бору с двоичной кучей вместо
+        отсортированного списка. Элементы кучи упорядочены по (cost, g, h) и затем
+        по номеру добавления, как в отсортированном списке, поэтому вершины
+        извлекаются в том же порядке и находятся те же слова с теми же стоимостями
+        """
+        transducer = self.inverse_transducer
+        allow_spaces &= self.allow_spaces
+        trie = self.compiled_dictionary
+        operation_costs = transducer.operation_costs
+        # переходы преобразователя из каждой позиции слова
+        steps = []
+        for pos in range(len(word) + 1):
+            pos_steps = []
+            for upperside_length in range(min(len(word) - pos, transducer.max_up_length) + 1):
+                curr_up = word[pos: pos + upperside_length]
+                if curr_up in operation_costs:
+                    pos_steps.extend((pos + upperside_length, curr_low, curr_cost)
+                                     for curr_low, curr_cost in operation_costs[curr_up].items())
+            steps.append(pos_steps)
+        # оценки h для пар (позиция, вершина) вычисляются один раз за запрос
+        use_h = self.euristics not in [None, 0]
+        h_values = [dict() for _ in range(len(word) + 1)]
+
+        def h(pos, index):
+            if not use_h:
+                return 0.0
+            value = h_values[pos].get(index)
+            if value is None:
+                value = h_values[pos][index] = self.h_func(word[pos:], index)
+            return value
+
+        used_agenda_keys = set()
+        # элементы очереди: (cost, g, h, номер добавления, нижняя строка, позиция, вершина)
+        root_h = h(0, trie.root)
+        agenda = [(root_h, 0.0, root_h, 0, "", 0, trie.root)]
+        counter = 1
+        answer = dict()
+        while len(agenda) > 0:
+            _, g, _, _, low, pos, index = heapq.heappop(agenda)
+            key = (low, pos, index)
+            if key in used_agenda_keys:
+                continue
+            used_agenda_keys.add(key)
+            for new_pos, curr_low, curr_cost in steps[pos]:
+                new_g = g + curr_cost
+                if new_g > d:
+                    continue
+                if curr_low == " ":
+                    if allow_spaces and trie.is_final(index):
+                        new_index = trie.root
+                    else:
+                        continue
+                else:
+                    new_index = trie.descend(index, curr_low)
+                    if new_index == CompiledTrie.NO_NODE:
+                        continue
+                new_h = h(new_pos, new_index)
+                new_cost = new_g + new_h
+                if new_cost > d:
+                    continue
+                new_low = low + curr_low
+                if new_pos == len(word) and trie.is_final(new_index):
+                    old_g = answer.get(new_low, None)
+                    if old_g is None or new_g < old_g:
+                        answer[new_low] = new_g
+                heapq.heappush(agenda, (new_cost, new_g, new_h, counter, new_low, new_pos, new_index))
+                counter += 1
+        answer = sorted(answer.items(), key=(lambda x: x[1]))
+        if return_cost:
+            return answer
+        else:
+            return [elem[0] for elem in answer]
+
     def _trie_search(self, word, d, transducer=None,
                      allow_spaces=True, return_cost=True):
         """
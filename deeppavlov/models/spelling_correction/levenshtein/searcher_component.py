@@ -14,11 +14,13 @@
 import string
 from logging import getLogger
 from math import log10
-from typing import Iterable, List, Tuple, Optional
+from typing import Iterable, List, Tuple, Optional, Union
 
+from deeppavlov.core.commands.utils import expand_path
 from deeppavlov.core.common.registry import register
 from deeppavlov.core.models.component import Component
 from .levenshtein_searcher import LevenshteinSearcher
+from .symmetric_delete import SymmetricDeleteSearcher
 
 logger = getLogger(__name__)
 
@@ -49,7 +51,11 @@ class LevenshteinSearcherComponent(Component):
         self.max_distance = max_distance
         self.error_probability = log10(error_probability)
         self.vocab_penalty = self.error_probability if vocab_penalty is None else log10(vocab_penalty)
-        self.searcher = LevenshteinSearcher(alphabet, words, allow_spaces=True, euristics=2)
+        self.searcher = self._build_searcher(alphabet, words)
+
+    def _build_searcher(self, alphabet: List[str], words: List[str]) -> Union[LevenshteinSearcher,
+                                                                              SymmetricDeleteSearcher]:
+        return LevenshteinSearcher(alphabet, words, allow_spaces=True, euristics=2)
 
     def _infer_instance(self, tokens: Iterable[str]) -> List[List[Tuple[float, str]]]:
         candidates = []
@@ -73,3 +79,39 @@ class LevenshteinSearcherComponent(Component):
             batch of lists of probabilities and candidates for every token
         """
         return [self._infer_instance(tokens) for tokens in batch]
+
+
+@register('spelling_symmetric_delete')
+class SymmetricDeleteSearcherComponent(LevenshteinSearcherComponent):
+    """Component that finds replacement candidates for tokens at a set Damerau-Levenshtein distance
+    with a precomputed symmetric delete index
+
+    Candidates are looked up with hash probes instead of a search over the dictionary trie. Unlike
+    :class:`LevenshteinSearcherComponent`, tokens are not split into several dictionary words.
+
+    Args:
+        words: list of every correct word
+        index_path: directory to save the index to or to load it from if it exists
+        max_distance: maximum allowed Damerau-Levenshtein distance between source words and candidates
+        error_probability: assigned probability for every edit
+        vocab_penalty: assigned probability of an out of vocabulary token being the correct one without changes
+        prefix_length: number of first characters of words used to build the index
+    """
+
+    def __init__(self, words: Iterable[str], index_path: str, max_distance: int = 1,
+                 error_probability: float = 1e-4, vocab_penalty: Optional[float] = None, prefix_length: int = 7,
+                 **kwargs):
+        self.index_path = expand_path(index_path)
+        self.prefix_length = prefix_length
+        super().__init__(words, max_distance=max_distance, error_probability=error_probability,
+                         vocab_penalty=vocab_penalty, **kwargs)
+
+    def _build_searcher(self, alphabet: List[str], words: List[str]) -> SymmetricDeleteSearcher:
+        if not self.index_path.exists():
+            SymmetricDeleteSearcher.build(self.index_path, words, self.max_distance, self.prefix_length)
+        searcher = SymmetricDeleteSearcher(self.index_path)
+        if searcher.max_distance < self.max_distance:
+            logger.info(f'Rebuilding index in {self.index_path} for max_distance {self.max_distance}')
+            SymmetricDeleteSearcher.build(self.index_path, words, self.max_distance, self.prefix_length)
+            searcher = SymmetricDeleteSearcher(self.index_path)
+        return searcher
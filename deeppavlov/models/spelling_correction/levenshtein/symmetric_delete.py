@@ -0,0 +1,178 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import shutil
+import tempfile
+from array import array
+from hashlib import blake2b
+from logging import getLogger
+from pathlib import Path
+from typing import Iterable, List, Set, Tuple, Union
+
+import numpy as np
+
+logger = getLogger(__name__)
+
+META_FILENAME = 'meta.json'
+
+
+def _hash(s: str) -> int:
+    return int.from_bytes(blake2b(s.encode('utf8'), digest_size=8).digest(), 'little')
+
+
+def get_deletes(word: str, max_distance: int) -> Set[str]:
+    """Returns all strings obtained from the word by deleting up to ``max_distance`` characters, the word included."""
+    deletes = {word}
+    level = {word}
+    for _ in range(max_distance):
+        level = {s[:i] + s[i + 1:] for s in level for i in range(len(s))} - deletes
+        deletes |= level
+    return deletes
+
+
+def restricted_damerau_levenshtein(first: str, second: str, max_distance: int) -> int:
+    """Computes Damerau-Levenshtein distance with adjacent transpositions (optimal string alignment distance).
+
+    Returns:
+        the distance or ``max_distance + 1`` if it exceeds ``max_distance``
+    """
+    if abs(len(first) - len(second)) > max_distance:
+        return max_distance + 1
+    prev_prev, prev = None, list(range(len(second) + 1))
+    for i, a in enumerate(first, 1):
+        curr = [i] + [0] * len(second)
+        for j, b in enumerate(second, 1):
+            curr[j] = min(prev[j] + 1, curr[j - 1] + 1, prev[j - 1] + (a != b))
+            if i > 1 and j > 1 and a == second[j - 2] and first[i - 2] == b:
+                curr[j] = min(curr[j], prev_prev[j - 2] + 1)
+        if min(curr) > max_distance:
+            return max_distance + 1
+        prev_prev, prev = prev, curr
+    return min(prev[-1], max_distance + 1)
+
+
+class SymmetricDeleteSearcher:
+    """Finds dictionary words within a Damerau-Levenshtein distance from a query with a symmetric delete index.
+
+    Deletes of up to ``max_distance`` characters from the first ``prefix_length`` characters of every dictionary
+    word are precomputed. A query generates its own deletes, which are looked up in the sorted array of delete
+    hashes, and the found words are verified with the exact distance. The index is stored as **.npy** files
+    opened with memory mapping. Unlike
+    :class:`~deeppavlov.models.spelling_correction.levenshtein.levenshtein_searcher.LevenshteinSearcher`, all edits
+    cost 1 and candidates are not split into several words by spaces.
+
+    Args:
+        path: a directory with the index files created by :meth:`build`
+
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        with (path / META_FILENAME).open(encoding='utf8') as f:
+            meta = json.load(f)
+        self.max_distance = meta['max_distance']
+        self.prefix_length = meta['prefix_length']
+        self._words = np.load(path / 'words.npy', mmap_mode='r')
+        self._word_offsets = np.load(path / 'word_offsets.npy', mmap_mode='r')
+        self._key_hashes = np.load(path / 'key_hashes.npy', mmap_mode='r')
+        self._posting_offsets = np.load(path / 'posting_offsets.npy', mmap_mode='r')
+        self._postings = np.load(path / 'postings.npy', mmap_mode='r')
+
+    @staticmethod
+    def build(path: Union[str, Path], words: Iterable[str], max_distance: int = 2, prefix_length: int = 7) -> None:
+        """Build the index over dictionary words and save it to the ``path`` directory.
+
+        Args:
+            path: a directory to save the index to
+            words: dictionary words
+            max_distance: maximum distance the index supports
+            prefix_length: number of first word characters to generate deletes from
+
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = Path(tempfile.mkdtemp(prefix=path.name + '.', dir=str(path.parent)))
+
+        words = sorted(set(words))
+        key_hashes, postings = array('Q'), array('i')
+        for word_id, word in enumerate(words):
+            deletes = get_deletes(word[:prefix_length], max_distance)
+            key_hashes.extend(_hash(delete) for delete in deletes)
+            postings.extend([word_id] * len(deletes))
+        key_hashes = np.frombuffer(key_hashes, dtype=np.uint64)
+        postings = np.frombuffer(postings, dtype=np.int32)
+        order = np.argsort(key_hashes, kind='stable')
+        key_hashes, postings = key_hashes[order], postings[order]
+        unique_hashes, starts = np.unique(key_hashes, return_index=True)
+        posting_offsets = np.append(starts, len(postings)).astype(np.int64)
+
+        encoded = [word.encode('utf8') for word in words]
+        word_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(word) for word in encoded], out=word_offsets[1:])
+        np.save(tmp_path / 'words.npy', np.frombuffer(b''.join(encoded), dtype=np.uint8))
+        np.save(tmp_path / 'word_offsets.npy', word_offsets)
+        np.save(tmp_path / 'key_hashes.npy', unique_hashes)
+        np.save(tmp_path / 'posting_offsets.npy', posting_offsets)
+        np.save(tmp_path / 'postings.npy', postings)
+        with (tmp_path / META_FILENAME).open('w', encoding='utf8') as f:
+            json.dump({'max_distance': max_distance, 'prefix_length': prefix_length, 'n_words': len(words)}, f)
+
+        if path.exists():
+            shutil.rmtree(path)
+        os.replace(tmp_path, path)
+        logger.info(f'Symmetric delete index over {len(words)} words with {len(unique_hashes)} keys is saved '
+                    f'to {path}')
+
+    def word(self, word_id: int) -> str:
+        return bytes(self._words[self._word_offsets[word_id]:self._word_offsets[word_id + 1]]).decode('utf8')
+
+    def __contains__(self, word: str) -> bool:
+        return len(self.search(word, 0)) > 0
+
+    def search(self, word: str, d: int, return_cost: bool = True, **kwargs) -> List[Union[Tuple[str, float], str]]:
+        """Finds all dictionary words in d-window from word
+
+        Args:
+            word: a query word
+            d: maximum distance, can't be greater than ``max_distance`` of the index
+            return_cost: whether to return distances along with words
+
+        Returns:
+            list of found words or of pairs of a word and its distance, sorted by distance
+
+        """
+        if d > self.max_distance:
+            logger.warning(f'Index is built for distances up to {self.max_distance}, got {d}')
+            d = self.max_distance
+        hashes = np.array([_hash(delete) for delete in get_deletes(word[:self.prefix_length], d)], dtype=np.uint64)
+        positions = np.searchsorted(self._key_hashes, hashes)
+        found = positions < len(self._key_hashes)
+        found[found] = self._key_hashes[positions[found]] == hashes[found]
+        positions = positions[found]
+        if len(positions) == 0:
+            return []
+        word_ids = np.unique(np.concatenate([self._postings[self._posting_offsets[pos]:self._posting_offsets[pos + 1]]
+                                             for pos in positions]))
+        answer = []
+        for word_id in word_ids:
+            candidate = self.word(word_id)
+            distance = restricted_damerau_levenshtein(word, candidate, d)
+            if distance <= d:
+                answer.append((candidate, float(distance)))
+        answer.sort(key=lambda x: x[1])
+        if return_cost:
+            return answer
+        return [elem[0] for elem in answer]
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import copy
+from bisect import bisect_left
 from collections import defaultdict
 
 import numpy as np
@@ -315,6 +316,75 @@ class Trie:
             return [elem for elem in self.graph[index] if elem != Trie.NO_NODE]
 
 
+class CompiledTrie:
+    """
+    Компактное представление бора в виде плоских массивов numpy,
+    нумерация вершин совпадает с нумерацией в исходном боре.
+    Переход по символу ищется двоичным поиском по кодам символов вершины
+    прямо в массивах, без построения словарей переходов
+
+    Атрибуты
+    --------
+    root: int, индекс корня
+    offsets: array, type=int, shape=(число вершин + 1),
+    рёбра вершины i хранятся в позициях offsets[i]:offsets[i+1] массивов letters и children
+    letters: array, type=int, коды символов на рёбрах, упорядоченные внутри вершины
+    children: array, type=int, потомки по соответствующим рёбрам
+    final: array, type=bool, shape=(число вершин), массив индикаторов финальных вершин
+    """
+    NO_NODE = Trie.NO_NODE
+
+    def __init__(self, trie):
+        letters, children, offsets = [], [], [0]
+        for index in range(len(trie)):
+            for code, child in sorted(trie._get_children_and_letters(index, return_indexes=True)):
+                if child != Trie.NO_NODE:
+                    letters.append(code)
+                    children.append(child)
+            offsets.append(len(letters))
+        self.root = trie.root
+        self.alphabet_codes = trie.alphabet_codes
+        self.offsets = np.array(offsets, dtype=np.int64)
+        self.letters = np.array(letters, dtype=np.int32)
+        self.children = np.array(children, dtype=np.int32)
+        self.final = np.asarray(trie.final, dtype=bool)
+        # memoryview без копирования возвращает элементы массивов как числа Python,
+        # что намного быстрее индексации массивов numpy по одному элементу
+        self._offsets = memoryview(self.offsets)
+        self._letters = memoryview(self.letters)
+        self._children = memoryview(self.children)
+        self._final = memoryview(self.final)
+
+    def __len__(self):
+        return len(self._final)
+
+    def is_final(self, index):
+        return self._final[index]
+
+    def child(self, index, code):
+        """
+        Возвращает потомка вершины index по символу с кодом code или NO_NODE
+        """
+        start, end = self._offsets[index], self._offsets[index + 1]
+        position = bisect_left(self._letters, code, start, end)
+        if position < end and self._letters[position] == code:
+            return self._children[position]
+        return CompiledTrie.NO_NODE
+
+    def descend(self, curr, s):
+        """
+        Спуск из вершины curr по строке s
+        """
+        for a in s:
+            code = self.alphabet_codes.get(a)
+            if code is None:
+                return CompiledTrie.NO_NODE
+            curr = self.child(curr, code)
+            if curr == CompiledTrie.NO_NODE:
+                break
+        return curr
+
+
 class TrieMinimizer:
     def __init__(self):
         pass
@@ -52,6 +52,8 @@ class SquadModel(LRScheduledTFModel):
         noans_token: boolean, flags whether to use special no_ans token to make model able not to answer on question
     """
 
+    async_saveable = True
+
     def __init__(self, word_emb: np.ndarray, char_emb: np.ndarray, context_limit: int = 450, question_limit: int = 150,
                  char_limit: int = 16, train_char_emb: bool = True, char_hidden_size: int = 100,
                  encoder_hidden_size: int = 75, attention_hidden_size: int = 75, keep_prob: float = 0.7,
@@ -12,9 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from collections import Counter
+import os
+import shutil
+from collections import ChainMap, Counter
 from logging import getLogger
-from typing import List, Any, Generator, Tuple, KeysView, ValuesView, Dict, Optional
+from multiprocessing import Pool
+from pathlib import Path
+from typing import List, Any, Generator, Tuple, KeysView, ValuesView, Dict, Optional, Iterable
 
 import numpy as np
 import scipy as sp
@@ -24,12 +28,25 @@ from sklearn.utils import murmurhash3_32
 from deeppavlov.core.common.registry import register
 from deeppavlov.core.models.component import Component
 from deeppavlov.core.models.estimator import Estimator
+from deeppavlov.models.vectorizers.tfidf_segments import REMOVED_FILENAME, TfidfSegment, get_deltas_path, get_idfs, \
+    list_segments
+from deeppavlov.models.vectorizers.tfidf_storage import MmapDocIndex, load_tfidf_mmap, load_tfidf_npz, \
+    save_tfidf_mmap, save_tfidf_opts
+from deeppavlov.models.vectorizers.tfidf_streaming import CountsSpool, build_tfidf_matrix, count_hashes, \
+    count_hashes_worker, init_worker
 
 logger = getLogger(__name__)
 
 Sparse = sp.sparse.csr_matrix
 
 
+def _remove_path(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
 def hash_(token: str, hash_size: int) -> int:
     """Convert a token to a hash of given size.
     Args:
@@ -51,14 +68,26 @@ class HashingTfIdfVectorizer(Estimator):
         tokenizer: a tokenizer class
         hash_size: a hash size, power of two
         doc_index: a dictionary of document ids and their titles
-        save_path: a path to **.npz** file where tfidf matrix is saved
-        load_path: a path to **.npz** file where tfidf matrix is loaded from
+        save_path: a path to **.npz** file or a directory where tfidf matrix is saved
+        load_path: a path to **.npz** file or a directory where tfidf matrix is loaded from
+        save_format: ``'npz'`` to save tfidf matrix to a compressed **.npz** file or ``'mmap'`` to save it to
+         a directory as raw arrays that are loaded with memory mapping without reading them into RAM
+        n_jobs: number of processes to tokenize and hash documents with while fitting
+        memory_budget: maximum size of hashed counts kept in memory while fitting in megabytes; counts above
+         the budget are spilled to temporary files. If ``n_jobs`` is greater than 1 or ``memory_budget``
+         is set, counts are accumulated in compact numpy blocks instead of :attr:`rows`, :attr:`cols` and
+         :attr:`data` lists and the matrix is built with a streaming merge of the blocks
 
     Attributes:
         hash_size: a hash size
         tokenizer: instance of a tokenizer class
         term_freqs: a dictionary with tfidf terms and their frequences
         doc_index: provided by a user ids or generated automatically ids
+        n_docs: number of indexed documents
+        segments: delta segments with documents added by :meth:`add_documents`
+        removed_nums: integer ids of documents removed by :meth:`remove_documents`
+        clipped_tf: log1p term counts of the terms which idf is clipped to zero, so they have no tfidf values in
+         the matrix; ``None`` for matrices saved without them
         rows: tfidf matrix rows corresponding to terms
         cols: tfidf matrix cols corresponding to docs
         data: tfidf matrix data corresponding to tfidf values
@@ -66,15 +95,31 @@ class HashingTfIdfVectorizer(Estimator):
     """
 
     def __init__(self, tokenizer: Component, hash_size=2 ** 24, doc_index: Optional[dict] = None,
-                 save_path: Optional[str] = None, load_path: Optional[str] = None, **kwargs):
+                 save_path: Optional[str] = None, load_path: Optional[str] = None, save_format: str = 'npz',
+                 n_jobs: int = 1, memory_budget: Optional[int] = None, **kwargs):
 
         super().__init__(save_path=save_path, load_path=load_path, mode=kwargs.get('mode', 'infer'))
 
+        if save_format not in ('npz', 'mmap'):
+            raise ValueError(f'Unsupported save_format "{save_format}", use "npz" or "mmap"')
+
         self.hash_size = hash_size
         self.tokenizer = tokenizer
+        self.save_format = save_format
+        self.n_jobs = n_jobs
+        self.streaming = n_jobs > 1 or memory_budget is not None
         self.rows = []
         self.cols = []
         self.data = []
+        self._spool = CountsSpool(memory_budget)
+        self._pool = None
+
+        self.segments: List[TfidfSegment] = []
+        self.removed_nums = set()
+        self._removed_terms = []
+        self._term_freqs_outdated = False
+        self._idfs = None
+        self._idf_ratio = None
 
         if kwargs.get('mode', 'infer') == 'infer':
             self.tfidf_matrix, opts = self.load()
@@ -82,10 +127,18 @@ class HashingTfIdfVectorizer(Estimator):
             self.hash_size = opts['hash_size']
             self.term_freqs = opts['term_freqs'].squeeze()
             self.doc_index = opts['doc_index']
+            self.clipped_tf = opts.get('clipped_tf')
             self.index2doc = self.get_index2doc()
+            self.n_docs = len(self.doc_index)
+            self._base_term_freqs = self.term_freqs
+            self._base_n_docs = self.n_docs
+            self._load_deltas()
         else:
+            self.ngram_range = getattr(tokenizer, 'ngram_range', None)
             self.term_freqs = None
             self.doc_index = doc_index or {}
+            self.clipped_tf = None
+            self.n_docs = None
 
     def __call__(self, questions: List[str]) -> Sparse:
         """Transform input list of documents to tfidf vectors.
@@ -99,6 +152,7 @@ class HashingTfIdfVectorizer(Estimator):
         """
 
         sp_tfidfs = []
+        self._update_term_freqs()
 
         for question in questions:
             ngrams = list(self.tokenizer([question]))
@@ -111,10 +165,9 @@ class HashingTfIdfVectorizer(Estimator):
                 sp_tfidfs.append(Sparse((1, self.hash_size)))
                 continue
 
-            size = len(self.doc_index)
+            size = self.n_docs
             Ns = self.term_freqs[hashes_unique]
-            idfs = np.log((size - Ns + 0.5) / (Ns + 0.5))
-            idfs[idfs < 0] = 0
+            idfs = get_idfs(Ns, size)
 
             tfidf = np.multiply(tfs, idfs)
 
@@ -133,6 +186,8 @@ class HashingTfIdfVectorizer(Estimator):
             inverted doc_index dict
 
         """
+        if isinstance(self.doc_index, MmapDocIndex):
+            return self.doc_index.index2doc
         return dict(zip(self.doc_index.values(), self.doc_index.keys()))
 
     def get_counts(self, docs: List[str], doc_ids: List[Any]) \
@@ -197,31 +252,73 @@ class HashingTfIdfVectorizer(Estimator):
 
         binary = (count_matrix > 0).astype(int)
         term_freqs = np.array(binary.sum(1)).squeeze()
-        idfs = np.log((count_matrix.shape[1] - term_freqs + 0.5) / (term_freqs + 0.5))
-        idfs[idfs < 0] = 0
+        idfs = get_idfs(term_freqs, count_matrix.shape[1])
         idfs = sp.sparse.diags(idfs, 0)
         tfs = count_matrix.log1p()
         tfidfs = idfs.dot(tfs)
         return tfidfs, term_freqs
 
+    @staticmethod
+    def get_clipped_tf(count_matrix: Sparse, term_freqs: np.ndarray) -> Sparse:
+        """Get log1p counts of the terms which idf is clipped to zero and which are missing in the tfidf matrix.
+
+        Args:
+            count_matrix: a count matrix
+            term_freqs: term frequences returned by :meth:`get_tfidf_matrix`
+
+        Returns:
+            a csr_matrix of the same shape as the count matrix
+
+        """
+        clipped = sp.sparse.diags((get_idfs(term_freqs, count_matrix.shape[1]) <= 0).astype(float), 0)
+        return Sparse(clipped.dot(count_matrix.log1p()))
+
     def save(self) -> None:
-        """Save tfidf matrix into **.npz** format.
+        """Save tfidf matrix into **.npz** or memory-mapped format.
 
         Returns:
             None
 
         """
         logger.info("Saving tfidf matrix to {}".format(self.save_path))
-        count_matrix = self.get_count_matrix(self.rows, self.cols, self.data,
-                                             size=len(self.doc_index))
-        tfidf_matrix, term_freqs = self.get_tfidf_matrix(count_matrix)
+        if self.streaming:
+            out_dir = None
+            if self.save_format == 'mmap':
+                out_dir = self.save_path
+                out_dir.mkdir(parents=True, exist_ok=True)
+            tfidf_matrix, term_freqs, clipped_tf = build_tfidf_matrix(self._spool, self.hash_size,
+                                                                      len(self.doc_index), out_dir)
+        else:
+            count_matrix = self.get_count_matrix(self.rows, self.cols, self.data,
+                                                 size=len(self.doc_index))
+            tfidf_matrix, term_freqs = self.get_tfidf_matrix(count_matrix)
+            clipped_tf = self.get_clipped_tf(count_matrix, term_freqs)
         self.term_freqs = term_freqs
+        self.n_docs = len(self.doc_index)
 
         opts = {'hash_size': self.hash_size,
-                'ngram_range': self.tokenizer.ngram_range,
+                'ngram_range': self.ngram_range,
                 'doc_index': self.doc_index,
-                'term_freqs': self.term_freqs}
+                'term_freqs': self.term_freqs,
+                'clipped_tf': clipped_tf}
+
+        if self.streaming and self.save_format == 'mmap':
+            save_tfidf_opts(self.save_path, tfidf_matrix.shape, opts)
+        else:
+            self._save_matrix(self.save_path, tfidf_matrix, opts)
+        # delta segments of the previous matrix don't belong to the new one
+        _remove_path(get_deltas_path(self.save_path))
+
+        # release memory
+        self.reset()
+
+    def _save_matrix(self, path: Path, tfidf_matrix: Sparse, opts: Dict[str, Any]) -> None:
+        if self.save_format == 'mmap':
+            save_tfidf_mmap(path, tfidf_matrix, opts)
+            return
 
+        opts = dict(opts)
+        clipped_tf = opts.pop('clipped_tf', None)
         data = {
             'data': tfidf_matrix.data,
             'indices': tfidf_matrix.indices,
@@ -229,13 +326,14 @@ class HashingTfIdfVectorizer(Estimator):
             'shape': tfidf_matrix.shape,
             'opts': opts
         }
-        np.savez(self.save_path, **data)
-
-        # release memory
-        self.reset()
+        if clipped_tf is not None:
+            data.update(clipped_data=clipped_tf.data, clipped_indices=clipped_tf.indices,
+                        clipped_indptr=clipped_tf.indptr)
+        with path.open('wb') as f:
+            np.savez(f, **data)
 
     def reset(self) -> None:
-        """Clear :attr:`rows`, :attr:`cols` and :attr:`data`
+        """Clear :attr:`rows`, :attr:`cols` and :attr:`data`, accumulated counts blocks and stop hashing processes.
 
         Returns:
             None
@@ -244,10 +342,17 @@ class HashingTfIdfVectorizer(Estimator):
         self.rows.clear()
         self.cols.clear()
         self.data.clear()
+        self._spool.clear()
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
 
     def load(self) -> Tuple[Sparse, Dict]:
         """Load a tfidf matrix as csr_matrix.
 
+        If :attr:`load_path` is a directory, the matrix is loaded from memory-mapped format.
+
         Returns:
             a tuple of tfidf matrix and csr data.
 
@@ -262,10 +367,9 @@ class HashingTfIdfVectorizer(Estimator):
             raise FileNotFoundError("HashingTfIdfVectorizer path doesn't exist!")
 
         logger.info("Loading tfidf matrix from {}".format(self.load_path))
-        loader = np.load(self.load_path, allow_pickle=True)
-        matrix = Sparse((loader['data'], loader['indices'],
-                         loader['indptr']), shape=loader['shape'])
-        return matrix, loader['opts'].item(0)
+        if self.load_path.is_dir():
+            return load_tfidf_mmap(self.load_path)
+        return load_tfidf_npz(self.load_path)
 
     def partial_fit(self, docs: List[str], doc_ids: List[Any], doc_nums: List[int]) -> None:
         """Partially fit on one batch.
@@ -282,11 +386,28 @@ class HashingTfIdfVectorizer(Estimator):
         for doc_id, i in zip(doc_ids, doc_nums):
             self.doc_index[doc_id] = i
 
+        if self.streaming:
+            self._partial_fit_streaming(docs, doc_nums)
+            return
+
         for batch_rows, batch_data, batch_cols in self.get_counts(docs, doc_ids):
             self.rows.extend(batch_rows)
             self.cols.extend(batch_cols)
             self.data.extend(batch_data)
 
+    def _partial_fit_streaming(self, docs: List[str], doc_nums: List[int]) -> None:
+        if self.n_jobs <= 1:
+            self._spool.add(*count_hashes(self.tokenizer, self.hash_size, docs, doc_nums))
+            return
+
+        if self._pool is None:
+            self._pool = Pool(self.n_jobs, initializer=init_worker, initargs=(self.tokenizer, self.hash_size))
+        shard_size = -(-len(docs) // self.n_jobs)
+        shards = [(docs[i:i + shard_size], doc_nums[i:i + shard_size]) for i in range(0, len(docs), shard_size)]
+        logger.info("Tokenizing and hashing batch in {} processes...".format(len(shards)))
+        for block in self._pool.imap(count_hashes_worker, shards):
+            self._spool.add(*block)
+
     def fit(self, docs: List[str], doc_ids: List[Any], doc_nums: List[int]) -> None:
         """Fit the vectorizer.
 
@@ -303,4 +424,268 @@ class HashingTfIdfVectorizer(Estimator):
         self.rows = []
         self.cols = []
         self.data = []
+        self._spool.clear()
         return self.partial_fit(docs, doc_ids, doc_nums)
+
+    @property
+    def deltas_path(self) -> Optional[Path]:
+        """A directory with delta segments and removed documents of the loaded tfidf matrix."""
+        return get_deltas_path(self.load_path) if self.load_path else None
+
+    def _load_deltas(self) -> None:
+        deltas_path = self.deltas_path
+        if deltas_path is None or not deltas_path.is_dir():
+            return
+        for segment_path in list_segments(deltas_path):
+            segment = TfidfSegment.load(segment_path)
+            self.segments.append(segment)
+            self._index_documents(segment.doc_ids, segment.nums)
+            self.n_docs += len(segment.nums)
+        removed_path = deltas_path / REMOVED_FILENAME
+        if removed_path.is_file():
+            self._remove_nums(np.load(removed_path))
+        self._term_freqs_outdated = True
+        logger.info(f'Loaded {len(self.segments)} delta segments and {len(self.removed_nums)} removed documents '
+                    f'from {deltas_path}')
+
+    @property
+    def n_cols(self) -> int:
+        """Number of columns of the tfidf matrix including delta segments."""
+        return self.tfidf_matrix.shape[1] + sum(len(segment.nums) for segment in self.segments)
+
+    def _index_documents(self, doc_ids: Iterable[Any], nums: Iterable[int]) -> None:
+        if not isinstance(self.doc_index, (dict, ChainMap)):
+            # memory-mapped index is read-only, so added documents are stored in a separate dict
+            self.doc_index = ChainMap({}, self.doc_index)
+            self.index2doc = ChainMap({}, self.index2doc)
+        for doc_id, num in zip(doc_ids, nums):
+            self.doc_index[doc_id] = int(num)
+            self.index2doc[int(num)] = doc_id
+
+    @staticmethod
+    def _get_docs_terms(matrix: Sparse, cols: np.ndarray) -> np.ndarray:
+        """Returns row numbers of the nonzero entries of the matrix columns in one pass over the matrix."""
+        if len(cols) == 0 or matrix.nnz == 0:
+            return np.empty(0, dtype=np.int64)
+        found = np.isin(matrix.indices, cols) & (np.asarray(matrix.data) != 0)
+        return np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))[found]
+
+    def _remove_nums(self, nums: Iterable[int]) -> None:
+        nums = np.array(sorted(set(int(num) for num in nums) - self.removed_nums), dtype=np.int64)
+        if len(nums) == 0:
+            return
+        base_nums = nums[nums < self.tfidf_matrix.shape[1]]
+        self._removed_terms.append(self._get_docs_terms(self.tfidf_matrix, base_nums))
+        if self.clipped_tf is not None:
+            self._removed_terms.append(self._get_docs_terms(self.clipped_tf, base_nums))
+        for segment in self.segments:
+            if len(segment.nums):
+                segment_cols = nums[(nums >= segment.nums[0]) & (nums <= segment.nums[-1])] - segment.nums[0]
+                self._removed_terms.append(self._get_docs_terms(segment.tf, segment_cols))
+        self.removed_nums.update(nums.tolist())
+        self.n_docs -= len(nums)
+        self._term_freqs_outdated = True
+
+    def _update_term_freqs(self) -> None:
+        """Recompute term frequences and idf after documents were added or removed."""
+        if not self._term_freqs_outdated:
+            return
+        term_freqs = np.array(self._base_term_freqs, dtype=np.int64)
+        for segment in self.segments:
+            term_freqs += segment.term_freqs
+        if self._removed_terms:
+            term_freqs -= np.bincount(np.concatenate(self._removed_terms), minlength=self.hash_size)
+        self.term_freqs = term_freqs
+
+        self._idfs = get_idfs(term_freqs, self.n_docs)
+        base_idfs = get_idfs(self._base_term_freqs, self._base_n_docs)
+        self._idf_ratio = np.divide(self._idfs, base_idfs, out=np.zeros_like(self._idfs), where=base_idfs > 0)
+        self._term_freqs_outdated = False
+
+    def add_documents(self, docs: List[str], doc_ids: List[Any]) -> None:
+        """Add documents to the index as a new delta segment without rebuilding the tfidf matrix.
+
+        Documents with ids that are already in the index replace the old ones. The segment is saved to
+        :attr:`deltas_path` and is loaded together with the tfidf matrix until :meth:`compact` is called.
+
+        Args:
+            docs: a list of input documents
+            doc_ids: a list of document ids corresponding to input documents
+
+        Returns:
+            None
+
+        """
+        self.remove_documents([doc_id for doc_id in doc_ids if doc_id in self.doc_index])
+
+        start = self.n_cols
+        nums = np.arange(start, start + len(docs))
+        rows, cols, counts = count_hashes(self.tokenizer, self.hash_size, docs, nums)
+        tf = Sparse((np.log1p(counts), (rows, cols - start)), shape=(self.hash_size, len(docs)))
+        segment = TfidfSegment(tf, nums, list(doc_ids))
+
+        self.segments.append(segment)
+        self._index_documents(segment.doc_ids, nums)
+        self.n_docs += len(docs)
+        self._term_freqs_outdated = True
+
+        if self.deltas_path is not None:
+            self.deltas_path.mkdir(parents=True, exist_ok=True)
+            index = len(list_segments(self.deltas_path))
+            segment.save(self.deltas_path / f'segment_{index}.npz')
+
+    def remove_documents(self, doc_ids: List[Any]) -> None:
+        """Exclude documents from the index. Their entries are dropped from the matrix by :meth:`compact`.
+
+        Args:
+            doc_ids: a list of ids of documents to remove
+
+        Returns:
+            None
+
+        """
+        removed = len(self.removed_nums)
+        nums = []
+        for doc_id in doc_ids:
+            try:
+                nums.append(self.doc_index[doc_id])
+            except KeyError:
+                logger.warning(f'Document {doc_id} is not in the index')
+        self._remove_nums(nums)
+
+        if self.deltas_path is not None and len(self.removed_nums) > removed:
+            self.deltas_path.mkdir(parents=True, exist_ok=True)
+            np.save(self.deltas_path / REMOVED_FILENAME, np.array(sorted(self.removed_nums), dtype=np.int64))
+
+    def get_removed_nums(self) -> np.ndarray:
+        """Returns sorted integer ids of removed documents."""
+        return np.array(sorted(self.removed_nums), dtype=np.int64)
+
+    def get_scores(self, q_tfidfs: Sparse) -> Sparse:
+        """Score all indexed documents including delta segments for every query.
+
+        Args:
+            q_tfidfs: queries tfidf vectors returned by :meth:`__call__`
+
+        Returns:
+            a csr_matrix of scores with shape [n_queries X :attr:`n_cols`], removed documents have no entries
+
+        """
+        if not self.segments and not self.removed_nums:
+            return Sparse(q_tfidfs * self.tfidf_matrix)
+
+        self._update_term_freqs()
+        q_base = Sparse(q_tfidfs, copy=True)
+        q_base.data *= self._idf_ratio[q_base.indices]
+        scores = (q_base * self.tfidf_matrix).tocoo()
+        rows, cols, data = [scores.row], [scores.col], [scores.data]
+
+        q_delta = Sparse(q_tfidfs, copy=True)
+        q_delta.data *= self._idfs[q_delta.indices]
+        if self.clipped_tf is not None and self.clipped_tf.nnz:
+            # terms with clipped base idf have no tfidf values in the base matrix
+            clipped_scores = (q_delta * self.clipped_tf).tocoo()
+            rows.append(clipped_scores.row)
+            cols.append(clipped_scores.col)
+            data.append(clipped_scores.data)
+        if self.segments:
+            for segment in self.segments:
+                segment_scores = (q_delta * segment.tf).tocoo()
+                rows.append(segment_scores.row)
+                cols.append(segment.nums[segment_scores.col])
+                data.append(segment_scores.data)
+
+        rows, cols, data = np.concatenate(rows), np.concatenate(cols), np.concatenate(data)
+        if self.removed_nums:
+            keep = ~np.isin(cols, self.get_removed_nums())
+            rows, cols, data = rows[keep], cols[keep], data[keep]
+        return Sparse((data, (rows, cols)), shape=(q_tfidfs.shape[0], self.n_cols))
+
+    def compact(self) -> None:
+        """Merge delta segments into the base tfidf matrix, drop removed documents and recompute idf.
+
+        The merged matrix is written to :attr:`save_path` next to the old one and then replaces it,
+        so processes that use the old matrix are not affected. Merged delta files are deleted.
+
+        Returns:
+            None
+
+        """
+        if not self.segments and not self.removed_nums:
+            logger.info('No delta segments or removed documents to compact')
+            return
+
+        merged_segments = list_segments(self.deltas_path) if self.deltas_path.is_dir() else []
+        self._update_term_freqs()
+        removed_nums = self.get_removed_nums()
+
+        base = self.tfidf_matrix
+        base_rows = np.repeat(np.arange(self.hash_size), np.diff(base.indptr))
+        base_idfs = get_idfs(self._base_term_freqs, self._base_n_docs)[base_rows]
+        # entries with zero base idf have no tf in the base matrix, their tf is kept in clipped_tf
+        base_kept = base_idfs > 0
+        rows = [base_rows[base_kept]]
+        cols = [np.asarray(base.indices)[base_kept]]
+        data = [np.asarray(base.data)[base_kept] / base_idfs[base_kept]]
+        if self.clipped_tf is not None:
+            clipped_tf = self.clipped_tf.tocoo()
+            rows.append(clipped_tf.row)
+            cols.append(clipped_tf.col)
+            data.append(clipped_tf.data)
+        elif np.any(get_idfs(self._base_term_freqs, self._base_n_docs) <= 0):
+            logger.warning('The tfidf matrix was saved without counts of the terms with zero idf, '
+                           'their entries of the base documents are dropped')
+        for segment in self.segments:
+            segment_tf = segment.tf.tocoo()
+            rows.append(segment_tf.row)
+            cols.append(segment.nums[segment_tf.col])
+            data.append(segment_tf.data)
+        rows, cols, data = np.concatenate(rows), np.concatenate(cols), np.concatenate(data)
+        keep = ~np.isin(cols, removed_nums) & (data != 0)
+        rows, cols, data = rows[keep], cols[keep], data[keep]
+        idfs = self._idfs[rows]
+        shape = (self.hash_size, self.n_cols)
+        tfidf_matrix = Sparse((data[idfs > 0] * idfs[idfs > 0], (rows[idfs > 0], cols[idfs > 0])), shape=shape)
+        clipped_tf = Sparse((data[idfs <= 0], (rows[idfs <= 0], cols[idfs <= 0])), shape=shape)
+
+        removed = set(removed_nums.tolist())
+        doc_index = {doc_id: num for doc_id, num in self.doc_index.items() if num not in removed}
+        opts = {'hash_size': self.hash_size,
+                'ngram_range': self.ngram_range,
+                'doc_index': doc_index,
+                'term_freqs': self.term_freqs,
+                'clipped_tf': clipped_tf}
+
+        save_path = self.save_path or self.load_path
+        tmp_path = save_path.with_name(save_path.name + '.tmp')
+        old_path = save_path.with_name(save_path.name + '.old')
+        _remove_path(tmp_path)
+        logger.info(f'Saving compacted tfidf matrix to {save_path}')
+        self._save_matrix(tmp_path, tfidf_matrix, opts)
+        if save_path.is_file() and tmp_path.is_file():
+            os.replace(tmp_path, save_path)
+        else:
+            # a directory can't atomically replace a file or another directory, so the old matrix is moved aside
+            _remove_path(old_path)
+            if save_path.exists():
+                os.replace(save_path, old_path)
+            os.replace(tmp_path, save_path)
+            _remove_path(old_path)
+
+        for segment_path in merged_segments:
+            segment_path.unlink()
+        removed_path = self.deltas_path / REMOVED_FILENAME
+        if removed_path.is_file():
+            removed_path.unlink()
+
+        self.tfidf_matrix = tfidf_matrix
+        self.clipped_tf = clipped_tf
+        self.doc_index = doc_index
+        self.index2doc = self.get_index2doc()
+        self.n_docs = len(doc_index)
+        self._base_term_freqs = self.term_freqs
+        self._base_n_docs = self.n_docs
+        self.segments = []
+        self.removed_nums = set()
+        self._removed_terms = []
+        self._term_freqs_outdated = True
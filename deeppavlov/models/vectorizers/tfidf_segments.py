@@ -0,0 +1,118 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+from logging import getLogger
+from pathlib import Path
+from typing import Any, List, Union
+
+import numpy as np
+from scipy import sparse
+
+logger = getLogger(__name__)
+
+Sparse = sparse.csr_matrix
+
+REMOVED_FILENAME = 'removed.npy'
+
+
+def get_idfs(term_freqs: np.ndarray, n_docs: int) -> np.ndarray:
+    """Compute inverse document frequences the same way as :class:`HashingTfIdfVectorizer` does.
+
+    Args:
+        term_freqs: numbers of documents that contain each term hash
+        n_docs: number of documents
+
+    Returns:
+        idf values for every term hash
+
+    """
+    idfs = np.log((n_docs - term_freqs + 0.5) / (term_freqs + 0.5))
+    idfs[idfs < 0] = 0
+    return idfs
+
+
+def get_deltas_path(matrix_path: Path) -> Path:
+    """Returns a directory where delta segments of the tfidf matrix saved to ``matrix_path`` are stored."""
+    return matrix_path.with_name(matrix_path.name + '.deltas')
+
+
+class TfidfSegment:
+    """Delta segment with documents added to the tfidf index after its base matrix was built.
+
+    The segment keeps log-scaled term counts without idf, so the idf is applied at query time and is always
+    computed over all current documents.
+
+    Args:
+        tf: log1p term counts csr_matrix with shape [hash_size X number of segment documents]
+        nums: integer ids of the segment documents, consecutive numbers
+        doc_ids: ids of the segment documents
+
+    """
+
+    def __init__(self, tf: Sparse, nums: np.ndarray, doc_ids: List[Any]) -> None:
+        self.tf = tf
+        self.nums = nums
+        self.doc_ids = doc_ids
+
+    @property
+    def term_freqs(self) -> np.ndarray:
+        return np.diff(self.tf.indptr)
+
+    def save(self, path: Path) -> None:
+        with path.open('wb') as f:
+            np.savez(f, data=self.tf.data, indices=self.tf.indices, indptr=self.tf.indptr, shape=self.tf.shape,
+                     nums=self.nums, doc_ids=np.array(self.doc_ids, dtype=object))
+
+    @classmethod
+    def load(cls, path: Path) -> 'TfidfSegment':
+        with np.load(path, allow_pickle=True) as loader:
+            tf = Sparse((loader['data'], loader['indices'], loader['indptr']), shape=tuple(loader['shape']))
+            return cls(tf, loader['nums'], list(loader['doc_ids']))
+
+
+def list_segments(deltas_path: Path) -> List[Path]:
+    return sorted(deltas_path.glob('segment_*.npz'), key=lambda path: int(path.stem.split('_')[1]))
+
+
+def compact(config: Union[str, Path, dict]) -> None:
+    """Merge delta segments of the first :class:`HashingTfIdfVectorizer` in the pipeline into its base matrix.
+
+    Args:
+        config: a pipeline configuration
+
+    """
+    from deeppavlov.core.commands.infer import build_model
+    from deeppavlov.models.vectorizers.hashing_tfidf_vectorizer import HashingTfIdfVectorizer
+
+    model = build_model(config)
+    components = [component for _, _, component in model.train_pipe]
+    components += [getattr(component, 'vectorizer', None) for component in components]
+    components += list(model._components_dict.values())
+    for component in components:
+        if isinstance(component, HashingTfIdfVectorizer):
+            component.compact()
+            break
+    else:
+        logger.error('No hashing_tfidf_vectorizer component found in the pipeline')
+    model.destroy()
+
+
+if __name__ == '__main__':
+    from deeppavlov.core.common.file import find_config
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('config_path', help='path to a pipeline json config with a hashing_tfidf_vectorizer', type=str)
+    args = parser.parse_args()
+    compact(find_config(args.config_path))
@@ -0,0 +1,240 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+from collections.abc import Mapping
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.sputils import get_index_dtype
+
+logger = getLogger(__name__)
+
+Sparse = sparse.csr_matrix
+
+META_FILENAME = 'meta.json'
+
+
+class MmapIndex2Doc(Mapping):
+    """Read-only mapping from document integer ids to document titles stored in memory-mapped arrays."""
+
+    def __init__(self, nums: np.ndarray, offsets: np.ndarray, titles: np.ndarray) -> None:
+        self._nums = nums
+        self._offsets = offsets
+        self._titles = titles
+        self._contiguous = len(nums) == 0 or (nums[0] == 0 and nums[-1] == len(nums) - 1)
+
+    def position(self, num: int) -> int:
+        if self._contiguous:
+            if not 0 <= num < len(self._nums):
+                raise KeyError(num)
+            return num
+        pos = int(np.searchsorted(self._nums, num))
+        if pos == len(self._nums) or self._nums[pos] != num:
+            raise KeyError(num)
+        return pos
+
+    def title(self, pos: int) -> str:
+        return bytes(self._titles[self._offsets[pos]:self._offsets[pos + 1]]).decode('utf8')
+
+    def __getitem__(self, num: int) -> str:
+        return self.title(self.position(num))
+
+    def __len__(self) -> int:
+        return len(self._nums)
+
+    def __iter__(self) -> Iterator[int]:
+        return (int(num) for num in self._nums)
+
+
+class MmapDocIndex(Mapping):
+    """Read-only mapping from document titles to document integer ids stored in memory-mapped arrays.
+
+    Titles are stored as one utf8 blob in order of document ids. Titles lookup is a binary search over titles
+    positions sorted by title, so loading the index doesn't require building a Python dict.
+
+    Args:
+        path: A directory with the index files.
+
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        self._nums = np.load(path / 'doc_nums.npy', mmap_mode='r')
+        self._order = np.load(path / 'doc_title_order.npy', mmap_mode='r')
+        self.index2doc = MmapIndex2Doc(self._nums,
+                                       np.load(path / 'doc_offsets.npy', mmap_mode='r'),
+                                       np.load(path / 'doc_titles.npy', mmap_mode='r'))
+
+    def __getitem__(self, title: str) -> int:
+        lo, hi = 0, len(self._order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_title = self.index2doc.title(self._order[mid])
+            if mid_title < title:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(self._order) or self.index2doc.title(self._order[lo]) != title:
+            raise KeyError(title)
+        return int(self._nums[self._order[lo]])
+
+    def __len__(self) -> int:
+        return len(self._nums)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.index2doc.title(pos) for pos in range(len(self._nums)))
+
+    @staticmethod
+    def save(path: Path, doc_index: Dict[str, int]) -> None:
+        items = sorted(doc_index.items(), key=lambda item: item[1])
+        titles = []
+        for title, _ in items:
+            if not isinstance(title, str):
+                raise TypeError(f'Only string document ids can be saved to the memory-mapped index, got {title!r}')
+            titles.append(title.encode('utf8'))
+        offsets = np.zeros(len(titles) + 1, dtype=np.int64)
+        np.cumsum([len(title) for title in titles], out=offsets[1:])
+        order = sorted(range(len(items)), key=lambda pos: items[pos][0])
+
+        np.save(path / 'doc_nums.npy', np.array([num for _, num in items], dtype=np.int64))
+        np.save(path / 'doc_offsets.npy', offsets)
+        np.save(path / 'doc_titles.npy', np.frombuffer(b''.join(titles), dtype=np.uint8))
+        np.save(path / 'doc_title_order.npy', np.array(order, dtype=np.int64))
+
+
+def _save_csr(path: Path, prefix: str, matrix: Sparse) -> None:
+    # save indices with the dtype that scipy chooses on load, so the arrays are not copied
+    idx_dtype = get_index_dtype((matrix.indices, matrix.indptr), maxval=max(matrix.shape), check_contents=True)
+    np.save(path / f'{prefix}data.npy', matrix.data)
+    np.save(path / f'{prefix}indices.npy', matrix.indices.astype(idx_dtype, copy=False))
+    np.save(path / f'{prefix}indptr.npy', matrix.indptr.astype(idx_dtype, copy=False))
+
+
+def _load_csr(path: Path, prefix: str, shape: Tuple[int, int]) -> Sparse:
+    return Sparse((np.load(path / f'{prefix}data.npy', mmap_mode='r'),
+                   np.load(path / f'{prefix}indices.npy', mmap_mode='r'),
+                   np.load(path / f'{prefix}indptr.npy', mmap_mode='r')), shape=shape, copy=False)
+
+
+def save_tfidf_mmap(path: Union[str, Path], tfidf_matrix: Sparse, opts: Dict[str, Any]) -> None:
+    """Save tfidf matrix and vectorizer options as raw arrays that can be loaded with memory mapping.
+
+    Args:
+        path: a directory to save the files to
+        tfidf_matrix: a tfidf csr_matrix
+        opts: a dict with ``hash_size``, ``ngram_range``, ``doc_index`` and ``term_freqs`` keys and an optional
+            ``clipped_tf`` key with log1p term counts of the terms which idf was clipped to zero
+
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    _save_csr(path, '', tfidf_matrix)
+    if opts.get('clipped_tf') is not None:
+        _save_csr(path, 'clipped_', opts['clipped_tf'])
+    save_tfidf_opts(path, tfidf_matrix.shape, opts)
+
+
+def save_tfidf_opts(path: Path, shape: Tuple[int, int], opts: Dict[str, Any]) -> None:
+    """Save vectorizer options next to the tfidf matrix arrays already written to ``path`` directory.
+
+    Args:
+        path: a directory with the matrix arrays
+        shape: the matrix shape
+        opts: a dict with ``hash_size``, ``ngram_range``, ``doc_index`` and ``term_freqs`` keys
+
+    """
+    np.save(path / 'term_freqs.npy', np.asarray(opts['term_freqs']).squeeze())
+    MmapDocIndex.save(path, opts['doc_index'])
+
+    meta = {
+        'shape': [int(dim) for dim in shape],
+        'hash_size': int(opts['hash_size']),
+        'ngram_range': list(opts['ngram_range'])
+    }
+    with (path / META_FILENAME).open('w', encoding='utf8') as f:
+        json.dump(meta, f)
+
+
+def load_tfidf_mmap(path: Union[str, Path]) -> Tuple[Sparse, Dict[str, Any]]:
+    """Load tfidf matrix and vectorizer options saved by :func:`save_tfidf_mmap` without reading them into memory.
+
+    Args:
+        path: a directory with the saved files
+
+    Returns:
+        a tuple of tfidf matrix and a dict of vectorizer options
+
+    """
+    path = Path(path)
+    with (path / META_FILENAME).open(encoding='utf8') as f:
+        meta = json.load(f)
+
+    shape = tuple(meta['shape'])
+    matrix = _load_csr(path, '', shape)
+    opts = {
+        'hash_size': meta['hash_size'],
+        'ngram_range': meta['ngram_range'],
+        'term_freqs': np.load(path / 'term_freqs.npy', mmap_mode='r'),
+        'doc_index': MmapDocIndex(path),
+        'clipped_tf': _load_csr(path, 'clipped_', shape) if (path / 'clipped_data.npy').is_file() else None
+    }
+    return matrix, opts
+
+
+def load_tfidf_npz(path: Union[str, Path]) -> Tuple[Sparse, Dict[str, Any]]:
+    """Load tfidf matrix and vectorizer options saved by :class:`HashingTfIdfVectorizer` in **.npz** format.
+
+    Args:
+        path: a path to **.npz** file
+
+    Returns:
+        a tuple of tfidf matrix and a dict of vectorizer options
+
+    """
+    with np.load(path, allow_pickle=True) as loader:
+        matrix = Sparse((loader['data'], loader['indices'], loader['indptr']), shape=loader['shape'])
+        opts = loader['opts'].item(0)
+        opts['clipped_tf'] = None
+        if 'clipped_data' in loader.files:
+            opts['clipped_tf'] = Sparse((loader['clipped_data'], loader['clipped_indices'],
+                                         loader['clipped_indptr']), shape=loader['shape'])
+    return matrix, opts
+
+
+def convert_npz_to_mmap(npz_path: Union[str, Path], save_path: Union[str, Path]) -> None:
+    """Convert tfidf matrix saved by :class:`HashingTfIdfVectorizer` in **.npz** format to memory-mapped format.
+
+    Args:
+        npz_path: a path to **.npz** file
+        save_path: a directory to save the converted files to
+
+    """
+    logger.info(f'Loading tfidf matrix from {npz_path}')
+    matrix, opts = load_tfidf_npz(npz_path)
+    logger.info(f'Saving tfidf matrix to {save_path}')
+    save_tfidf_mmap(save_path, matrix, opts)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('npz_path', help='path to the .npz tfidf matrix', type=str)
+    parser.add_argument('save_path', help='directory to save the memory-mapped tfidf matrix to', type=str)
+    args = parser.parse_args()
+    convert_npz_to_mmap(args.npz_path, args.save_path)
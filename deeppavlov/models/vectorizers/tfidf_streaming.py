@@ -0,0 +1,263 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+from collections import Counter
+from logging import getLogger
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from scipy import sparse
+from sklearn.utils import murmurhash3_32
+
+from deeppavlov.core.models.component import Component
+from deeppavlov.models.vectorizers.tfidf_segments import get_idfs
+
+logger = getLogger(__name__)
+
+Sparse = sparse.csr_matrix
+
+Block = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+_worker_tokenizer: Optional[Component] = None
+_worker_hash_size: Optional[int] = None
+
+
+def count_hashes(tokenizer: Component, hash_size: int, docs: List[str], doc_nums: List[int]) -> Block:
+    """Tokenize documents and count hashed ngrams.
+
+    Args:
+        tokenizer: a tokenizer class
+        hash_size: a hash size
+        docs: a list of input documents
+        doc_nums: a list of document integer ids
+
+    Returns:
+        a tuple of term hashes, document integer ids and counts as compact numpy arrays
+
+    """
+    rows, cols, data = [], [], []
+    for ngrams, doc_num in zip(tokenizer(docs), doc_nums):
+        counts = Counter([murmurhash3_32(gram, positive=True) % hash_size for gram in ngrams])
+        rows.append(np.fromiter(counts.keys(), dtype=np.int32, count=len(counts)))
+        cols.append(np.full(len(counts), doc_num, dtype=np.int32))
+        data.append(np.fromiter(counts.values(), dtype=np.int32, count=len(counts)))
+    if not rows:
+        return np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0, np.int32)
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(data)
+
+
+def init_worker(tokenizer: Component, hash_size: int) -> None:
+    global _worker_tokenizer, _worker_hash_size
+    _worker_tokenizer = tokenizer
+    _worker_hash_size = hash_size
+
+
+def count_hashes_worker(shard: Tuple[List[str], List[int]]) -> Block:
+    return count_hashes(_worker_tokenizer, _worker_hash_size, *shard)
+
+
+class CountsSpool:
+    """Accumulates hashed ngram counts as numpy blocks and spills them to temporary files
+    when their size exceeds the memory budget.
+
+    Entries of a document are expected to be contiguous in a block, as :func:`count_hashes` returns them.
+    :attr:`has_duplicates` is set if a document is added more than once, so its (hash, document) pairs may repeat.
+
+    Args:
+        memory_budget: maximum size of the blocks kept in memory in megabytes, unlimited if ``None``
+
+    """
+
+    def __init__(self, memory_budget: Optional[int] = None) -> None:
+        self.memory_budget = None if memory_budget is None else memory_budget * 2 ** 20
+        self._blocks: List[Block] = []
+        self._in_memory = 0
+        self._files: List[Path] = []
+        self._tmp_dir: Optional[Path] = None
+        self._seen = np.zeros(0, dtype=bool)
+        self.has_duplicates = False
+
+    def _check_duplicates(self, cols: np.ndarray) -> None:
+        doc_nums = np.unique(cols)
+        if len(self._seen) <= doc_nums[-1]:
+            self._seen = np.concatenate([self._seen, np.zeros(max(doc_nums[-1] + 1, 2 * len(self._seen))
+                                                              - len(self._seen), dtype=bool)])
+        n_runs = 1 + np.count_nonzero(np.diff(cols))
+        if n_runs > len(doc_nums) or self._seen[doc_nums].any():
+            self.has_duplicates = True
+        self._seen[doc_nums] = True
+
+    def add(self, rows: np.ndarray, cols: np.ndarray, data: np.ndarray) -> None:
+        if len(rows) == 0:
+            return
+        self._check_duplicates(cols)
+        self._blocks.append((rows, cols, data))
+        self._in_memory += rows.nbytes + cols.nbytes + data.nbytes
+        if self.memory_budget is not None and self._in_memory > self.memory_budget:
+            self._spill()
+
+    def _spill(self) -> None:
+        if self._tmp_dir is None:
+            self._tmp_dir = Path(tempfile.mkdtemp(prefix='tfidf_counts_'))
+        block = tuple(np.concatenate(arrays) for arrays in zip(*self._blocks))
+        path = self._tmp_dir / f'block_{len(self._files)}.npz'
+        np.savez(path, rows=block[0], cols=block[1], data=block[2])
+        logger.info(f'Spilled {len(block[0])} counts to {path}')
+        self._files.append(path)
+        self._blocks.clear()
+        self._in_memory = 0
+
+    def blocks(self) -> Iterator[Block]:
+        for path in self._files:
+            with np.load(path) as loader:
+                yield loader['rows'], loader['cols'], loader['data']
+        yield from self._blocks
+
+    def clear(self) -> None:
+        self._blocks.clear()
+        self._in_memory = 0
+        self._files.clear()
+        self._seen = np.zeros(0, dtype=bool)
+        self.has_duplicates = False
+        if self._tmp_dir is not None:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+
+
+def _sum_duplicates(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, row_counts: np.ndarray,
+                    chunk_rows: int) -> np.ndarray:
+    """Sum counts of repeated entries of every row in place, moving the entries to the beginning of the arrays.
+
+    Returns:
+        new numbers of entries in every row, ``indptr`` is updated to them
+
+    """
+    hash_size = len(row_counts)
+    new_row_counts = np.zeros_like(row_counts)
+    write = 0
+    for start in range(0, hash_size, chunk_rows):
+        end = min(start + chunk_rows, hash_size)
+        lo, hi = indptr[start], indptr[end]
+        if lo == hi:
+            continue
+        rows = np.repeat(np.arange(start, end), row_counts[start:end])
+        cols, counts = np.array(indices[lo:hi]), np.array(data[lo:hi])
+        order = np.lexsort((cols, rows))
+        rows, cols, counts = rows[order], cols[order], counts[order]
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+        starts = np.flatnonzero(first)
+        # entries are only moved towards the beginning, so unread chunks are not overwritten
+        indices[write:write + len(starts)] = cols[starts]
+        data[write:write + len(starts)] = np.add.reduceat(counts, starts)
+        new_row_counts[start:end] = np.bincount(rows[starts] - start, minlength=end - start)
+        write += len(starts)
+    np.cumsum(new_row_counts, out=indptr[1:])
+    return new_row_counts
+
+
+def build_tfidf_matrix(spool: CountsSpool, hash_size: int, n_docs: int, out_dir: Optional[Path] = None,
+                       chunk_rows: int = 2 ** 16) -> Tuple[Sparse, np.ndarray, Sparse]:
+    """Merge counts blocks into a tfidf csr_matrix of shape [hash_size X n_docs] without building a COO matrix.
+
+    The first pass over the blocks counts entries in every row, the second one writes entries to their final
+    positions. If a document was added to the spool more than once, counts of its repeated (hash, document) pairs
+    are summed chunk by chunk, as a COO matrix does. Tfidf values are computed in place chunk by chunk.
+    If ``out_dir`` is set, matrix arrays are written to **.npy** files there with memory mapping, so the matrix is
+    not kept in RAM. Entries of the terms which idf is clipped to zero are kept in the tfidf matrix as explicit
+    zeros and their log1p counts are copied to a separate matrix.
+
+    Args:
+        spool: accumulated counts blocks
+        hash_size: a hash size
+        n_docs: number of documents
+        out_dir: a directory to write matrix arrays to
+        chunk_rows: number of matrix rows to process at once while computing tfidf values
+
+    Returns:
+        a tuple of tfidf matrix, term frequences and log1p counts of the terms with clipped idf
+
+    """
+    row_counts = np.zeros(hash_size, dtype=np.int64)
+    for rows, _, _ in spool.blocks():
+        row_counts += np.bincount(rows, minlength=hash_size)
+    nnz = int(row_counts.sum())
+    idx_dtype = np.int32 if max(nnz, hash_size, n_docs) < np.iinfo(np.int32).max else np.int64
+
+    def allocate(name: str, dtype: type, size: int) -> np.ndarray:
+        if out_dir is None:
+            return np.empty(size, dtype=dtype)
+        return open_memmap(str(out_dir / f'{name}.npy'), mode='w+', dtype=dtype, shape=(size,))
+
+    def truncate(name: str, array: np.ndarray, size: int) -> np.ndarray:
+        if out_dir is None:
+            return array[:size]
+        # memory-mapped files can't be truncated, so the entries are copied to a file of the right size
+        np.save(out_dir / f'{name}.tmp.npy', array[:size])
+        os.replace(out_dir / f'{name}.tmp.npy', out_dir / f'{name}.npy')
+        return open_memmap(str(out_dir / f'{name}.npy'), mode='r+')
+
+    indptr = allocate('indptr', idx_dtype, hash_size + 1)
+    indptr[0] = 0
+    np.cumsum(row_counts, out=indptr[1:])
+    indices = allocate('indices', idx_dtype, nnz)
+    data = allocate('data', np.float64, nnz)
+
+    cursor = np.array(indptr[:-1], dtype=np.int64)
+    for rows, cols, counts in spool.blocks():
+        order = np.argsort(rows, kind='stable')
+        rows, cols, counts = rows[order], cols[order], counts[order]
+        block_rows, starts, block_counts = np.unique(rows, return_index=True, return_counts=True)
+        positions = np.arange(len(rows)) - np.repeat(starts, block_counts) + np.repeat(cursor[block_rows],
+                                                                                      block_counts)
+        indices[positions] = cols
+        data[positions] = counts
+        cursor[block_rows] += block_counts
+
+    if spool.has_duplicates:
+        row_counts = _sum_duplicates(indptr, indices, data, row_counts, chunk_rows)
+        nnz = int(indptr[-1])
+        indices, data = truncate('indices', indices, nnz), truncate('data', data, nnz)
+
+    # counts are positive and (hash, document) pairs are unique, so term frequency is the number of row entries
+    term_freqs = row_counts
+    idfs = get_idfs(term_freqs, n_docs)
+    clipped_row_counts = np.where(idfs > 0, 0, row_counts)
+    clipped_indptr = allocate('clipped_indptr', idx_dtype, hash_size + 1)
+    clipped_indptr[0] = 0
+    np.cumsum(clipped_row_counts, out=clipped_indptr[1:])
+    clipped_nnz = int(clipped_indptr[-1])
+    clipped_indices = allocate('clipped_indices', idx_dtype, clipped_nnz)
+    clipped_data = allocate('clipped_data', np.float64, clipped_nnz)
+    for start in range(0, hash_size, chunk_rows):
+        end = min(start + chunk_rows, hash_size)
+        lo, hi = indptr[start], indptr[end]
+        tfs = np.log1p(data[lo:hi])
+        entry_idfs = np.repeat(idfs[start:end], row_counts[start:end])
+        clipped = entry_idfs <= 0
+        clipped_lo, clipped_hi = clipped_indptr[start], clipped_indptr[end]
+        clipped_indices[clipped_lo:clipped_hi] = indices[lo:hi][clipped]
+        clipped_data[clipped_lo:clipped_hi] = tfs[clipped]
+        data[lo:hi] = tfs * entry_idfs
+
+    matrix = Sparse((data, indices, indptr), shape=(hash_size, n_docs), copy=False)
+    matrix.has_sorted_indices = False
+    clipped_tf = Sparse((clipped_data, clipped_indices, clipped_indptr), shape=(hash_size, n_docs), copy=False)
+    clipped_tf.has_sorted_indices = False
+    return matrix, term_freqs, clipped_tf
@@ -0,0 +1,163 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from logging import getLogger
+from typing import Dict, List, Optional, Tuple
+
+from deeppavlov.core.common.chainer import Chainer
+
+log = getLogger(__name__)
+
+
+class MicroBatcher:
+    """Gathers concurrent requests to the model into one batch and splits the model response back.
+
+    Requests are queued and processed by a single background coroutine. It takes the first queued request and
+    waits no longer than ``max_wait_ms`` for other requests until the total number of samples reaches
+    ``max_batch_size``. A request that does not fit into the current batch is carried over to the next one,
+    a request that is larger than ``max_batch_size`` is processed as a separate batch. If the model fails on a batch
+    of several requests, they are processed again one by one, so only the requests the model fails on get an error.
+
+    Args:
+        model: DeepPavlov model to infer.
+        max_batch_size: Maximum number of samples in one model call.
+        max_wait_ms: Maximum time in milliseconds to wait for other requests after the first one was received.
+
+    """
+
+    def __init__(self, model: Chainer, max_batch_size: int, max_wait_ms: float) -> None:
+        self._model = model
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._carried: Optional[Tuple[List[list], asyncio.Future]] = None
+        self._batches_count = 0
+        self._requests_count = 0
+        self._samples_count = 0
+
+    def start(self) -> None:
+        """Creates requests queue and runs batching coroutine. Should be called from the running event loop."""
+        self._queue = asyncio.Queue()
+        asyncio.ensure_future(self._run())
+
+    async def __call__(self, model_args: List[list]) -> List[tuple]:
+        """Puts request to the queue and waits for the model response.
+
+        Args:
+            model_args: List of model arguments values. All values should have the same length.
+
+        Returns:
+            List of model outputs for each sample of the request.
+
+        """
+        future = asyncio.get_event_loop().create_future()
+        await self._queue.put((model_args, future))
+        return await future
+
+    def get_stats(self) -> Dict[str, float]:
+        """Returns current queue depth and accumulated statistics of the processed batches."""
+        queue_depth = self._queue.qsize() if self._queue is not None else 0
+        queue_depth += self._carried is not None
+        batches_count = self._batches_count or 1
+        return {
+            'queue_depth': queue_depth,
+            'batches': self._batches_count,
+            'requests': self._requests_count,
+            'samples': self._samples_count,
+            'mean_batch_size': self._samples_count / batches_count,
+            'batch_fill_ratio': self._samples_count / (batches_count * self._max_batch_size)
+        }
+
+    async def _collect(self) -> List[Tuple[List[list], asyncio.Future]]:
+        if self._carried is not None:
+            requests = [self._carried]
+            self._carried = None
+        else:
+            requests = [await self._queue.get()]
+        batch_size = len(requests[0][0][0])
+
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + self._max_wait
+        while batch_size < self._max_batch_size:
+            timeout = deadline - loop.time()
+            try:
+                if timeout > 0:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                else:
+                    request = self._queue.get_nowait()
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+            request_size = len(request[0][0])
+            if batch_size + request_size > self._max_batch_size:
+                self._carried = request
+                break
+            requests.append(request)
+            batch_size += request_size
+        return requests
+
+    def _infer(self, requests: List[Tuple[List[list], asyncio.Future]]) -> List[List[tuple]]:
+        model_args = [sum(args, []) for args in zip(*[request_args for request_args, _ in requests])]
+        prediction = self._model(*model_args)
+        if len(self._model.out_params) == 1:
+            prediction = [prediction]
+        prediction = list(zip(*prediction))
+
+        results = []
+        start = 0
+        for request_args, _ in requests:
+            end = start + len(request_args[0])
+            results.append(prediction[start:end])
+            start = end
+        return results
+
+    async def _run(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            requests = await self._collect()
+            self._batches_count += 1
+            self._requests_count += len(requests)
+            self._samples_count += sum(len(request_args[0]) for request_args, _ in requests)
+            try:
+                results = await loop.run_in_executor(None, self._infer, requests)
+            except Exception as e:
+                if len(requests) == 1:
+                    log.exception('Error while processing batch')
+                    self._set_exception(requests[0], e)
+                    continue
+                # the batch is retried request by request, so only the failing requests get an error
+                log.exception(f'Error while processing batch of {len(requests)} requests, retrying them one by one')
+                for request in requests:
+                    try:
+                        result, = await loop.run_in_executor(None, self._infer, [request])
+                    except Exception as e:
+                        log.exception('Error while processing request')
+                        self._set_exception(request, e)
+                    else:
+                        self._set_result(request, result)
+                continue
+            for request, result in zip(requests, results):
+                self._set_result(request, result)
+
+    @staticmethod
+    def _set_result(request: Tuple[List[list], asyncio.Future], result: List[tuple]) -> None:
+        future = request[1]
+        if not future.done():
+            future.set_result(result)
+
+    @staticmethod
+    def _set_exception(request: Tuple[List[list], asyncio.Future], error: Exception) -> None:
+        future = request[1]
+        if not future.done():
+            future.set_exception(error)
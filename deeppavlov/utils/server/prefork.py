@@ -0,0 +1,120 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import os
+import signal
+from logging import getLogger
+from multiprocessing import Array
+from typing import Dict
+
+import uvicorn
+
+log = getLogger(__name__)
+
+
+class WorkersReadiness:
+    """Shared between server processes flags that indicate which workers are ready to process requests.
+
+    Args:
+        workers: Number of server worker processes.
+
+    """
+
+    def __init__(self, workers: int) -> None:
+        self._flags = Array('b', workers)
+
+    def set_ready(self, worker_id: int, ready: bool = True) -> None:
+        self._flags[worker_id] = ready
+
+    def get_status(self) -> Dict[str, int]:
+        flags = self._flags[:]
+        return {'workers': len(flags), 'ready': sum(flags)}
+
+    @property
+    def all_ready(self) -> bool:
+        return all(self._flags[:])
+
+
+def run_prefork(config: uvicorn.Config, workers: int, readiness: WorkersReadiness) -> None:
+    """Runs several uvicorn servers in the processes forked from the current one.
+
+    The model should be built before the function call, so workers share model memory pages with the parent process
+    copy-on-write. All workers accept connections from the one listening socket, so incoming requests are balanced
+    between them by the OS. Worker that exited unexpectedly is replaced by a new one forked from the parent process.
+
+    Args:
+        config: Uvicorn server configuration.
+        workers: Number of worker processes.
+        readiness: Workers readiness flags. Worker is marked as ready on the server startup.
+
+    """
+    sock = config.bind_socket()
+    if hasattr(gc, 'freeze'):
+        # move objects to the permanent generation so the garbage collector doesn't touch shared pages
+        gc.collect()
+        gc.freeze()
+
+    pids = {}
+    shutting_down = False
+
+    def fork_worker(worker_id: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            # the child must never return to the parent's supervising loop, whatever happens in the server
+            code = 1
+            try:
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                config.app.add_event_handler('startup', lambda: readiness.set_ready(worker_id))
+                uvicorn.Server(config).run(sockets=[sock])
+                code = 0
+            except BaseException:
+                log.exception(f'Worker {worker_id} failed')
+            finally:
+                os._exit(code)
+        log.info(f'Started worker {worker_id} with pid {pid}')
+        pids[pid] = worker_id
+
+    def shutdown(signum, frame) -> None:
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    for worker_id in range(workers):
+        fork_worker(worker_id)
+
+    while pids:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        worker_id = pids.pop(pid, None)
+        if worker_id is None:
+            continue
+        readiness.set_ready(worker_id, False)
+        if not shutting_down:
+            log.error(f'Worker {worker_id} with pid {pid} exited with status {status}, restarting')
+            fork_worker(worker_id)
+
+    sock.close()
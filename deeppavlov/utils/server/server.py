@@ -26,7 +26,7 @@ from pydantic import BaseConfig, BaseModel
 from pydantic.fields import Field, ModelField
 from pydantic.main import ModelMetaclass
 from starlette.middleware.cors import CORSMiddleware
-from starlette.responses import RedirectResponse
+from starlette.responses import JSONResponse, RedirectResponse
 
 from deeppavlov.core.commands.infer import build_model
 from deeppavlov.core.commands.utils import parse_config
@@ -36,6 +36,8 @@ from deeppavlov.core.common.log import log_config
 from deeppavlov.core.common.paths import get_settings_path
 from deeppavlov.core.data.utils import check_nested_dict_keys, jsonify_data
 from deeppavlov.utils.connector import DialogLogger
+from deeppavlov.utils.server.batching import MicroBatcher
+from deeppavlov.utils.server.prefork import WorkersReadiness, run_prefork
 
 SERVER_CONFIG_PATH = get_settings_path() / 'server_config.json'
 SSLConfig = namedtuple('SSLConfig', ['version', 'keyfile', 'certfile'])
@@ -116,9 +118,9 @@ def redirect_root_to_docs(fast_app: FastAPI, func_name: str, endpoint: str, meth
         return response
 
 
-def interact(model: Chainer, payload: Dict[str, Optional[List]]) -> List:
+def get_model_args(payload: Dict[str, Optional[List]]) -> List[list]:
+    """Validates request payload and returns model arguments with ``None`` values replaced by lists of ``None``."""
     model_args = payload.values()
-    dialog_logger.log_in(payload)
     error_msg = None
     lengths = {len(model_arg) for model_arg in model_args if model_arg is not None}
 
@@ -134,7 +136,12 @@ def interact(model: Chainer, payload: Dict[str, Optional[List]]) -> List:
         raise HTTPException(status_code=400, detail=error_msg)
 
     batch_size = next(iter(lengths))
-    model_args = [arg or [None] * batch_size for arg in model_args]
+    return [arg or [None] * batch_size for arg in model_args]
+
+
+def interact(model: Chainer, payload: Dict[str, Optional[List]]) -> List:
+    dialog_logger.log_in(payload)
+    model_args = get_model_args(payload)
 
     prediction = model(*model_args)
     if len(model.out_params) == 1:
@@ -145,6 +152,16 @@ def interact(model: Chainer, payload: Dict[str, Optional[List]]) -> List:
     return result
 
 
+async def batched_interact(batcher: MicroBatcher, payload: Dict[str, Optional[List]]) -> List:
+    dialog_logger.log_in(payload)
+    model_args = get_model_args(payload)
+
+    prediction = await batcher(model_args)
+    result = jsonify_data(prediction)
+    dialog_logger.log_out(result)
+    return result
+
+
 def test_interact(model: Chainer, payload: Dict[str, Optional[List]]) -> List[str]:
     model_args = [arg or ["Test string."] for arg in payload.values()]
     try:
@@ -158,12 +175,14 @@ def start_model_server(model_config: Path,
                        https: Optional[bool] = None,
                        ssl_key: Optional[str] = None,
                        ssl_cert: Optional[str] = None,
-                       port: Optional[int] = None) -> None:
+                       port: Optional[int] = None,
+                       workers: Optional[int] = None) -> None:
 
     server_params = get_server_params(model_config)
 
     host = server_params['host']
     port = port or server_params['port']
+    workers = workers or server_params.get('workers', 1)
     model_endpoint = server_params['model_endpoint']
     model_args_names = server_params['model_args_names']
 
@@ -171,6 +190,19 @@ def start_model_server(model_config: Path,
 
     model = build_model(model_config)
 
+    if server_params.get('profile', False):
+        model.enable_profiling()
+
+    readiness = WorkersReadiness(workers)
+    if workers == 1:
+        app.add_event_handler('startup', lambda: readiness.set_ready(0))
+
+    max_batch_size = server_params.get('max_batch_size', 1)
+    batcher = None
+    if max_batch_size > 1:
+        batcher = MicroBatcher(model, max_batch_size, server_params.get('max_wait_ms', 0))
+        app.add_event_handler('startup', batcher.start)
+
     def batch_decorator(cls: ModelMetaclass) -> ModelMetaclass:
         cls.__annotations__ = {arg_name: list for arg_name in model_args_names}
         cls.__fields__ = {arg_name: ModelField(name=arg_name, type_=list, class_validators=None,
@@ -188,6 +220,8 @@ def start_model_server(model_config: Path,
 
     @app.post(model_endpoint, summary='A model endpoint')
     async def answer(item: Batch = Body(..., example=model_endpoint_post_example)) -> List:
+        if batcher is not None:
+            return await batched_interact(batcher, item.dict())
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, interact, model, item.dict())
 
@@ -200,5 +234,24 @@ def start_model_server(model_config: Path,
     async def api() -> List[str]:
         return model_args_names
 
-    uvicorn.run(app, host=host, port=port, log_config=log_config, ssl_version=ssl_config.version,
-                ssl_keyfile=ssl_config.keyfile, ssl_certfile=ssl_config.certfile, timeout_keep_alive=20)
+    if batcher is not None:
+        @app.get('/batching', summary='Requests batching statistics')
+        async def batching() -> Dict[str, float]:
+            return batcher.get_stats()
+
+    if server_params.get('profile', False) or model.get_cache_stats():
+        @app.get('/metrics', summary='Pipeline components statistics')
+        async def metrics() -> Dict[str, Dict[str, Dict[str, float]]]:
+            return {'profile': model.get_profile(), 'caches': model.get_cache_stats()}
+
+    @app.get('/ready', summary='Server workers readiness')
+    async def ready() -> JSONResponse:
+        status_code = 200 if readiness.all_ready else 503
+        return JSONResponse(readiness.get_status(), status_code=status_code)
+
+    config = uvicorn.Config(app, host=host, port=port, log_config=log_config, ssl_version=ssl_config.version,
+                            ssl_keyfile=ssl_config.keyfile, ssl_certfile=ssl_config.certfile, timeout_keep_alive=20)
+    if workers > 1:
+        run_prefork(config, workers, readiness)
+    else:
+        uvicorn.Server(config).run()
@@ -0,0 +1,108 @@
+import pickle
+import threading
+
+import numpy as np
+import pytest
+
+from deeppavlov.core.trainers.async_checkpointer import AsyncCheckpointer
+
+
+class FakeModel:
+    """Model which writes its weights to an index file and a data file like TensorFlow checkpoints"""
+
+    async_saveable = True
+
+    def __init__(self, save_path):
+        self.save_path = save_path
+        self.weights = {'dense/kernel': np.arange(6.).reshape(2, 3), 'dense/bias': np.zeros(3)}
+
+    def train_step(self):
+        for value in self.weights.values():
+            value += 1
+
+    def snapshot(self):
+        return tuple((name, value.copy()) for name, value in self.weights.items())
+
+    @staticmethod
+    def write_snapshot(snapshot, path):
+        path.with_name(path.name + '.data-00000-of-00001').write_bytes(pickle.dumps([value for _, value in snapshot]))
+        path.with_name(path.name + '.index').write_bytes(pickle.dumps([name for name, _ in snapshot]))
+
+    def save(self):
+        self.write_snapshot(self.snapshot(), self.save_path)
+
+
+class FailingModel(FakeModel):
+    def __init__(self, save_path):
+        super().__init__(save_path)
+        self.fail = threading.Event()
+
+    def write_snapshot(self, snapshot, path):
+        if self.fail.is_set():
+            raise OSError('No space left on device')
+        super().write_snapshot(snapshot, path)
+
+
+def read_checkpoint(path):
+    return {suffix: path.with_name(path.name + suffix).read_bytes() for suffix in ['.index', '.data-00000-of-00001']}
+
+
+def test_async_save_equals_sync_save(tmp_path):
+    (tmp_path / 'async').mkdir()
+    (tmp_path / 'sync').mkdir()
+    model = FakeModel(tmp_path / 'async' / 'model')
+    sync_model = FakeModel(tmp_path / 'sync' / 'model')
+    checkpointer = AsyncCheckpointer(keep=2)
+    for _ in range(3):
+        model.train_step()
+        sync_model.train_step()
+        assert checkpointer.save(model)
+        sync_model.save()
+        # training goes on while the checkpoint is written, the written values are the ones at save
+        model.train_step()
+        checkpointer.flush()
+        assert read_checkpoint(model.save_path) == read_checkpoint(sync_model.save_path)
+        sync_model.train_step()
+
+    assert sorted(path.name for path in (tmp_path / 'async').iterdir()) == [
+        'model-2.data-00000-of-00001', 'model-2.index', 'model-3.data-00000-of-00001', 'model-3.index',
+        'model.data-00000-of-00001', 'model.index']
+    assert read_checkpoint(tmp_path / 'async' / 'model-3') == read_checkpoint(sync_model.save_path)
+
+
+def test_write_errors_are_raised_on_flush(tmp_path):
+    model = FailingModel(tmp_path / 'model')
+    checkpointer = AsyncCheckpointer()
+    assert checkpointer.save(model)
+    checkpointer.flush()
+    saved = read_checkpoint(model.save_path)
+
+    model.train_step()
+    model.fail.set()
+    assert checkpointer.save(model)
+    with pytest.raises(OSError, match='No space left'):
+        checkpointer.flush()
+    # the error is raised once and the last complete checkpoint is kept
+    checkpointer.flush()
+    assert read_checkpoint(model.save_path) == saved
+
+    assert checkpointer.save(model)
+    with pytest.raises(OSError):
+        # a pending error is raised by the next save before it starts a new checkpoint
+        checkpointer.save(model)
+
+
+def test_synchronous_fallback(tmp_path):
+    class NotSaveable(FakeModel):
+        async_saveable = False
+
+    class NoSnapshot(FakeModel):
+        def snapshot(self):
+            raise NotImplementedError('model has saveable objects which are not variables')
+
+    checkpointer = AsyncCheckpointer()
+    assert not checkpointer.save(NotSaveable(tmp_path / 'model'))
+    assert not checkpointer.save(NoSnapshot(tmp_path / 'model'))
+    assert not checkpointer.save(FakeModel(None))
+    checkpointer.flush()
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,76 @@
+import random
+
+import numpy as np
+import pytest
+
+from deeppavlov.models.kbqa.compact_inverted_index import CompactInvertedIndex
+
+
+def make_index(n_entities=300, seed=0):
+    rng = random.Random(seed)
+    vocabulary = ['moscow', 'river', 'москва', 'река', 'straße', 'état', 'a', 'ab', 'abc', 'b', '東京', 'x' * 50]
+    vocabulary += [f'token{n}' for n in range(100)]
+    entities_list = [f'Q{n}' for n in range(n_entities)]
+    q2name = []
+    inverted_index = {}
+    for entity_num in range(n_entities):
+        names = [' '.join(rng.sample(vocabulary, rng.randint(1, 3))) for _ in range(rng.randint(1, 3))]
+        q2name.append(names)
+        popularity = rng.randint(0, 1000)
+        for token in set(' '.join(names).split()):
+            inverted_index.setdefault(token, []).append((entity_num, popularity))
+    for postings in inverted_index.values():
+        rng.shuffle(postings)
+    return inverted_index, entities_list, q2name
+
+
+class TestCompactInvertedIndex:
+    @pytest.fixture(autouse=True)
+    def build_index(self, tmp_path):
+        self.inverted_index, self.entities_list, self.q2name = make_index()
+        self.path = tmp_path / 'index'
+        CompactInvertedIndex.build(self.path, self.inverted_index, self.entities_list, self.q2name)
+        self.index = CompactInvertedIndex(self.path)
+
+    def test_same_lookups_as_dict(self):
+        assert len(self.index) == len(self.inverted_index)
+        assert list(self.index.keys()) == sorted(self.inverted_index)
+        for token, postings in self.inverted_index.items():
+            assert token in self.index
+            assert self.index[token] == sorted(postings)
+            entity_nums, popularities = self.index.postings(token)
+            assert list(zip(entity_nums.tolist(), popularities.tolist())) == sorted(postings)
+        for token in ['', 'mosc', 'moscow ', 'token1000', 'zzz', 'Москва']:
+            assert (token in self.index) == (token in self.inverted_index)
+
+    def test_missing_token(self):
+        with pytest.raises(KeyError):
+            self.index['missing']
+        with pytest.raises(KeyError):
+            self.index.postings('missing')
+
+    def test_entities_and_names(self):
+        assert list(self.index.entities_list) == self.entities_list
+        assert len(self.index.q2name) == len(self.q2name)
+        for entity_num, names in enumerate(self.q2name):
+            assert self.index.entities_list[entity_num] == self.entities_list[entity_num]
+            assert self.index.q2name[entity_num] == names
+
+    def test_merged_postings(self):
+        # candidate entities of several tokens are merged the same way for both indexes
+        tokens = ['moscow', 'river', 'москва']
+        expected = set()
+        for token in tokens:
+            expected.update(self.inverted_index[token])
+        postings = [self.index.postings(token) for token in tokens]
+        entity_nums, positions = np.unique(np.concatenate([nums for nums, _ in postings]), return_index=True)
+        popularities = np.concatenate([pops for _, pops in postings])[positions]
+        assert sorted(zip(entity_nums.tolist(), popularities.tolist())) == sorted(expected)
+
+    def test_rebuild(self):
+        inverted_index, entities_list, q2name = make_index(50, seed=1)
+        CompactInvertedIndex.build(self.path, inverted_index, entities_list, q2name)
+        index = CompactInvertedIndex(self.path)
+        assert list(index.keys()) == sorted(inverted_index)
+        assert list(index.entities_list) == entities_list
+        assert [p.name for p in self.path.parent.iterdir()] == ['index']
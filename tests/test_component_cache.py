@@ -0,0 +1,107 @@
+import time
+
+import numpy as np
+import pytest
+
+from deeppavlov.core.common.chainer import Chainer
+from deeppavlov.core.common.component_cache import ComponentCache
+from deeppavlov.core.common.errors import ConfigError
+
+batches = [['a', 'bb', 'a'], ['ccc', 'bb'], ['dddd', 'a', 'ccc', 'ee']]
+
+
+class CountingComponent:
+    def __init__(self, function):
+        self.function = function
+        self.calls = []
+
+    def __call__(self, batch):
+        self.calls.append(list(batch))
+        return self.function(batch)
+
+    def process_event(self, event_name, data):
+        pass
+
+
+def assert_same_outputs(output, expected):
+    assert type(output) is type(expected)
+    if isinstance(expected, np.ndarray):
+        assert output.dtype == expected.dtype
+        assert output.shape == expected.shape
+        for element, expected_element in zip(output, expected):
+            assert_same_outputs(element, expected_element)
+    elif isinstance(expected, (list, tuple)):
+        assert len(output) == len(expected)
+        for element, expected_element in zip(output, expected):
+            assert_same_outputs(element, expected_element)
+    else:
+        assert output == expected
+
+
+@pytest.mark.parametrize('function', [
+    lambda batch: [len(s) for s in batch],
+    lambda batch: tuple(s.upper() for s in batch),
+    lambda batch: np.array([[len(s), ord(s[0])] for s in batch], dtype=np.int32),
+    lambda batch: np.array([len(s) / 2 for s in batch], dtype=np.float32),
+    lambda batch: np.array(batch),
+    lambda batch: [np.arange(len(s)) for s in batch],
+    lambda batch: np.array([np.arange(len(s)) for s in batch] + [None], dtype=object)[:-1],
+], ids=['list', 'tuple', 'int32_matrix', 'float32', 'str_array', 'ragged_list', 'ragged_object_array'])
+def test_cached_outputs_equal_uncached(function):
+    component = CountingComponent(function)
+    cache = ComponentCache()
+    for batch in batches + batches:
+        assert_same_outputs(cache(component, [], [batch], True), function(batch))
+    assert component.calls == [['a', 'bb'], ['ccc'], ['dddd', 'ee']]
+    stats = cache.get_stats()
+    assert stats['misses'] == 5 and stats['hits'] == 13
+
+
+def test_several_outputs_and_keyword_inputs():
+    def function(words, counts):
+        return [w * c for w, c in zip(words, counts)], np.array(counts) * 2
+
+    cache = ComponentCache()
+    for words, counts in [(['a', 'b'], [1, 2]), (['b', 'c', 'a'], [2, 3, 1]), (['a', 'b'], [3, 2])]:
+        outputs = cache(function, ['words', 'counts'], [words, counts], False)
+        for output, expected in zip(outputs, function(words, counts)):
+            assert_same_outputs(output, expected)
+    assert cache.get_stats()['hits'] == 3
+
+
+def test_cached_results_are_copies():
+    cache = ComponentCache()
+    component = CountingComponent(lambda batch: [[len(s)] for s in batch])
+    first = cache(component, [], [['a', 'bb']], True)
+    first[0].append(100)
+    assert cache(component, [], [['a', 'bb']], True) == [[1], [2]]
+
+
+def test_size_and_ttl():
+    component = CountingComponent(lambda batch: [len(s) for s in batch])
+    cache = ComponentCache(size=2)
+    cache(component, [], [['a', 'bb', 'ccc']], True)
+    assert cache.get_stats()['size'] == 2 and cache.evictions == 1
+    cache(component, [], [['a']], True)
+    assert component.calls[-1] == ['a']
+
+    cache = ComponentCache(ttl=0.05)
+    cache(component, [], [['a']], True)
+    cache(component, [], [['a']], True)
+    time.sleep(0.1)
+    cache(component, [], [['a']], True)
+    assert cache.hits == 1 and cache.misses == 2
+
+
+def test_chainer_cache():
+    component = CountingComponent(lambda batch: [len(s) for s in batch])
+    chainer = Chainer(in_x=['x'], out_params=['y'])
+    chainer.append(component, ['x'], ['y'], cache={'size': 10})
+    assert chainer(['a', 'bb']) == [1, 2]
+    assert chainer(['bb', 'ccc']) == [2, 3]
+    assert component.calls == [['a', 'bb'], ['ccc']]
+    assert chainer.get_cache_stats()['CountingComponent']['hits'] == 1
+
+    chainer = Chainer(in_x=['x'], out_params=['y'], in_y=['y_true'])
+    with pytest.raises(ConfigError):
+        chainer.append(component, ['x'], ['y'], in_y=['y_true'], cache={})
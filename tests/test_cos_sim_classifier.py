@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+
+from deeppavlov.models.classifiers.cos_sim_classifier import CosineSimilarityClassifier
+
+rng = np.random.RandomState(0)
+x_train = rng.rand(60, 8) * (rng.rand(60, 8) > 0.5)
+y_train = [f'answer {n}' for n in rng.randint(0, 7, 60)]
+x_test = np.vstack([rng.rand(5, 8) * (rng.rand(5, 8) > 0.5), np.zeros((1, 8))])
+
+
+def reference_scores(q_vects, top_n):
+    """Label scores computed one label at a time over unsorted train samples"""
+    norms = np.linalg.norm(q_vects, axis=1, keepdims=True) * np.linalg.norm(x_train, axis=1)
+    cos_similarities = np.divide(q_vects @ x_train.T, norms, out=np.zeros((len(q_vects), len(x_train))),
+                                 where=(norms != 0))
+    y_labels = np.unique(y_train)
+    labels_scores = np.zeros((len(q_vects), len(y_labels)))
+    for i, label in enumerate(y_labels):
+        labels_scores[:, i] = np.max([cos_similarities[:, j] for j, value in enumerate(y_train) if value == label],
+                                     axis=0)
+    labels_scores_sum = labels_scores.sum(axis=1, keepdims=True)
+    labels_scores = np.divide(labels_scores, labels_scores_sum, out=np.zeros_like(labels_scores),
+                              where=(labels_scores_sum != 0))
+    answer_ids = np.argsort(labels_scores)[:, -top_n:]
+    answers = [y_labels[i] for ids in answer_ids for i in ids[::-1]]
+    scores = [np.round(labels_scores[n, i], 2) for n, ids in enumerate(answer_ids) for i in ids[::-1]]
+    return answers, scores
+
+
+def fit_classifier(sparse, top_n, path=None):
+    classifier = CosineSimilarityClassifier(top_n=top_n, save_path=path, load_path=path, mode='train')
+    vects = [csr_matrix(x) for x in x_train] if sparse else list(x_train)
+    classifier.fit(tuple(vects), tuple(y_train))
+    return classifier
+
+
+@pytest.mark.parametrize('sparse', [False, True])
+@pytest.mark.parametrize('top_n', [1, 3])
+def test_scores_equal_reference(sparse, top_n):
+    classifier = fit_classifier(sparse, top_n)
+    for batch in [x_test, x_test[:1], x_test[-1:]]:
+        q_vects = [csr_matrix(x) for x in batch] if sparse else list(batch)
+        answers, scores = classifier(q_vects)
+        expected_answers, expected_scores = reference_scores(batch, top_n)
+        assert answers == expected_answers
+        assert np.allclose(scores, expected_scores)
+
+
+def test_save_load(tmp_path):
+    path = tmp_path / 'faq_model.pkl'
+    classifier = fit_classifier(True, 2, path)
+    classifier.save()
+    loaded = CosineSimilarityClassifier(top_n=2, save_path=path, load_path=path, mode='infer')
+    q_vects = [csr_matrix(x) for x in x_test]
+    assert loaded(q_vects) == classifier(q_vects)
@@ -0,0 +1,65 @@
+from random import Random
+
+import numpy as np
+import pytest
+
+from deeppavlov.core.common.cross_validation import calc_cv_score, generate_folds
+
+
+def make_config(models_path):
+    return {
+        'dataset_iterator': {'class_name': 'data_learning_iterator'},
+        'chainer': {
+            'in': ['x'],
+            'in_y': ['y'],
+            'pipe': [
+                {'class_name': 'sklearn_component', 'model_class': 'sklearn.feature_extraction.text:TfidfVectorizer',
+                 'infer_method': 'transform', 'in': ['x'], 'fit_on': ['x'], 'out': ['x_vect'],
+                 'save_path': '{MODELS_PATH}/vectorizer.pkl', 'load_path': '{MODELS_PATH}/vectorizer.pkl'},
+                {'class_name': 'sklearn_component', 'model_class': 'sklearn.linear_model:LogisticRegression',
+                 'infer_method': 'predict', 'in': ['x_vect'], 'fit_on': ['x_vect', 'y'], 'out': ['y_pred'],
+                 'save_path': '{MODELS_PATH}/logreg.pkl', 'load_path': '{MODELS_PATH}/logreg.pkl'}
+            ],
+            'out': ['y_pred']
+        },
+        'train': {
+            'class_name': 'fit_trainer',
+            'metrics': ['accuracy', 'f1_macro'],
+            'evaluation_targets': ['valid']
+        },
+        'metadata': {'variables': {'MODELS_PATH': str(models_path)}}
+    }
+
+
+def make_data(n=60, seed=0):
+    rng = Random(seed)
+    words = {'a': ['cat', 'dog', 'mouse'], 'b': ['car', 'bus', 'train'], 'c': ['red', 'green', 'blue']}
+    samples = []
+    for _ in range(n):
+        label = rng.choice('abc')
+        # every word is taken from the words of the label only with probability 0.5, so the folds differ in scores
+        text = ' '.join(rng.choice(words[label if rng.random() < 0.5 else rng.choice('abc')]) for _ in range(2))
+        samples.append((text, label))
+    return {'train': samples[:40], 'valid': samples[40:], 'test': []}
+
+
+@pytest.mark.parametrize('n_folds', [3, 5])
+def test_parallel_equals_sequential(tmp_path, n_folds):
+    data = make_data()
+    np.random.seed(0)
+    expected = calc_cv_score(make_config(tmp_path / 'sequential'), data=data, n_folds=n_folds)
+    np.random.seed(0)
+    scores = calc_cv_score(make_config(tmp_path / 'parallel'), data=data, n_folds=n_folds, n_jobs=2)
+
+    assert list(scores) == list(expected) == ['accuracy', 'f1_macro']
+    assert [scores[key] for key in scores] == pytest.approx([expected[key] for key in expected])
+    # models of the folds are removed
+    assert not list((tmp_path / 'parallel').glob('**/*.pkl'))
+
+
+def test_generate_folds():
+    folds = list(generate_folds(10, n_folds=3))
+    assert len(folds) == 3
+    assert sorted(i for _, valid in folds for i in valid) == list(range(10))
+    assert all(sorted(train + valid) == list(range(10)) for train, valid in folds)
+    assert list(generate_folds(3, is_loo=True)) == [([1, 2], [0]), ([0, 2], [1]), ([0, 1], [2])]
@@ -0,0 +1,133 @@
+from collections import Counter
+from random import Random
+
+import numpy as np
+import pytest
+
+from deeppavlov.core.data.data_learning_iterator import DataLearningIterator, example_length
+from deeppavlov.dataset_iterators.morphotagger_iterator import MorphoTaggerDatasetIterator
+from deeppavlov.dataset_iterators.ner_few_shot_iterator import NERFewShotIterator
+
+
+def make_data(n=200, seed=0):
+    rng = Random(seed)
+    return [(' '.join(['token'] * rng.randint(1, 40)), n) for n in range(n)]
+
+
+def collect(iterator, batch_size, data_type='train', shuffle=None):
+    return [list(y) for _, y in iterator.gen_batches(batch_size, data_type, shuffle)]
+
+
+def test_example_length():
+    assert example_length('a b  c') == 3
+    assert example_length(['a', 'b']) == 2
+    assert example_length(('a b', ['c'], 'd')) == 4
+    assert example_length(5) == 1
+
+
+@pytest.mark.parametrize('shuffle', [False, True])
+def test_default_batches(shuffle):
+    data = make_data()
+    iterator = DataLearningIterator({'train': data}, seed=1, shuffle=shuffle)
+    order = list(range(len(data)))
+    if shuffle:
+        Random(1).shuffle(order)
+    assert collect(iterator, 32) == [order[i:i + 32] for i in range(0, len(data), 32)]
+    assert iterator.padding_stats == {}
+
+
+@pytest.mark.parametrize('bucket_batches', [1, 4, 100])
+def test_bucket_sizes(bucket_batches):
+    data = make_data()
+    lengths = [example_length(x) for x, _ in data]
+    iterator = DataLearningIterator({'train': data}, seed=1, bucket_batches=bucket_batches)
+    batches = collect(iterator, 16)
+
+    assert sorted(sum(batches, [])) == list(range(len(data)))
+    assert all(0 < len(batch) <= 16 for batch in batches)
+    assert all(lengths[a] <= lengths[b] for batch in batches for a, b in zip(batch, batch[1:]))
+    stats = iterator.padding_stats['train']
+    assert stats['batches'] == len(batches)
+    assert stats['padding_ratio'] <= stats['unbucketed_padding_ratio']
+
+
+@pytest.mark.parametrize('max_tokens', [40, 100, 1000])
+def test_token_budget(max_tokens):
+    data = make_data()
+    lengths = [example_length(x) for x, _ in data]
+    iterator = DataLearningIterator({'train': data}, seed=1, max_tokens=max_tokens)
+    batches = collect(iterator, 16)
+
+    assert sorted(sum(batches, [])) == list(range(len(data)))
+    for batch in batches:
+        assert 0 < len(batch) <= 16
+        assert len(batch) == 1 or len(batch) * max(lengths[i] for i in batch) <= max_tokens
+    if max_tokens >= 16 * max(lengths):
+        assert Counter(len(batch) for batch in batches)[16] == len(data) // 16
+
+
+def test_long_example_makes_own_batch():
+    data = [('a ' * 50, 0), ('a', 1), ('a a', 2)]
+    iterator = DataLearningIterator({'train': data}, shuffle=False, max_tokens=10)
+    assert collect(iterator, 8) == [[1, 2], [0]]
+
+
+def test_padding_stats():
+    data = [('a', 0), ('a a a a', 1), ('a', 2), ('a a a a', 3)]
+    iterator = DataLearningIterator({'train': data}, shuffle=False, bucket_batches=2)
+    assert collect(iterator, 2) == [[0, 2], [1, 3]]
+    stats = iterator.padding_stats['train']
+    assert stats['padding_ratio'] == 0.
+    assert stats['unbucketed_padding_ratio'] == pytest.approx(1 - 10 / 16)
+    assert stats['batches'] == 2
+
+
+def test_same_seed_same_batches():
+    data = make_data()
+    first = DataLearningIterator({'train': data}, seed=5, bucket_batches=4, max_tokens=200)
+    second = DataLearningIterator({'train': data}, seed=5, bucket_batches=4, max_tokens=200)
+    for _ in range(3):
+        assert collect(first, 16) == collect(second, 16)
+
+
+def make_tagged_data(n=100, seed=0):
+    rng = Random(seed)
+    data = []
+    for _ in range(n):
+        tokens = ['w'] * rng.randint(1, 30)
+        data.append((tokens, [rng.choice(['O', 'B-PER', 'I-PER', 'B-LOC']) for _ in tokens]))
+    return data
+
+
+def test_ner_few_shot_iterator_forwards_bucketing():
+    np.random.seed(0)
+    iterator = NERFewShotIterator({'train': make_tagged_data(), 'valid': make_tagged_data(20, 1)}, seed=1,
+                                  target_tag='PER', n_train_samples=30, max_tokens=60)
+    x_train, _ = iterator.get_instances('train')
+    batches = [list(x) for x, _ in iterator.gen_batches(8)]
+
+    assert sorted(map(len, sum(batches, []))) == sorted(map(len, x_train))
+    assert all(len(batch) <= 8 and (len(batch) == 1 or len(batch) * max(map(len, batch)) <= 60)
+               for batch in batches)
+    assert iterator.padding_stats['train']['batches'] == len(batches)
+
+
+@pytest.mark.parametrize('bucket_batches', [0, 2])
+def test_morphotagger_iterator_bucketing(bucket_batches):
+    data = make_tagged_data()
+    iterator = MorphoTaggerDatasetIterator({'train': data, 'valid': make_tagged_data(20, 1)}, seed=1,
+                                           bucket_batches=bucket_batches)
+    batches = list(iterator.gen_batches(8, return_indexes=True))
+    indexes = [list(batch_indexes) for batch_indexes, _ in batches]
+    lengths = [len(x) for x, _ in data]
+
+    assert sorted(sum(indexes, [])) == list(range(len(data)))
+    for batch_indexes, (x, y) in batches:
+        assert x == [data[i][0] for i in batch_indexes] and y == [data[i][1] for i in batch_indexes]
+    assert all(lengths[a] <= lengths[b] for batch in indexes for a, b in zip(batch, batch[1:]))
+    if bucket_batches:
+        assert iterator.padding_stats['train']['batches'] == len(batches)
+    else:
+        # without bucketing the whole data is sorted by length and sliced
+        assert sorted(indexes) == sorted(np.argsort(lengths)[i:i + 8].tolist() for i in range(0, len(data), 8))
+        assert iterator.padding_stats == {}
@@ -0,0 +1,71 @@
+from random import Random
+
+import numpy as np
+import pytest
+
+fasttext = pytest.importorskip('fasttext')
+
+from deeppavlov.models.embedders.fasttext_embedder import FasttextEmbedder
+
+words = ['moscow', 'paris', 'river', 'capital', 'russia', 'france', 'city', 'water', 'street', 'москва', 'ёж']
+oov_words = ['moskow', 'rivers', 'москве', 'a', 'ж', 'x-ray', '東京', '']
+
+
+@pytest.fixture(scope='module')
+def model_path(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp('fasttext')
+    rng = Random(0)
+    with (tmp_path / 'corpus.txt').open('w', encoding='utf8') as f:
+        for _ in range(200):
+            f.write(' '.join(rng.choice(words) for _ in range(20)) + '\n')
+    model = fasttext.train_unsupervised(str(tmp_path / 'corpus.txt'), dim=8, minCount=1, bucket=1000, epoch=1,
+                                        minn=1, maxn=4, thread=1, verbose=0)
+    model.save_model(str(tmp_path / 'model.bin'))
+    return tmp_path / 'model.bin'
+
+
+def test_fasttext_store_equals_model(model_path, tmp_path):
+    embedder = FasttextEmbedder(model_path)
+    FasttextEmbedder(model_path, store_path=tmp_path / 'store')
+    store_embedder = FasttextEmbedder(model_path, store_path=tmp_path / 'store')
+
+    batch = [words, oov_words, []]
+    for sample, store_sample in zip(embedder(batch), store_embedder(batch)):
+        assert len(sample) == len(store_sample)
+        for vector, store_vector in zip(sample, store_sample):
+            assert np.allclose(vector, store_vector, atol=1e-6)
+    assert np.any(store_embedder([['moskow']])[0][0])
+    assert np.allclose(embedder(batch, mean=True), store_embedder(batch, mean=True), atol=1e-6)
+    # out-of-vocabulary words are embedded without the fastText model
+    assert store_embedder.model is None
+    assert sorted(store_embedder) == sorted(embedder)
+
+
+def assert_same_embeddings(embeddings, expected):
+    assert type(embeddings) is type(expected)
+    assert len(embeddings) == len(expected)
+    for sample, expected_sample in zip(embeddings, expected):
+        assert len(sample) == len(expected_sample)
+        if len(expected_sample):
+            assert np.allclose(np.asarray(sample), np.asarray(expected_sample), atol=1e-6)
+
+
+@pytest.mark.parametrize('pad_zero', [False, True])
+@pytest.mark.parametrize('mean', [False, True])
+@pytest.mark.parametrize('store', [False, True])
+def test_batched_equals_per_sample(model_path, tmp_path, pad_zero, mean, store):
+    store_path = tmp_path / 'store' if store else None
+    embedder = FasttextEmbedder(model_path, store_path=store_path, pad_zero=pad_zero, mean=mean)
+    batched_embedder = FasttextEmbedder(model_path, store_path=store_path, pad_zero=pad_zero, mean=mean,
+                                        batched=True, return_mask=True)
+    for batch in [[words[:3], oov_words, [], words[5:6]], [words]]:
+        expected = embedder(batch)
+        if pad_zero and not mean:
+            embeddings, mask = batched_embedder(batch)
+            assert np.array_equal(mask, [[i < len(sample) for i in range(mask.shape[1])] for sample in batch])
+        else:
+            embeddings = batched_embedder(batch)
+        if isinstance(expected, list) and not mean:
+            # per-sample mode returns lists of token vectors
+            expected = [np.array(sample).reshape(-1, embedder.dim) for sample in expected]
+        assert_same_embeddings(embeddings, expected)
@@ -0,0 +1,68 @@
+import os
+import random
+
+import pytest
+
+from deeppavlov.models.spelling_correction.brillmoore.error_model import ErrorModel
+from deeppavlov.vocabs.typos import StaticDictionary
+
+alphabet = 'abcdef'
+
+
+def make_typo(word, rng):
+    position = rng.randrange(len(word))
+    edit = rng.randrange(3)
+    if edit == 0:
+        return word[:position] + rng.choice(alphabet) + word[position + 1:]
+    if edit == 1:
+        return word[:position] + word[position + 1:]
+    return word[:position] + rng.choice(alphabet) + word[position:]
+
+
+rng = random.Random(0)
+words = sorted({''.join(rng.choice(alphabet) for _ in range(rng.randint(2, 8))) for _ in range(500)})
+train_words = rng.sample(words, 200)
+train_typos = [make_typo(word, rng) for word in train_words]
+queries = [make_typo(word, rng) for word in rng.sample(words, 40)] + rng.sample(words, 10) + ['x', 'ab']
+
+
+@pytest.fixture(scope='module')
+def dictionary(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp('error_model')
+    (tmp_path / 'words.txt').write_text('\n'.join(words), encoding='utf8')
+    return StaticDictionary(tmp_path, raw_dictionary_path=tmp_path / 'words.txt')
+
+
+def build_model(dictionary, **kwargs):
+    model = ErrorModel(dictionary, save_path=None, **kwargs)
+    model.fit(train_typos, train_words)
+    return model
+
+
+@pytest.mark.parametrize('window', [1, 2])
+@pytest.mark.parametrize('candidates_count', [1, 5])
+def test_vectorized_equals_loops(dictionary, window, candidates_count):
+    model = build_model(dictionary, window=window, candidates_count=candidates_count)
+    groups = {}
+    for query in queries:
+        expected = model._find_candidates_window_n(query)
+        assert model._find_candidates_window_n_vectorized(query) == expected
+        assert model._find_candidates_window_n_vectorized(query, groups=groups) == expected
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='fork is not available')
+def test_process_pool(dictionary):
+    model = build_model(dictionary, window=1, candidates_count=3)
+    batch = [queries[:20], queries[20:], queries[:5]]
+    expected = model(batch)
+
+    pool_model = build_model(dictionary, window=1, candidates_count=3, n_jobs=2, min_pool_batch=10)
+    assert pool_model._pool is None
+    assert pool_model(batch) == expected
+    assert pool_model._pool is not None
+    pool_model.fit(train_typos[:100], train_words[:100])
+    assert pool_model._pool is None
+    pool_model(batch)
+    workers = pool_model._pool._pool
+    pool_model.destroy()
+    assert not any(worker.is_alive() for worker in workers)
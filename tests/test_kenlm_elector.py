@@ -0,0 +1,98 @@
+from random import Random
+
+import pytest
+
+kenlm = pytest.importorskip('kenlm')
+
+from deeppavlov.models.spelling_correction.electors.kenlm_elector import KenlmElector
+
+vocabulary = ['a', 'b', 'c', 'd', 'e', 'f']
+
+
+@pytest.fixture(scope='module')
+def lm_path(tmp_path_factory):
+    rng = Random(0)
+    unigrams = [('<unk>', -2.), ('<s>', -99.)] + [(w, -rng.uniform(0.3, 1.5)) for w in vocabulary + ['</s>']]
+    bigrams = [(f'{w1} {w2}', -rng.uniform(0.1, 2.)) for w1 in ['<s>'] + vocabulary for w2 in vocabulary + ['</s>']
+               if rng.random() < 0.6]
+    lines = ['\\data\\', f'ngram 1={len(unigrams)}', f'ngram 2={len(bigrams)}', '', '\\1-grams:']
+    lines += [f'{prob:.4f}\t{w}' + ('' if w == '</s>' else f'\t{-rng.uniform(0., 0.5):.4f}') for w, prob in unigrams]
+    lines += ['', '\\2-grams:'] + [f'{prob:.4f}\t{words}' for words, prob in bigrams] + ['', '\\end\\', '']
+    path = tmp_path_factory.mktemp('kenlm') / 'lm.arpa'
+    path.write_text('\n'.join(lines))
+    return path
+
+
+def make_batch(n, seed=1):
+    rng = Random(seed)
+    batch = []
+    for _ in range(n):
+        sentence = []
+        for _ in range(rng.randint(1, 8)):
+            candidates = rng.sample(vocabulary + ['a b', 'c d', 'b e'], rng.randint(1, 5))
+            sentence.append([(-rng.uniform(0., 3.), candidate) for candidate in candidates])
+        batch.append(sentence)
+    return batch
+
+
+def reference_infer(lm, candidates, beam_size):
+    """Beam search without scores cache and hypotheses merging"""
+    candidates = candidates + [[(0, '</s>')]]
+    state = kenlm.State()
+    lm.BeginSentenceWrite(state)
+    beam = [(0, state, [])]
+    for sublist in candidates:
+        new_beam = []
+        for beam_score, beam_state, beam_words in beam:
+            for score, candidate in sublist:
+                prev_state = beam_state
+                c_score = 0
+                cs = candidate.split()
+                for word in cs:
+                    state = kenlm.State()
+                    c_score += lm.BaseScore(prev_state, word, state)
+                    prev_state = state
+                new_beam.append((beam_score + score + c_score, state, beam_words + cs))
+        new_beam.sort(reverse=True)
+        beam = new_beam[:beam_size]
+    return beam
+
+
+@pytest.mark.parametrize('beam_size', [1, 4])
+@pytest.mark.parametrize('n_jobs', [1, 3])
+def test_same_results_as_reference(lm_path, beam_size, n_jobs):
+    batch = make_batch(50)
+    lm = kenlm.Model(str(lm_path))
+    expected = [reference_infer(lm, candidates, beam_size) for candidates in batch]
+
+    elector = KenlmElector(lm_path, beam_size=beam_size, n_jobs=n_jobs)
+    assert elector(batch) == [beam[0][2][:-1] for beam in expected]
+    # the second call is scored from the cache
+    assert elector(batch) == [beam[0][2][:-1] for beam in expected]
+
+    top_k = KenlmElector(lm_path, beam_size=beam_size, top_k=2, n_jobs=n_jobs)(batch)
+    for hypotheses, beam in zip(top_k, expected):
+        assert [words for _, words in hypotheses] == [words[:-1] for _, _, words in beam[:2]]
+        assert [score for score, _ in hypotheses] == pytest.approx([score for score, _, _ in beam[:2]])
+    elector.destroy()
+
+
+def test_merge_states(lm_path):
+    batch = make_batch(50)
+    lm = kenlm.Model(str(lm_path))
+    # states of a bigram model are defined by the last word, so the merged beam of this size keeps all of them
+    # and the search finds the best sentence
+    beam_size = len(vocabulary) + 1
+    elector = KenlmElector(lm_path, beam_size=beam_size, top_k=1, merge_states=True)
+    for hypotheses, candidates in zip(elector(batch), batch):
+        assert hypotheses[0][0] >= reference_infer(lm, candidates, beam_size)[0][0] - 1e-4
+        assert hypotheses[0][0] >= reference_infer(lm, candidates, 1000)[0][0] - 1e-4
+
+
+def test_destroy_stops_threads(lm_path):
+    elector = KenlmElector(lm_path, n_jobs=2)
+    elector(make_batch(4))
+    executor = elector._executor
+    elector.destroy()
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
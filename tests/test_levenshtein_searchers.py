@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from deeppavlov.models.spelling_correction.levenshtein.levenshtein_searcher import LevenshteinSearcher
+from deeppavlov.models.spelling_correction.levenshtein.symmetric_delete import SymmetricDeleteSearcher, \
+    restricted_damerau_levenshtein
+
+alphabet = 'abcdef'
+
+
+def make_words(n, seed=0):
+    rng = random.Random(seed)
+    return sorted({''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 9))) for _ in range(n)})
+
+
+def make_queries(words, n, seed=1):
+    rng = random.Random(seed)
+    queries = []
+    for word in rng.sample(words, n):
+        position = rng.randint(0, len(word))
+        queries.append(word)
+        queries.append(word[:position] + rng.choice(alphabet) + word[position:])
+        queries.append(word[:position] + word[position + 1:])
+        queries.append(word[:position] + word[position + 1:position + 2] + word[position:position + 1] +
+                       word[position + 2:])
+    queries.append(''.join(rng.choice(alphabet) for _ in range(12)))
+    return [query for query in queries if query]
+
+
+words = make_words(2000)
+queries = make_queries(words, 50)
+
+
+class TestCompiledTrieSearch:
+    @pytest.mark.parametrize('allow_spaces,euristics', [(False, 'none'), (True, 'none'), (True, 2)])
+    def test_same_candidates(self, allow_spaces, euristics):
+        searcher = LevenshteinSearcher(alphabet, words, allow_spaces=allow_spaces, euristics=euristics)
+        assert searcher.compiled
+        for query in queries:
+            for d in [1, 2]:
+                expected = searcher._trie_search(query, d, allow_spaces=allow_spaces)
+                found = searcher.search(query, d, allow_spaces=allow_spaces)
+                assert sorted(found) == sorted(expected)
+
+    def test_descend(self):
+        searcher = LevenshteinSearcher(alphabet, words)
+        trie, compiled = searcher.dictionary, searcher.compiled_dictionary
+        for word in words[:200] + queries + ['ab?', 'xyz']:
+            index = compiled.descend(compiled.root, word)
+            if word in trie:
+                assert compiled.is_final(index)
+            elif index != compiled.NO_NODE:
+                assert not compiled.is_final(index)
+        assert compiled.descend(compiled.root, 'xyz') == compiled.NO_NODE
+
+
+class TestSymmetricDeleteSearch:
+    @pytest.mark.parametrize('prefix_length', [3, 7, 20])
+    def test_same_candidates_as_levenshtein(self, tmp_path, prefix_length):
+        path = tmp_path / 'index'
+        SymmetricDeleteSearcher.build(path, words, max_distance=2, prefix_length=prefix_length)
+        searcher = SymmetricDeleteSearcher(path)
+        levenshtein = LevenshteinSearcher(alphabet, words)
+        for query in queries:
+            for d in [0, 1, 2]:
+                assert sorted(searcher.search(query, d)) == sorted(levenshtein.search(query, d))
+
+    def test_contains(self, tmp_path):
+        SymmetricDeleteSearcher.build(tmp_path / 'index', words)
+        searcher = SymmetricDeleteSearcher(tmp_path / 'index')
+        assert all(word in searcher for word in words[:100])
+        assert all(query in searcher for query in queries if query in words)
+        assert all(query not in searcher for query in queries if query not in words)
+
+    def test_distance(self):
+        assert restricted_damerau_levenshtein('abcd', 'abcd', 2) == 0
+        assert restricted_damerau_levenshtein('abcd', 'bacd', 2) == 1
+        assert restricted_damerau_levenshtein('abcd', 'acd', 2) == 1
+        assert restricted_damerau_levenshtein('ca', 'abc', 3) == 3
+        assert restricted_damerau_levenshtein('abcdef', 'fedcba', 2) == 3
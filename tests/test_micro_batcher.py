@@ -0,0 +1,69 @@
+import asyncio
+
+from deeppavlov.core.common.chainer import Chainer
+from deeppavlov.utils.server.batching import MicroBatcher
+
+
+class TestMicroBatcher:
+    def setup_method(self):
+        self.batch_sizes = []
+
+        def double(xs):
+            self.batch_sizes.append(len(xs))
+            if None in xs:
+                raise ValueError('None in batch')
+            return [x * 2 for x in xs], [-x for x in xs]
+
+        self.model = Chainer(in_x=['x'], out_params=['doubled', 'negated'])
+        self.model.append(double, ['x'], ['doubled', 'negated'])
+
+    def _run(self, requests, max_batch_size, max_wait_ms=50):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        async def send_all():
+            batcher = MicroBatcher(self.model, max_batch_size, max_wait_ms)
+            batcher.start()
+            responses = await asyncio.gather(*[batcher([request]) for request in requests], return_exceptions=True)
+            return responses, batcher.get_stats()
+
+        try:
+            return loop.run_until_complete(send_all())
+        finally:
+            # asyncio.all_tasks is not available before python 3.7
+            all_tasks = getattr(asyncio, 'all_tasks', None) or asyncio.Task.all_tasks
+            pending = all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+
+    def test_responses_order(self):
+        requests = [list(range(start, start + size)) for start, size in [(0, 3), (10, 1), (20, 4), (30, 2), (40, 5)]]
+        responses, stats = self._run(requests, max_batch_size=6)
+
+        for request, response in zip(requests, responses):
+            assert response == [(x * 2, -x) for x in request]
+        assert stats['requests'] == len(requests)
+        assert stats['samples'] == sum(len(request) for request in requests)
+        assert sum(self.batch_sizes) == stats['samples']
+        assert all(size <= 6 for size in self.batch_sizes)
+        assert stats['batches'] < len(requests)
+
+    def test_large_request(self):
+        requests = [[1, 2], list(range(100, 110)), [3]]
+        responses, stats = self._run(requests, max_batch_size=4)
+
+        for request, response in zip(requests, responses):
+            assert response == [(x * 2, -x) for x in request]
+        assert 10 in self.batch_sizes
+
+    def test_failed_request_is_isolated(self):
+        requests = [[1, 2], [3, None], [4]]
+        responses, stats = self._run(requests, max_batch_size=8)
+
+        assert responses[0] == [(2, -1), (4, -2)]
+        assert isinstance(responses[1], ValueError)
+        assert responses[2] == [(8, -4)]
+        assert stats['batches'] == 1
+        assert self.batch_sizes == [5, 2, 2, 1]
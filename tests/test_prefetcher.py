@@ -0,0 +1,118 @@
+import threading
+import time
+from random import Random
+
+import pytest
+
+from deeppavlov.core.data.data_learning_iterator import DataLearningIterator
+from deeppavlov.core.models.component import Component
+from deeppavlov.core.models.nn_model import NNModel
+from deeppavlov.core.trainers.nn_trainer import NNTrainer
+from deeppavlov.core.trainers.prefetcher import BatchPrefetcher
+
+
+class Tokenizer(Component):
+    """Splits texts and records the largest number of concurrent calls"""
+
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+
+    def __init__(self, **kwargs):
+        pass
+
+    def __call__(self, batch):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        time.sleep(0.001)
+        with cls.lock:
+            cls.active -= 1
+        return [text.split() for text in batch]
+
+
+class LabelVocab(Component):
+    def __init__(self, **kwargs):
+        pass
+
+    def __call__(self, batch):
+        return [int(label) for label in batch]
+
+
+class RecordingModel(NNModel):
+    """Predicts the number of tokens and records the batches it is trained on"""
+
+    train_batches = []
+
+    def __init__(self, **kwargs):
+        super().__init__(save_path=None, **kwargs)
+
+    def train_on_batch(self, x, y):
+        self.train_batches.append((list(x), list(y)))
+        return {'loss': 0.}
+
+    def __call__(self, x):
+        return [str(len(tokens)) for tokens in x]
+
+    def save(self, *args, **kwargs):
+        pass
+
+    def load(self, *args, **kwargs):
+        pass
+
+
+chainer_config = {
+    'in': ['x'],
+    'in_y': ['y'],
+    'out': ['y_pred'],
+    'pipe': [
+        {'class_name': f'{__name__}:Tokenizer', 'in': ['x'], 'out': ['x_tokens']},
+        {'class_name': f'{__name__}:LabelVocab', 'in': ['y'], 'out': ['y_ids']},
+        {'class_name': f'{__name__}:RecordingModel', 'in': ['x_tokens'], 'in_y': ['y_ids'], 'out': ['y_pred'],
+         'main': True}
+    ]
+}
+
+
+def make_data(n, seed):
+    rng = Random(seed)
+    data = []
+    for _ in range(n):
+        length = rng.randint(1, 10)
+        data.append((' '.join(rng.choice('abcdef') for _ in range(length)), str(length + rng.randint(0, 1))))
+    return data
+
+
+def train(prefetch):
+    RecordingModel.train_batches = []
+    Tokenizer.max_active = 0
+    iterator = DataLearningIterator({'train': make_data(100, 0), 'valid': make_data(20, 1)}, seed=5, shuffle=True)
+    trainer = NNTrainer(chainer_config, batch_size=7, epochs=3, validate_first=False, val_every_n_batches=4,
+                        log_every_n_batches=3, validation_patience=100, prefetch=prefetch)
+    trainer.train(iterator)
+    return RecordingModel.train_batches
+
+
+@pytest.mark.parametrize('prefetch', [{}, {'depth': 2}])
+def test_prefetched_training_equals_synchronous(prefetch):
+    expected = train(None)
+    assert len(expected) == 3 * 15
+
+    assert train(prefetch) == expected
+    # the default single worker doesn't call the components concurrently with each other or with validation
+    assert Tokenizer.max_active == 1
+
+
+def test_prefetcher_order():
+    batches = [(tuple(range(i, i + 3)), tuple(range(i, i + 3))) for i in range(0, 60, 3)]
+
+    def preprocess(x, y):
+        time.sleep(0.001 * (x[0] % 4))
+        return [v * 2 for v in x]
+
+    prefetcher = BatchPrefetcher(preprocess, workers=3, depth=4)
+    try:
+        assert list(prefetcher(iter(batches))) == [(x, y, preprocess(x, y)) for x, y in batches]
+    finally:
+        prefetcher.close()
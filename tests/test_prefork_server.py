@@ -0,0 +1,88 @@
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from urllib.request import urlopen
+
+import pytest
+import uvicorn
+from fastapi import FastAPI
+
+from deeppavlov.utils.server.prefork import WorkersReadiness, run_prefork
+
+workers = 2
+
+
+def get_free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve(port, readiness):
+    app = FastAPI()
+
+    @app.get('/pid')
+    async def pid():
+        return os.getpid()
+
+    config = uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning')
+    run_prefork(config, workers, readiness)
+
+
+def wait_for(condition, timeout=30):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, 'timeout'
+        time.sleep(0.1)
+
+
+def process_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def get_pid(port):
+    with urlopen(f'http://127.0.0.1:{port}/pid', timeout=10) as response:
+        return json.loads(response.read())
+
+
+def test_workers_readiness():
+    readiness = WorkersReadiness(3)
+    assert readiness.get_status() == {'workers': 3, 'ready': 0}
+    readiness.set_ready(0)
+    readiness.set_ready(2)
+    assert readiness.get_status() == {'workers': 3, 'ready': 2}
+    assert not readiness.all_ready
+    readiness.set_ready(1)
+    assert readiness.all_ready
+    readiness.set_ready(1, False)
+    assert not readiness.all_ready
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='fork is not available')
+def test_prefork_workers_are_restarted():
+    port = get_free_port()
+    readiness = WorkersReadiness(workers)
+    supervisor = multiprocessing.get_context('fork').Process(target=serve, args=(port, readiness))
+    supervisor.start()
+    try:
+        wait_for(lambda: readiness.all_ready)
+        pid = get_pid(port)
+        assert pid not in (os.getpid(), supervisor.pid)
+
+        os.kill(pid, signal.SIGKILL)
+        # the killed worker exists until the supervisor waits for it and forks a new one
+        wait_for(lambda: not process_exists(pid))
+        wait_for(lambda: readiness.all_ready)
+        assert pid not in {get_pid(port) for _ in range(10)}
+    finally:
+        supervisor.terminate()
+        supervisor.join(30)
+    assert supervisor.exitcode == 0
+    assert readiness.get_status()['ready'] == 0
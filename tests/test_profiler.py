@@ -0,0 +1,77 @@
+import time
+
+from deeppavlov.core.common.chainer import Chainer
+from deeppavlov.core.common.profiler import PipelineProfiler, format_profile
+
+
+def add_one(xs):
+    return [x + 1 for x in xs]
+
+
+def double(xs):
+    return [2 * x for x in xs]
+
+
+def slow_allocate(xs):
+    time.sleep(0.01)
+    data = [bytearray(1024 * 1024) for _ in xs]
+    return [len(chunk) for chunk in data]
+
+
+def build_pipeline():
+    chainer = Chainer(in_x=['x'], out_params=['size'])
+    chainer.append(add_one, ['x'], ['y'])
+    chainer.append(double, ['y'], ['z'])
+    chainer.append(slow_allocate, ['z'], ['size'])
+    return chainer
+
+
+class TestPipelineProfiler:
+    def test_outputs_are_not_changed(self):
+        chainer = build_pipeline()
+        expected = chainer([1, 2, 3])
+        chainer.enable_profiling()
+        assert chainer([1, 2, 3]) == expected
+        chainer.disable_profiling()
+        assert chainer.get_profile() == {}
+
+    def test_component_stats(self):
+        chainer = build_pipeline()
+        chainer.enable_profiling()
+        chainer([1, 2, 3])
+        chainer([4, 5])
+        profile = chainer.get_profile()
+
+        assert list(profile) == ['add_one', 'double', 'slow_allocate']
+        for stats in profile.values():
+            assert stats['calls'] == 2
+            assert stats['samples'] == 5
+            assert stats['wall_time'] >= 0 and stats['cpu_time'] >= 0
+            assert stats['mean_wall_time'] == stats['wall_time'] / 2
+        assert profile['slow_allocate']['wall_time'] >= 0.02
+
+        table = format_profile(profile).splitlines()
+        assert len(table) == 4
+        assert table[1].startswith('slow_allocate')
+
+    def test_trace_memory(self):
+        profiler = PipelineProfiler(trace_memory=True)
+        if not profiler.trace_memory:
+            # tracemalloc can't reset the peak before python 3.9
+            assert 'traced_peak_bytes' not in profiler.get_profile()
+            return
+        with profiler.measure('allocate', 3):
+            slow_allocate([1, 2, 3])
+        with profiler.measure('add', 3):
+            add_one([1, 2, 3])
+        profile = profiler.get_profile()
+        assert profile['allocate']['traced_peak_bytes'] >= 3 * 1024 * 1024
+        assert profile['add']['traced_peak_bytes'] < 1024 * 1024
+        assert '-' not in format_profile(profile).splitlines()[1].split()
+
+    def test_reset(self):
+        profiler = PipelineProfiler()
+        with profiler.measure('component', 1):
+            pass
+        profiler.reset()
+        assert profiler.get_profile() == {}
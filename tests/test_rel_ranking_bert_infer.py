@@ -0,0 +1,108 @@
+import importlib
+import pickle
+import random
+import sys
+import types
+import zlib
+
+import pytest
+
+rel_q2name = {f'P{n}': f'relation {n}' for n in range(20)}
+
+
+class FakeRanker:
+    """Scores pairs deterministically and records the batches it is called with"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, questions, rels_labels):
+        self.batches.append(list(zip(questions, rels_labels)))
+        scores = [zlib.crc32(f'{question}|{labels}'.encode()) / 2 ** 32
+                  for question, labels in zip(questions, rels_labels)]
+        return [(1 - score, score) for score in scores]
+
+
+class FakeWikiParser:
+    def find_label(self, entity):
+        return f'label of {entity}'
+
+    def find_labels(self, entities):
+        return [self.find_label(entity) for entity in entities]
+
+
+@pytest.fixture
+def rel_ranking_module(monkeypatch):
+    # the wikidata HDT library and the tensorflow ranker are replaced, the component only calls them
+    hdt = types.ModuleType('hdt')
+    hdt.HDTDocument = None
+    rel_ranker = types.ModuleType('deeppavlov.models.ranking.rel_ranker')
+    rel_ranker.RelRanker = FakeRanker
+    monkeypatch.setitem(sys.modules, 'hdt', hdt)
+    monkeypatch.setitem(sys.modules, 'deeppavlov.models.ranking.rel_ranker', rel_ranker)
+    for name in ['deeppavlov.models.kbqa.wiki_parser', 'deeppavlov.models.kbqa.rel_ranking_bert_infer']:
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    yield importlib.import_module('deeppavlov.models.kbqa.rel_ranking_bert_infer')
+    for name in ['deeppavlov.models.kbqa.wiki_parser', 'deeppavlov.models.kbqa.rel_ranking_bert_infer']:
+        sys.modules.pop(name, None)
+
+
+def make_batch(n_questions=8, seed=0):
+    rng = random.Random(seed)
+    questions = [f'question {rng.randint(0, 4)}' for _ in range(n_questions)]
+    rels = list(rel_q2name) + ['P100']
+    prop = 'http://www.wikidata.org/prop/direct/'
+    candidate_answers = [[tuple(prop + rel for rel in rng.sample(rels, rng.randint(1, 2))) + (f'Q{rng.randint(0, 30)}',)
+                          for _ in range(rng.randint(0, 12))] for _ in questions]
+    candidate_rels = [rng.sample(rels, rng.randint(0, 15)) for _ in questions]
+    return questions, candidate_answers, candidate_rels
+
+
+def reference_answers(ranker, wiki_parser, questions, candidate_answers_list):
+    """Answers found with ranker batches of every question separately"""
+    answers = []
+    for question, candidate_answers in zip(questions, candidate_answers_list):
+        answers_with_scores = []
+        for candidate in candidate_answers:
+            labels = ' # '.join(rel_q2name[rel.split('/')[-1]] for rel in candidate[:-1]
+                                if rel.split('/')[-1] in rel_q2name)
+            if labels:
+                answers_with_scores.append((candidate[-1], ranker([question], [labels])[0][1]))
+        answers_with_scores.sort(key=lambda x: x[-1], reverse=True)
+        answers.append(wiki_parser.find_label(answers_with_scores[0][0]) if answers_with_scores else 'Not Found')
+    return answers
+
+
+def reference_rels(ranker, questions, candidate_rels_list, rels_to_leave):
+    result = []
+    for question, candidate_rels in zip(questions, candidate_rels_list):
+        rels_with_scores = [(rel, ranker([question], [rel_q2name[rel]])[0][1]) for rel in candidate_rels
+                            if rel in rel_q2name]
+        result.append(sorted(rels_with_scores, key=lambda x: x[1], reverse=True)[:rels_to_leave])
+    return result
+
+
+@pytest.mark.parametrize('batch_size', [1, 3, 100])
+def test_batched_ranking_equals_per_question(rel_ranking_module, tmp_path, batch_size):
+    with (tmp_path / 'rel_q2name.pickle').open('wb') as f:
+        pickle.dump(rel_q2name, f)
+    ranker = FakeRanker()
+    component = rel_ranking_module.RelRankerBertInfer(tmp_path, 'rel_q2name.pickle', FakeWikiParser(), ranker,
+                                                      batch_size=batch_size, rels_to_leave=5)
+    questions, candidate_answers, candidate_rels = make_batch()
+
+    assert component(questions, candidate_answers) == reference_answers(FakeRanker(), FakeWikiParser(), questions,
+                                                                        candidate_answers)
+    assert component.rank_rels_batch(questions, candidate_rels) == reference_rels(FakeRanker(), questions,
+                                                                                  candidate_rels, 5)
+    assert component.rank_rels(questions[0], candidate_rels[0]) == reference_rels(FakeRanker(), questions[:1],
+                                                                                  candidate_rels[:1], 5)[0]
+
+    # pairs of different questions share ranker batches and every distinct pair is scored once
+    ranker.batches.clear()
+    component(questions, candidate_answers)
+    pairs = [pair for batch in ranker.batches for pair in batch]
+    assert all(len(batch) <= batch_size for batch in ranker.batches)
+    assert len(pairs) == len(set(pairs))
+    assert len(ranker.batches) == -(-len(pairs) // batch_size)
+    assert batch_size == 1 or any(len({question for question, _ in batch}) > 1 for batch in ranker.batches)
@@ -0,0 +1,95 @@
+import json
+import random
+import re
+
+import pytest
+
+from deeppavlov.models.kbqa.template_matcher import AhoCorasick, TemplateMatcher, required_literals
+
+template_regexps = [
+    r'^what is the capital of (.*)\?$',
+    r'^who (?:is|was) the (president|king|queen) of ([\w ]+)\?',
+    r'^when was (.*) (born|founded)\?$',
+    r'(.*) is located in (.*)',
+    r'^how many (\w+) (?:does|do) (.*) have\?$',
+    r'^which (.*) (?=river)river flows through (.*)\?$',
+    r'(?i)^WHAT IS (.*)\?$',
+    r'^(?i:WHAT) is (.*)\?$',
+    r'^(?:what|which) (\w+) is (.*) in\?$',
+    r'^(.*) \(([^)]*)\)$',
+    r'^where is (.*)\.\*(.*)$',
+    r'^(\d{4})-(\d{2}) (.*)$',
+    r'^(.*)$',
+]
+
+questions = [
+    'what is the capital of russia?',
+    'what is the capital of the uk',
+    'who is the president of united states?',
+    'who was the king of france?',
+    'who were the kings of france?',
+    'when was moscow founded?',
+    'when was pushkin born?',
+    'moscow is located in russia',
+    'how many children does putin have?',
+    'which long river flows through paris?',
+    'which long sea flows through paris?',
+    'what is love?',
+    'what country is paris in?',
+    'which city is the louvre in?',
+    'mercury (planet)',
+    'where is x.*y',
+    'where is xy',
+    '2020-10 covid',
+    '',
+    'capital of capital of the capital',
+]
+
+
+def write_templates(path):
+    templates = [{'template_regexp': regexp, 'template_type': f'type_{n}'} for n, regexp in enumerate(template_regexps)]
+    with (path / 'templates.json').open('w') as f:
+        json.dump(templates, f)
+    return templates
+
+
+def test_match_templates_equals_findall(tmp_path):
+    templates = write_templates(tmp_path)
+    matcher = TemplateMatcher(tmp_path, 'templates.json')
+    for question in questions:
+        expected = []
+        for template in templates:
+            found = re.findall(template['template_regexp'], question)
+            if found:
+                expected.append((found[0], template))
+        assert matcher.match_templates(question) == expected
+
+
+@pytest.mark.parametrize('regexp', template_regexps)
+def test_required_literals(regexp):
+    pattern = re.compile(regexp)
+    literals = required_literals(pattern)
+    for question in questions:
+        if pattern.search(question):
+            assert all(literal in question for literal in literals)
+
+
+def test_required_literals_values():
+    assert required_literals(re.compile(r'^what is the capital of (.*)\?$')) == ['what is the capital of ', '?']
+    assert required_literals(re.compile(r'^who (?:is|was) the (\w+)')) == ['who ', ' the ']
+    assert required_literals(re.compile(r'a(?:bc)*d')) == ['a', 'd']
+    assert required_literals(re.compile(r'(?i)what')) == []
+    assert required_literals(re.compile(r'^(?i:WHAT) is (.*)\?$')) == [' is ', '?']
+    assert required_literals(re.compile(r'a (?:b(?i:c)d)')) == ['a b', 'd']
+    assert required_literals(re.compile(r'a b  # comment', re.VERBOSE)) == ['ab']
+    assert required_literals(re.compile(r'(?=ab)c')) == ['c']
+
+
+def test_aho_corasick():
+    rng = random.Random(0)
+    keywords = sorted({''.join(rng.choice('abc') for _ in range(rng.randint(1, 5))) for _ in range(60)})
+    automaton = AhoCorasick(keywords)
+    for _ in range(200):
+        text = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 30)))
+        assert automaton.find(text) == {n for n, keyword in enumerate(keywords) if keyword in text}
+    assert AhoCorasick([]).find('abc') == set()
@@ -0,0 +1,62 @@
+import random
+
+import numpy as np
+import pytest
+
+from deeppavlov.models.doc_retrieval.tfidf_ranker import TfidfRanker
+from deeppavlov.models.vectorizers.hashing_tfidf_vectorizer import HashingTfIdfVectorizer
+
+
+class SplitTokenizer:
+    ngram_range = [1, 1]
+
+    def __call__(self, batch):
+        return [doc.split() for doc in batch]
+
+
+def build_vectorizer(path, n_docs=300, seed=0):
+    rng = random.Random(seed)
+    vocabulary = [f'w{n}' for n in range(200)]
+    docs = [' '.join(rng.choice(vocabulary[:rng.randint(5, 200)]) for _ in range(rng.randint(1, 30)))
+            for _ in range(n_docs)]
+    vectorizer = HashingTfIdfVectorizer(SplitTokenizer(), hash_size=2 ** 12, save_path=path, load_path=path,
+                                        mode='train')
+    vectorizer.fit(docs, [f'doc{n}' for n in range(n_docs)], list(range(n_docs)))
+    vectorizer.save()
+    return HashingTfIdfVectorizer(SplitTokenizer(), save_path=path, load_path=path)
+
+
+queries = ['w1 w2 w3', 'w150 w199', 'w5', 'unknown', 'w1 w1 w1 w7 w100', '']
+
+
+def rank(vectorizer, top_n, batched):
+    return TfidfRanker(vectorizer, top_n=top_n, batched=batched)(queries)
+
+
+def assert_same_ranking(batched, one_by_one):
+    for ids, scores, expected_ids, expected_scores in zip(*batched, *one_by_one):
+        assert len(ids) == len(expected_ids)
+        assert np.allclose(scores, expected_scores)
+        # documents with equal scores may be selected in a different order
+        last_score = expected_scores[-1] if len(expected_scores) else 0
+        assert {doc_id for doc_id, score in zip(ids, scores) if score > last_score + 1e-9} == \
+               {doc_id for doc_id, score in zip(expected_ids, expected_scores) if score > last_score + 1e-9}
+
+
+@pytest.mark.parametrize('top_n', [1, 5, 50, 1000])
+def test_batched_equals_one_by_one(tmp_path, top_n):
+    vectorizer = build_vectorizer(tmp_path / 'tfidf.npz')
+    assert_same_ranking(rank(vectorizer, top_n, True), rank(vectorizer, top_n, False))
+
+
+def test_batched_equals_one_by_one_with_deltas(tmp_path):
+    vectorizer = build_vectorizer(tmp_path / 'tfidf.npz')
+    vectorizer.add_documents(['w1 w2 w3 w3', 'w150 w5'], ['new0', 'new1'])
+    vectorizer.remove_documents([f'doc{n}' for n in range(0, 300, 3)] + ['new1'])
+    for top_n in [5, 250]:
+        batched = rank(vectorizer, top_n, True)
+        assert_same_ranking(batched, rank(vectorizer, top_n, False))
+        for ids in batched[0]:
+            assert 'new1' not in ids
+            assert not any(doc_id.startswith('doc') and int(doc_id[3:]) % 3 == 0 for doc_id in ids)
+    assert 'new0' in batched[0][0]
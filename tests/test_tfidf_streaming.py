@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from deeppavlov.models.vectorizers.hashing_tfidf_vectorizer import HashingTfIdfVectorizer
+from deeppavlov.models.vectorizers.tfidf_storage import load_tfidf_mmap, save_tfidf_opts
+from deeppavlov.models.vectorizers.tfidf_streaming import CountsSpool, build_tfidf_matrix, count_hashes
+
+hash_size = 64
+docs = ['a b c a', 'b c d', 'a a a e', 'f g a', 'c c b', 'a b', 'h i j k l m n', 'a a b b c c']
+
+
+def tokenize(batch):
+    return [doc.split() for doc in batch]
+
+
+def get_coo_matrices(spool):
+    """Build tfidf matrix from the spool blocks the way the vectorizer does without streaming"""
+    rows, cols, counts = (np.concatenate(arrays) for arrays in zip(*spool.blocks()))
+    vectorizer = HashingTfIdfVectorizer(None, hash_size=hash_size, mode='train')
+    count_matrix = vectorizer.get_count_matrix(rows, cols, counts, size=len(docs))
+    tfidf_matrix, term_freqs = vectorizer.get_tfidf_matrix(count_matrix)
+    return tfidf_matrix, term_freqs, vectorizer.get_clipped_tf(count_matrix, term_freqs)
+
+
+def fill_spool(spool, repeated_docs=()):
+    nums = list(range(len(docs)))
+    for start in range(0, len(docs), 3):
+        spool.add(*count_hashes(tokenize, hash_size, docs[start:start + 3], nums[start:start + 3]))
+    for num, doc in repeated_docs:
+        spool.add(*count_hashes(tokenize, hash_size, [doc], [num]))
+    return spool
+
+
+def assert_same_matrices(matrix, expected):
+    assert matrix.shape == expected.shape
+    assert np.allclose(matrix.toarray(), expected.toarray())
+
+
+@pytest.mark.parametrize('repeated_docs', [(), [(1, 'a z'), (4, 'c')]])
+@pytest.mark.parametrize('memory_budget', [None, 0])
+@pytest.mark.parametrize('to_disk', [False, True])
+def test_streaming_equals_coo(tmp_path, repeated_docs, memory_budget, to_disk):
+    spool = fill_spool(CountsSpool(memory_budget), repeated_docs)
+    assert spool.has_duplicates == bool(repeated_docs)
+    expected_matrix, expected_term_freqs, expected_clipped = get_coo_matrices(spool)
+    assert expected_clipped.nnz > 0
+
+    out_dir = tmp_path if to_disk else None
+    matrix, term_freqs, clipped_tf = build_tfidf_matrix(spool, hash_size, len(docs), out_dir, chunk_rows=7)
+    spool.clear()
+
+    assert np.array_equal(term_freqs, expected_term_freqs)
+    assert_same_matrices(matrix, expected_matrix)
+    assert_same_matrices(clipped_tf, expected_clipped)
+
+    if to_disk:
+        doc_index = {str(num): num for num in range(len(docs))}
+        save_tfidf_opts(out_dir, matrix.shape, {'hash_size': hash_size, 'ngram_range': [1, 1],
+                                                'doc_index': doc_index, 'term_freqs': term_freqs})
+        loaded_matrix, opts = load_tfidf_mmap(out_dir)
+        assert_same_matrices(loaded_matrix, expected_matrix)
+        assert_same_matrices(opts['clipped_tf'], expected_clipped)
+
+
+def test_duplicates_detection():
+    spool = CountsSpool()
+    spool.add(*count_hashes(tokenize, hash_size, docs[:2], [0, 1]))
+    spool.add(*count_hashes(tokenize, hash_size, docs[2:4], [2, 3]))
+    assert not spool.has_duplicates
+
+    spool.add(*count_hashes(tokenize, hash_size, docs[4:5], [1]))
+    assert spool.has_duplicates
+
+    spool.clear()
+    assert not spool.has_duplicates
+    spool.add(*count_hashes(tokenize, hash_size, [docs[0], docs[1], docs[2]], [0, 1, 0]))
+    assert spool.has_duplicates
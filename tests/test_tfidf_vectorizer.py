@@ -0,0 +1,152 @@
+import numpy as np
+import pytest
+
+from deeppavlov.models.vectorizers.hashing_tfidf_vectorizer import HashingTfIdfVectorizer
+from deeppavlov.models.vectorizers.tfidf_segments import compact, get_deltas_path, get_idfs
+from deeppavlov.models.vectorizers.tfidf_storage import MmapDocIndex, convert_npz_to_mmap
+from deeppavlov.models.vectorizers.tfidf_streaming import count_hashes
+
+docs = {
+    'Moscow': 'moscow is the capital of russia',
+    'Paris': 'paris is the capital of france',
+    'Seine': 'the seine flows through paris',
+    'Volga': 'the volga is the longest river in europe',
+    'Москва': 'москва столица россии'
+}
+queries = ['capital of russia', 'river in paris', 'москва', 'unknown words']
+
+
+class SplitTokenizer:
+    ngram_range = [1, 1]
+
+    def __call__(self, batch):
+        return [doc.split() for doc in batch]
+
+
+def fit_vectorizer(path, save_format, **kwargs):
+    vectorizer = HashingTfIdfVectorizer(SplitTokenizer(), hash_size=2 ** 10, save_path=path, load_path=path,
+                                        save_format=save_format, mode='train', **kwargs)
+    vectorizer.fit(list(docs.values()), list(docs), list(range(len(docs))))
+    vectorizer.save()
+    return load_vectorizer(path, save_format)
+
+
+def load_vectorizer(path, save_format='npz'):
+    return HashingTfIdfVectorizer(SplitTokenizer(), save_path=path, load_path=path, save_format=save_format)
+
+
+def assert_same_vectorizers(vectorizer, other):
+    assert vectorizer.hash_size == other.hash_size
+    assert list(vectorizer.ngram_range) == list(other.ngram_range)
+    assert (vectorizer.tfidf_matrix != other.tfidf_matrix).nnz == 0
+    assert np.array_equal(vectorizer.term_freqs, other.term_freqs)
+    assert dict(vectorizer.doc_index) == dict(other.doc_index)
+    assert dict(vectorizer.index2doc) == dict(other.index2doc)
+    assert np.allclose(vectorizer(queries).toarray(), other(queries).toarray())
+
+
+class TestMmapFormat:
+    def test_mmap_equals_npz(self, tmp_path):
+        npz_vectorizer = fit_vectorizer(tmp_path / 'tfidf.npz', 'npz')
+        mmap_vectorizer = fit_vectorizer(tmp_path / 'tfidf', 'mmap')
+
+        assert isinstance(mmap_vectorizer.doc_index, MmapDocIndex)
+        assert_same_vectorizers(npz_vectorizer, mmap_vectorizer)
+        for title, num in npz_vectorizer.doc_index.items():
+            assert mmap_vectorizer.doc_index[title] == num
+        assert 'Berlin' not in mmap_vectorizer.doc_index
+
+    def test_convert_npz_to_mmap(self, tmp_path):
+        npz_vectorizer = fit_vectorizer(tmp_path / 'tfidf.npz', 'npz')
+        convert_npz_to_mmap(tmp_path / 'tfidf.npz', tmp_path / 'converted')
+
+        assert_same_vectorizers(npz_vectorizer, load_vectorizer(tmp_path / 'converted'))
+
+
+def get_expected_matrix(items, removed_ids, hash_size):
+    """Tfidf matrix of the documents left after removal, columns of removed documents are empty"""
+    counts = np.zeros((hash_size, len(items)))
+    remaining = [num for num, doc_id in enumerate(items) if doc_id not in removed_ids]
+    rows, cols, data = count_hashes(SplitTokenizer(), hash_size, [list(items.values())[num] for num in remaining],
+                                    remaining)
+    counts[rows, cols] = data
+    idfs = get_idfs((counts > 0).sum(1), len(remaining))
+    return np.log1p(counts) * idfs[:, None]
+
+
+class TestDeltaSegments:
+    docs = {'d0': 'a b c a', 'd1': 'b c d', 'd2': 'a a a e', 'd3': 'f g a', 'd4': 'c c b', 'd5': 'a b'}
+    added_docs = {'d6': 'a c x', 'd7': 'y a a'}
+    removed_ids = ['d1', 'd6']
+    queries = ['a b c', 'x y']
+    hash_size = 32
+
+    def fit(self, path, save_format, **kwargs):
+        vectorizer = HashingTfIdfVectorizer(SplitTokenizer(), hash_size=self.hash_size, save_path=path,
+                                            load_path=path, save_format=save_format, mode='train', **kwargs)
+        vectorizer.fit(list(self.docs.values()), list(self.docs), list(range(len(self.docs))))
+        vectorizer.save()
+        return load_vectorizer(path, save_format)
+
+    @pytest.mark.parametrize('save_format,compact_format', [('npz', 'npz'), ('mmap', 'mmap'), ('npz', 'mmap'),
+                                                             ('mmap', 'npz')])
+    @pytest.mark.parametrize('memory_budget', [None, 1])
+    def test_compact(self, tmp_path, save_format, compact_format, memory_budget):
+        path = tmp_path / ('tfidf.npz' if save_format == 'npz' else 'tfidf')
+        vectorizer = self.fit(path, save_format, memory_budget=memory_budget)
+        vectorizer.add_documents(list(self.added_docs.values()), list(self.added_docs))
+        vectorizer.remove_documents(self.removed_ids)
+
+        items = {**self.docs, **self.added_docs}
+        expected = get_expected_matrix(items, self.removed_ids, self.hash_size)
+        # some terms occur in every document, so their idf is clipped to zero
+        assert (expected.sum(1) == 0).any()
+
+        q_tfidfs = vectorizer(self.queries)
+        assert np.allclose(vectorizer.get_scores(q_tfidfs).toarray(), q_tfidfs.toarray() @ expected)
+
+        vectorizer.save_format = compact_format
+        vectorizer.compact()
+        compacted = load_vectorizer(path, compact_format)
+        assert not compacted.segments and not compacted.removed_nums
+        assert np.allclose(compacted.tfidf_matrix.toarray(), expected)
+
+        compacted_q_tfidfs = compacted(self.queries)
+        assert np.allclose(compacted_q_tfidfs.toarray(), q_tfidfs.toarray())
+        assert np.allclose(compacted.get_scores(compacted_q_tfidfs).toarray(), q_tfidfs.toarray() @ expected)
+
+    def test_compact_mode(self, tmp_path):
+        path = tmp_path / 'tfidf.npz'
+        vectorizer = self.fit(path, 'npz')
+        vectorizer.add_documents(list(self.added_docs.values()), list(self.added_docs))
+        vectorizer.remove_documents(self.removed_ids)
+        config = {
+            'chainer': {
+                'in': ['question'],
+                'pipe': [{'class_name': 'hashing_tfidf_vectorizer', 'load_path': str(path), 'save_path': str(path),
+                          'tokenizer': {'class_name': f'{SplitTokenizer.__module__}:SplitTokenizer'},
+                          'in': ['question'], 'out': ['q_tfidf']}],
+                'out': ['q_tfidf']
+            }
+        }
+        compact(config)
+
+        compacted = load_vectorizer(path)
+        assert not compacted.segments and not compacted.removed_nums
+        expected = get_expected_matrix({**self.docs, **self.added_docs}, self.removed_ids, self.hash_size)
+        assert np.allclose(compacted.tfidf_matrix.toarray(), expected)
+
+    def test_fitted_vectorizer(self, tmp_path):
+        path = tmp_path / 'tfidf.npz'
+        vectorizer = self.fit(path, 'npz')
+        vectorizer.add_documents(list(self.added_docs.values()), list(self.added_docs))
+        assert get_deltas_path(path).is_dir()
+
+        vectorizer = HashingTfIdfVectorizer(SplitTokenizer(), hash_size=self.hash_size, save_path=path,
+                                            load_path=path, mode='train')
+        assert vectorizer.ngram_range == SplitTokenizer.ngram_range
+        vectorizer.fit(list(self.docs.values()), list(self.docs), list(range(len(self.docs))))
+        vectorizer.save()
+        vectorizer.compact()
+        assert not get_deltas_path(path).exists()
+        assert len(load_vectorizer(path).doc_index) == len(self.docs)
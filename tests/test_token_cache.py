@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from deeppavlov.models.embedders.token_cache import TokenCache
+
+
+def test_lru_eviction():
+    cache = TokenCache(size=2)
+    cache.put('vocab', np.ones(2), resident=True)
+    for token in ['a', 'b', 'c']:
+        cache.put(token, np.full(2, ord(token)))
+    assert 'a' not in cache and 'vocab' in cache
+    assert cache.get('b') is not None
+    cache.put('d', np.zeros(2))
+    assert 'b' in cache and 'c' not in cache
+    assert cache.get('c') is None
+    assert cache.get_stats() == {'resident': 1, 'size': 2, 'hits': 1, 'misses': 1, 'evictions': 2, 'hit_rate': 0.5}
+
+
+def test_concurrent_stats():
+    cache = TokenCache(size=50)
+    tokens = [str(n) for n in range(100)]
+    for token in tokens[:10]:
+        cache.put(token, np.zeros(2), resident=True)
+
+    def lookup(offset):
+        for n in range(2000):
+            token = tokens[(offset + n) % len(tokens)]
+            if cache.get(token) is None:
+                cache.put(token, np.zeros(2))
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lookup, range(8)))
+    stats = cache.get_stats()
+    assert stats['hits'] + stats['misses'] == 8 * 2000
+    assert stats['resident'] == 10 and stats['size'] == 50
+    # several threads may miss the same token and put it twice
+    assert stats['evictions'] <= stats['misses'] - 50
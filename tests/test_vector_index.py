@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from deeppavlov.models.ranking.vector_index import ExactVectorIndex, IVFVectorIndex, top_k
+
+rng = np.random.RandomState(0)
+base = rng.randn(500, 16)
+queries = rng.randn(20, 16)
+
+
+def brute_force(k):
+    scores = queries @ base.T
+    ids = np.argsort(-scores, axis=1)[:, :k]
+    return ids, np.take_along_axis(scores, ids, axis=1)
+
+
+@pytest.mark.parametrize('k', [1, 7, 20])
+def test_top_k(k):
+    scores = queries @ base.T
+    ids, top_scores = top_k(scores, k)
+    expected_ids, expected_scores = brute_force(k)
+    assert np.array_equal(ids, expected_ids)
+    assert np.allclose(top_scores, expected_scores)
+
+
+@pytest.mark.parametrize('block_size', [64, 499, 10000])
+def test_exact_index(block_size):
+    index = ExactVectorIndex(top_k=10, block_size=block_size)
+    index.fit(base)
+    ids, scores = index(queries)
+    expected_ids, expected_scores = brute_force(10)
+    assert np.array_equal(ids, expected_ids)
+    assert np.allclose(scores, expected_scores)
+
+
+def test_ivf_index_with_all_lists_probed_is_exact():
+    exact = ExactVectorIndex(top_k=10)
+    exact.fit(base)
+    ivf = IVFVectorIndex(n_lists=16, n_probe=16, top_k=10, block_size=100)
+    ivf.fit(base)
+
+    exact_ids, exact_scores = exact(queries)
+    ivf_ids, ivf_scores = ivf(queries)
+    assert np.array_equal(ivf_ids, exact_ids)
+    assert np.allclose(ivf_scores, exact_scores)
+
+
+def test_ivf_index_recall():
+    ivf = IVFVectorIndex(n_lists=16, n_probe=4, top_k=10)
+    ivf.fit(base)
+    ids, scores = ivf(queries)
+    expected_ids, _ = brute_force(10)
+    assert np.all(np.diff(scores, axis=1) <= 0)
+    assert np.allclose(scores, np.take_along_axis(queries @ base.T, ids, axis=1))
+    recall = np.mean([len(set(found) & set(expected)) / 10 for found, expected in zip(ids, expected_ids)])
+    assert recall > 0.5
+
+
+def test_ivf_index_padding():
+    ivf = IVFVectorIndex(n_lists=100, n_probe=1)
+    ivf.fit(base)
+    ids, scores = ivf.search(queries, 100)
+    for query_ids, query_scores in zip(ids, scores):
+        found = query_ids >= 0
+        assert found.sum() < 100
+        assert np.all(np.isneginf(query_scores[~found]))
+        assert np.all(found[:found.sum()])
+
+
+def test_ivf_index_save_load(tmp_path):
+    path = tmp_path / 'ivf.npz'
+    ivf = IVFVectorIndex(n_lists=16, n_probe=4, save_path=path, load_path=path)
+    ivf.fit(base)
+    assert path.is_file()
+
+    loaded = IVFVectorIndex(n_lists=16, n_probe=4, seed=1, save_path=path, load_path=path)
+    loaded.fit(base)
+    assert np.array_equal(loaded.centroids, ivf.centroids)
+    assert np.array_equal(loaded.ids, ivf.ids)
+    for result, loaded_result in zip(ivf(queries), loaded(queries)):
+        assert np.array_equal(result, loaded_result)
@@ -0,0 +1,92 @@
+import importlib
+import sys
+import types
+from collections import namedtuple
+
+import pytest
+
+entity = 'http://www.wikidata.org/entity/'
+prop = 'http://www.wikidata.org/prop/direct/'
+label_rel = 'http://www.w3.org/2000/01/rdf-schema#label'
+triplets = [
+    (f'{entity}Q1', f'{prop}P31', f'{entity}Q23397'),
+    (f'{entity}Q2', f'{prop}P31', f'{entity}Q23397'),
+    (f'{entity}Q3', f'{prop}P31', f'{entity}Q515'),
+    (f'{entity}Q1', f'{prop}P17', f'{entity}Q159'),
+    (f'{entity}Q2', f'{prop}P17', f'{entity}Q159'),
+    (f'{entity}Q3', f'{prop}P17', f'{entity}Q159'),
+    (f'{entity}Q1', f'{prop}P4511', '"1642"^^<http://www.w3.org/2001/XMLSchema#decimal>'),
+    (f'{entity}Q2', f'{prop}P4511', '"230"^^<http://www.w3.org/2001/XMLSchema#decimal>'),
+    (f'{entity}Q1', label_rel, '"Lake Baikal"@en'),
+    (f'{entity}Q1', label_rel, '"Байкал"@ru'),
+    (f'{entity}Q2', label_rel, '"Lake Ladoga"@en'),
+]
+order_info = namedtuple('order_info', ['variable', 'sorting_order'])
+
+
+class FakeDocument:
+    """In-memory replacement of ``hdt.HDTDocument``"""
+
+    def __init__(self, path):
+        self.calls = 0
+
+    def search_triples(self, subj, rel, obj):
+        self.calls += 1
+        found = [triplet for triplet in triplets
+                 if all(not elem or elem == value for elem, value in zip((subj, rel, obj), triplet))]
+        return iter(found), len(found)
+
+
+@pytest.fixture
+def wiki_parser_module(monkeypatch):
+    hdt = types.ModuleType('hdt')
+    hdt.HDTDocument = FakeDocument
+    monkeypatch.setitem(sys.modules, 'hdt', hdt)
+    monkeypatch.delitem(sys.modules, 'deeppavlov.models.kbqa.wiki_parser', raising=False)
+    module = importlib.import_module('deeppavlov.models.kbqa.wiki_parser')
+    yield module
+    sys.modules.pop('deeppavlov.models.kbqa.wiki_parser', None)
+
+
+queries = [
+    (['?ent'], [['?ent', f'{prop}P17', f'{entity}Q159'], ['?ent', f'{prop}P31', f'{entity}Q23397']], [],
+     order_info(None, None)),
+    (['?obj'], [['?ent', f'{prop}P31', f'{entity}Q23397'], ['?ent', f'{prop}P4511', '?obj']], [],
+     order_info('?obj', 'desc')),
+    (['?ent', 'count'], [['?ent', f'{prop}P17', f'{entity}Q159']], [], order_info(None, None)),
+    (['?ent'], [['?ent', f'{prop}P31', f'{entity}Q515']], [('?ent', 'Q3')], order_info(None, None)),
+]
+
+
+def test_cached_results_equal_uncached(wiki_parser_module):
+    cached = wiki_parser_module.WikiParser('wikidata.hdt', cache_size=1000)
+    uncached = wiki_parser_module.WikiParser('wikidata.hdt', cache_size=0)
+    for _ in range(2):
+        for query in queries:
+            assert cached(*query) == uncached(*query)
+        assert cached.execute_batch(*zip(*queries)) == [uncached(*query) for query in queries]
+        assert cached.find_labels(['Q1', 'Q2', 'Q1', 'Q5']) == ['Lake Baikal', 'Lake Ladoga', 'Lake Baikal',
+                                                                'Not Found']
+        assert cached.find_rels('Q1', 'forw') == uncached.find_rels('Q1', 'forw')
+    assert cached.document.calls < uncached.document.calls
+
+
+def test_cached_results_are_immutable(wiki_parser_module):
+    parser = wiki_parser_module.WikiParser('wikidata.hdt', cache_size=1000)
+    found = parser.search_triples('', f'{prop}P31', '')
+    assert isinstance(found, tuple) and all(isinstance(triplet, tuple) for triplet in found)
+    assert parser.search_triples('', f'{prop}P31', '') == tuple(triplets[:3])
+    assert parser.document.calls == 1
+
+
+def test_cache_size(wiki_parser_module):
+    parser = wiki_parser_module.WikiParser('wikidata.hdt', cache_size=20)
+    parser.search_triples('', f'{prop}P31', '')
+    # results larger than a tenth of the cache are not cached
+    parser.search_triples('', f'{prop}P31', '')
+    assert parser.document.calls == 2
+    for n in range(40):
+        parser.search_triples(f'{entity}Q{n}', label_rel, '')
+    assert parser._cached_triplets <= 20
+    parser.search_triples(f'{entity}Q39', label_rel, '')
+    assert parser.document.calls == 42
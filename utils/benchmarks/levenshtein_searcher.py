@@ -0,0 +1,73 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares LevenshteinSearcher candidate generation over the compiled trie with the original trie search."""
+
+import argparse
+import random
+import time
+
+from deeppavlov.models.spelling_correction.levenshtein.levenshtein_searcher import LevenshteinSearcher
+
+
+def make_typo(word: str, alphabet: str, rng: random.Random) -> str:
+    pos = rng.randrange(len(word))
+    operation = rng.choice(['insert', 'delete', 'replace', 'transpose'])
+    if operation == 'insert':
+        return word[:pos] + rng.choice(alphabet) + word[pos:]
+    if operation == 'delete':
+        return word[:pos] + word[pos + 1:]
+    if operation == 'replace' or pos == len(word) - 1:
+        return word[:pos] + rng.choice(alphabet) + word[pos + 1:]
+    return word[:pos] + word[pos + 1] + word[pos] + word[pos + 2:]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--words', help='file with one dictionary word per line, random words are used if not set')
+    parser.add_argument('--vocab-size', default=100000, type=int)
+    parser.add_argument('--queries', default=500, type=int)
+    parser.add_argument('--max-distance', default=2, type=int)
+    parser.add_argument('--euristics', default=2, type=int)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    if args.words:
+        with open(args.words, encoding='utf8') as f:
+            words = list({line.strip().lower() for line in f if line.strip()})
+    else:
+        letters = 'абвгдежзийклмнопрстуфхцчшщъыьэюя'
+        words = list({''.join(rng.choice(letters) for _ in range(rng.randint(3, 12)))
+                      for _ in range(args.vocab_size)})
+    alphabet = sorted({letter for word in words for letter in word})
+    queries = [make_typo(rng.choice(words), ''.join(alphabet), rng) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    searcher = LevenshteinSearcher(alphabet, words, allow_spaces=True, euristics=args.euristics)
+    print(f'searcher for {len(words)} words is built in {time.perf_counter() - start:.1f} s')
+
+    results, timings = [], []
+    for search in (searcher._trie_search, searcher._compiled_trie_search):
+        start = time.perf_counter()
+        results.append([search(query, args.max_distance) for query in queries])
+        timings.append((time.perf_counter() - start) * 1000 / len(queries))
+
+    print(f'{"search":>10} {"ms/token":>9}')
+    print(f'{"trie":>10} {timings[0]:>9.2f}')
+    print(f'{"compiled":>10} {timings[1]:>9.2f}')
+    print(f'speedup: {timings[0] / timings[1]:.2f}, same candidates: {results[0] == results[1]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares throughput of the batched and one-by-one scoring of TfidfRanker on a random tfidf matrix."""
+
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from scipy import sparse
+
+from deeppavlov.models.doc_retrieval.tfidf_ranker import TfidfRanker
+
+
+def random_tfidf(n_rows: int, n_cols: int, nnz_per_row: int, seed: int) -> sparse.csr_matrix:
+    rng = np.random.RandomState(seed)
+    rows = np.repeat(np.arange(n_rows), nnz_per_row)
+    cols = rng.randint(0, n_cols, size=n_rows * nnz_per_row)
+    data = rng.rand(n_rows * nnz_per_row)
+    matrix = sparse.csr_matrix((data, (rows, cols)), shape=(n_rows, n_cols))
+    matrix.sum_duplicates()
+    return matrix
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hash-size', default=2 ** 20, type=int)
+    parser.add_argument('--docs', default=500000, type=int)
+    parser.add_argument('--terms-per-doc', default=100, type=int)
+    parser.add_argument('--terms-per-query', default=10, type=int)
+    parser.add_argument('--top-n', default=25, type=int)
+    parser.add_argument('--queries', default=512, type=int)
+    args = parser.parse_args()
+
+    doc_matrix = random_tfidf(args.docs, args.hash_size, args.terms_per_doc, seed=0).T.tocsr()
+    queries = random_tfidf(args.queries, args.hash_size, args.terms_per_query, seed=1)
+    vectorizer = SimpleNamespace(get_scores=lambda q_tfidfs: q_tfidfs * doc_matrix,
+                                 get_removed_nums=lambda: np.empty(0, dtype=np.int64))
+    ranker = TfidfRanker(vectorizer, top_n=args.top_n)
+
+    print(f'{"batch size":>10} {"one-by-one, q/s":>16} {"batched, q/s":>13} {"speedup":>8}')
+    for batch_size in (1, 4, 16, 64, 256):
+        throughput = []
+        for rank in (ranker.rank_one_by_one, ranker.rank_batch):
+            start = time.perf_counter()
+            for i in range(0, args.queries, batch_size):
+                rank(queries[i:i + batch_size], args.top_n)
+            throughput.append(args.queries / (time.perf_counter() - start))
+        print(f'{batch_size:>10} {throughput[0]:>16.1f} {throughput[1]:>13.1f} {throughput[1] / throughput[0]:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# Copyright 2017 Neural Networks and Deep Learning lab, MIPT
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares recall and latency of the exact and IVF vector indexes on random clustered unit vectors."""
+
+import argparse
+import time
+
+import numpy as np
+
+from deeppavlov.models.ranking.vector_index import ExactVectorIndex, IVFVectorIndex
+
+
+def random_unit_vectors(n: int, dim: int, n_clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.RandomState(seed)
+    centers = rng.randn(n_clusters, dim).astype(np.float32)
+    vectors = centers[rng.randint(0, n_clusters, size=n)] + 0.5 * rng.randn(n, dim).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--base', default=500000, type=int)
+    parser.add_argument('--dim', default=768, type=int)
+    parser.add_argument('--clusters', default=2000, type=int, help='number of clusters in generated data')
+    parser.add_argument('--n-lists', default=1024, type=int)
+    parser.add_argument('--top-k', default=10, type=int)
+    parser.add_argument('--queries', default=256, type=int)
+    parser.add_argument('--batch-size', default=1, type=int)
+    args = parser.parse_args()
+
+    base = random_unit_vectors(args.base, args.dim, args.clusters, seed=0)
+    queries = random_unit_vectors(args.queries, args.dim, args.clusters, seed=1)
+
+    def measure(index):
+        start = time.perf_counter()
+        ids = np.vstack([index.search(queries[i:i + args.batch_size], args.top_k)[0]
+                         for i in range(0, args.queries, args.batch_size)])
+        return ids, (time.perf_counter() - start) * 1000 / args.queries
+
+    full_start = time.perf_counter()
+    for i in range(0, args.queries, args.batch_size):
+        np.argsort(queries[i:i + args.batch_size] @ base.T, axis=1)[:, -args.top_k:]
+    full_latency = (time.perf_counter() - full_start) * 1000 / args.queries
+
+    exact = ExactVectorIndex()
+    exact.fit(base)
+    true_ids, exact_latency = measure(exact)
+
+    ivf = IVFVectorIndex(n_lists=args.n_lists)
+    build_start = time.perf_counter()
+    ivf.fit(base)
+    print(f'IVF index with {args.n_lists} lists is built in {time.perf_counter() - build_start:.1f} s')
+
+    print(f'{"index":>14} {"recall@" + str(args.top_k):>10} {"ms/query":>9}')
+    print(f'{"full argsort":>14} {1.:>10.3f} {full_latency:>9.2f}')
+    print(f'{"exact":>14} {1.:>10.3f} {exact_latency:>9.2f}')
+    for n_probe in (1, 4, 16, 64):
+        ivf.n_probe = n_probe
+        ids, latency = measure(ivf)
+        recall = np.mean([len(np.intersect1d(found, true)) / args.top_k for found, true in zip(ids, true_ids)])
+        print(f'{"ivf, probe " + str(n_probe):>14} {recall:>10.3f} {latency:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()